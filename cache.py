@@ -0,0 +1,205 @@
+import hashlib
+import json
+import marshal
+import os
+import pickle
+import tempfile
+from typing import Any, Iterable, Iterator
+from reader import RowFilter, SourceReader, XlsxSourceReader
+from spill import from_frames, to_frames
+
+
+class SourceCache(object):
+    """Cache of parsed source data
+
+    Rows read from a source are stored in a compact binary file under the
+    cache directory, keyed by the source filepath, size, mtime and content
+    hash, and the reader settings (sheet, row filter and columns). Each chunk
+    of rows is stored as one frame, where the columns are stored once and the
+    values as tuples, encoded with marshal (pickle for values marshal does not
+    support, e.g. datetime of xlsx). The least recently used entries are
+    removed when the total size exceeds the limit.
+    """
+
+    DefaultMaxBytes = 1024**3
+
+    __Extension = ".cache"
+    __MarshalTag = b"M"
+    __PickleTag = b"P"
+    __HashBlockSize = 1024 * 1024
+
+    def __init__(self, directory: str, max_bytes: int = DefaultMaxBytes):
+        """Constructor
+
+        Args:
+            directory (str): Cache directory. Created when not exists.
+            max_bytes (int, optional): Max total size of cache files in bytes. Defaults to DefaultMaxBytes (1 GiB).
+        """
+        if max_bytes <= 0:
+            raise Exception("max_bytes must be positive: {}".format(max_bytes))
+
+        self.__directory = directory
+        self.__max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def get_directory(self) -> str:
+        """Get cache directory
+
+        Returns:
+            str: Cache directory
+        """
+        return self.__directory
+
+    def get_max_bytes(self) -> int:
+        """Get max total size of cache files
+
+        Returns:
+            int: Size in bytes
+        """
+        return self.__max_bytes
+
+    def get_key(self, reader: SourceReader) -> str | None:
+        """Get cache key of rows read by the reader
+
+        Args:
+            reader (SourceReader): Source reader
+
+        Returns:
+            str | None: Cache key. None when rows are not cacheable, i.e. the row filter is not a RowFilter.
+        """
+        row_filter = reader.get_row_filter()
+        if row_filter is not None and not isinstance(row_filter, RowFilter):
+            return None
+
+        path = os.path.abspath(reader.get_file_path())
+        stat = os.stat(path)
+        content_hash = hashlib.blake2b(digest_size=16)
+        with open(path, mode="rb") as f:
+            while True:
+                block = f.read(self.__HashBlockSize)
+                if len(block) <= 0:
+                    break
+                content_hash.update(block)
+
+        identity = {
+            "path": path,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": content_hash.hexdigest(),
+            "reader": type(reader).__name__,
+            "sheet": (
+                reader.get_sheet() if isinstance(reader, XlsxSourceReader) else None
+            ),
+            "filter": row_filter.get_conditions() if row_filter is not None else None,
+            "columns": reader.get_columns(),
+        }
+        encoded = json.dumps(identity, sort_keys=True, default=str).encode("utf8")
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    def __get_path(self, key: str) -> str:
+        return os.path.join(self.__directory, "{}{}".format(key, self.__Extension))
+
+    def contains(self, key: str) -> bool:
+        """Get whether the entry exists
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            bool: True: exists
+        """
+        return os.path.exists(self.__get_path(key))
+
+    def iter_chunks(self, key: str) -> Iterator[list[dict[str, Any]]]:
+        """Iterate cached rows chunk by chunk as stored
+
+        Args:
+            key (str): Cache key
+
+        Yields:
+            list[dict[str, Any]]: Rows
+        """
+        path = self.__get_path(key)
+        # mark as recently used
+        os.utime(path)
+
+        with open(path, mode="rb") as f:
+            while True:
+                tag = f.read(1)
+                if len(tag) <= 0:
+                    break
+
+                frames = marshal.load(f) if tag == self.__MarshalTag else pickle.load(f)
+                yield list(from_frames(frames))
+
+    def read(self, key: str) -> list[dict[str, Any]]:
+        """Read cached rows
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            list[dict[str, Any]]: Rows
+        """
+        return [row for chunk in self.iter_chunks(key) for row in chunk]
+
+    def store(
+        self, key: str, chunks: Iterable[list[dict[str, Any]]]
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Store rows while passing them through
+
+        The entry is committed when all chunks are consumed, and discarded
+        when the iteration stops halfway.
+
+        Args:
+            key (str): Cache key
+            chunks (Iterable[list[dict[str, Any]]]): Rows chunk by chunk
+
+        Yields:
+            list[dict[str, Any]]: Rows as is
+        """
+        path = self.__get_path(key)
+        # concurrent jobs may store the same key, so each writes its own file
+        fd, tmp_path = tempfile.mkstemp(
+            prefix="{}.".format(key), suffix=".tmp", dir=self.__directory
+        )
+        committed = False
+        try:
+            with os.fdopen(fd, mode="wb") as f:
+                for chunk in chunks:
+                    self.__write_frame(chunk, f)
+                    yield chunk
+
+            os.replace(tmp_path, path)
+            committed = True
+        finally:
+            if not committed and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.evict()
+
+    def __write_frame(self, rows: list[dict[str, Any]], f: Any):
+        frames = to_frames(rows)
+        try:
+            data = marshal.dumps(frames)
+            f.write(self.__MarshalTag)
+        except ValueError:
+            data = pickle.dumps(frames, protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(self.__PickleTag)
+        f.write(data)
+
+    def evict(self):
+        """Remove the least recently used entries beyond the max total size"""
+        entries = []
+        for name in os.listdir(self.__directory):
+            if not name.endswith(self.__Extension):
+                continue
+            stat = os.stat(os.path.join(self.__directory, name))
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+
+        total = sum(e[1] for e in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.__max_bytes:
+                break
+            os.remove(os.path.join(self.__directory, name))
+            total -= size
@@ -1,17 +1,106 @@
-from typing import Any
+import array
+import csv
+import enum
+import functools
+import io
+import json
+import re
+import struct
+import sys
+from typing import Any, Callable, Iterable
 from datetime import datetime, date, time
 
+from stats import Stats
+
+
+def _create_json_encoder() -> Callable[[Any], str]:
+    """Create a function encoding json in the traditional separators
+
+    The C encoder is created once and called directly, because
+    `json.JSONEncoder.encode` creates it per call, which dominates the time
+    for small values. nan, inf and unsupported types raise ValueError or
+    TypeError.
+
+    Returns:
+        Callable[[Any], str]: Function
+    """
+
+    def default(value: Any) -> Any:
+        raise TypeError("{} is not json serializable".format(type(value).__name__))
+
+    make_encoder = getattr(json.encoder, "c_make_encoder", None)
+    if make_encoder is None:
+        return json.JSONEncoder(
+            ensure_ascii=False, allow_nan=False, separators=(", ", ": ")
+        ).encode
+
+    encoder = make_encoder(
+        None,  # no circular reference check
+        default,
+        json.encoder.encode_basestring,
+        None,  # no indent
+        ": ",
+        ", ",
+        False,  # sort_keys
+        False,  # skipkeys
+        False,  # allow_nan
+    )
+    return lambda value: "".join(encoder(value, 0))
+
+
+_encode_json = _create_json_encoder()
+
 
 class Converter(object):
     """Converter base class"""
 
+    __JsonTypes = frozenset((str, int, float, type(None), list, dict))
+    __KeyTypes = frozenset((str,))
+    __StandardJsonEncoder = json.JSONEncoder(ensure_ascii=False, default=str)
+    __EscapeDqTable = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
+    def __init__(self):
+        self.__stats: Stats | None = None
+        self.__standard_json: bool = False
+
+    def get_stats(self) -> Stats | None:
+        """Get statistics for counting converted cells
+
+        Returns:
+            Stats | None: Statistics. None when counting is disabled.
+        """
+        return self.__stats
+
+    def set_stats(self, stats: Stats | None):
+        """Set statistics for counting converted cells
+
+        Cells are counted per row before the conversion, so `to_string` has
+        no counting overhead.
+
+        Args:
+            stats (Stats | None): Statistics. None to disable counting.
+        """
+        self.__stats = stats
+
+    def _count_cells(self, rows: Iterable[dict[str, Any]]):
+        stats = self.__stats
+        if stats is None:
+            return
+
+        for row in rows:
+            for v in row.values():
+                stats.count_cell(type(v).__name__)
+
     @classmethod
-    def to_string(cls, value: Any, escape_dq: bool = False) -> str:
+    def to_string(
+        cls, value: Any, escape_dq: bool = False, standard_json: bool = False
+    ) -> str:
         """Convert to str
 
         Args:
             value (Any): Source value
             escape_dq (bool, optional): True: escape double quote. Defaults to False.
+            standard_json (bool, optional): True: convert list and dict values to standard json. Defaults to False.
 
         Raises:
             Exception: Unexpected type
@@ -31,6 +120,9 @@ class Converter(object):
         if isinstance(value, str):
             return '\\"{}\\"'.format(value) if escape_dq else '"{}"'.format(value)
 
+        if isinstance(value, (list, dict)):
+            return cls._container_to_string(value, standard_json)
+
         if isinstance(value, datetime):
             return '"{}-{}-{} {}:{}:{}"'.format(
                 value.year,
@@ -47,24 +139,118 @@ class Converter(object):
         if isinstance(value, time):
             return '"{}:{}:{}"'.format(value.hour, value.minute, value.second)
 
+        raise Exception("{} is invalid type".format(value))
+
+    def is_standard_json(self) -> bool:
+        """Get whether list and dict values are converted to standard json
+
+        Returns:
+            bool: True: standard json, False: traditional format
+        """
+        return self.__standard_json
+
+    def set_standard_json(self, standard_json: bool):
+        """Set whether list and dict values are converted to standard json
+
+        Args:
+            standard_json (bool): True: standard json, False: traditional format
+        """
+        self.__standard_json = standard_json
+
+    def _get_to_string(self) -> Callable[[Any], str]:
+        if self.__standard_json:
+            return functools.partial(self.to_string, standard_json=True)
+        return self.to_string
+
+    @classmethod
+    def _container_to_string(
+        cls, value: list[Any] | dict[Any, Any], standard_json: bool = False
+    ) -> str:
+        if standard_json:
+            text = Converter.__StandardJsonEncoder.encode(value)
+            return '"{}"'.format(text.translate(Converter.__EscapeDqTable))
+
+        try:
+            text = _encode_json(value)
+        except (TypeError, ValueError):
+            # e.g. datetime, nan and inf
+            return cls._container_to_string_slow(value)
+
+        # escaped characters differ from the traditional format
+        if "\\" in text:
+            return cls._container_to_string_slow(value)
+
+        containers = Converter.__count_json_containers(value)
+        if containers is None:
+            return cls._container_to_string_slow(value)
+
+        # each container has two brackets. Otherwise strings have brackets,
+        # so only the structure between strings is quoted.
+        quote = Converter.__quote_containers
+        if sum(map(text.count, "[]{}")) == containers * 2:
+            return quote(text.replace('"', '\\"'))
+
+        parts = text.split('"')
+        parts[::2] = map(quote, parts[::2])
+        return '\\"'.join(parts)
+
+    @staticmethod
+    def __quote_containers(text: str) -> str:
+        # str.replace is faster than str.translate with multi-character
+        # replacements
+        return (
+            text.replace("[", '"[')
+            .replace("]", ']"')
+            .replace("{", '"{')
+            .replace("}", '}"')
+        )
+
+    @staticmethod
+    def __count_json_containers(value: list[Any] | dict[Any, Any]) -> int | None:
+        # json has the traditional format (with double quotes escaped and
+        # nested containers enclosed in double quotes) only with str keys and
+        # str, int, float, None, list and dict values
+        json_types = Converter.__JsonTypes
+        key_types = Converter.__KeyTypes
+        count = 0
+        stack = [value]
+        while len(stack) > 0:
+            container = stack.pop()
+            count += 1
+            if isinstance(container, dict):
+                if not key_types.issuperset(map(type, container)):
+                    return None
+                values: Iterable[Any] = container.values()
+            else:
+                values = container
+
+            types = set(map(type, values))
+            if not json_types.issuperset(types):
+                return None
+            if list in types or dict in types:
+                stack.extend(e for e in values if type(e) is list or type(e) is dict)
+
+        return count
+
+    @classmethod
+    def _container_to_string_slow(cls, value: list[Any] | dict[Any, Any]) -> str:
         if isinstance(value, list):
-            return '"[{}]"'.format(
-                ", ".join(Converter._list_items_to_string(value, escape_dq=True))
-            )
+            return '"[{}]"'.format(", ".join(map(Converter.__item_to_string, value)))
 
-        if isinstance(value, dict):
-            li = []
-            for k, v in value.items():
-                li.append(
-                    "{}: {}".format(
-                        Converter.to_string(k, escape_dq=True),
-                        Converter.to_string(v, escape_dq=True),
-                    )
+        return '"{{{}}}"'.format(
+            ", ".join(
+                "{}: {}".format(
+                    Converter.__item_to_string(k), Converter.__item_to_string(v)
                 )
+                for k, v in value.items()
+            )
+        )
 
-            return '"{{{}}}"'.format(", ".join(li))
-
-        raise Exception("{} is invalid type".format(value))
+    @staticmethod
+    def __item_to_string(value: Any) -> str:
+        if isinstance(value, (list, dict)):
+            return Converter._container_to_string_slow(value)
+        return Converter.to_string(value, escape_dq=True)
 
     @classmethod
     def _list_items_to_string(
@@ -86,6 +272,120 @@ class Converter(object):
         """
         raise NotImplementedError
 
+    def convert_many(self, rows: list[dict[str, Any]], last: bool = False) -> str:
+        """Convert rows
+
+        Each converted row is followed by the delimiter and a newline.
+
+        Args:
+            rows (list[dict[str, Any]]): Source data
+            last (bool, optional): True: the last row is followed by the last delimiter. Defaults to False.
+
+        Returns:
+            str: Converted data
+        """
+        lines = self._convert_lines(rows)
+        if len(lines) <= 0:
+            return ""
+
+        delimiter = "{}\n".format(self.get_delimiter())
+        return "{}{}".format(
+            delimiter.join(lines),
+            "{}\n".format(self.get_last_delimiter()) if last else delimiter,
+        )
+
+    def convert_each(self, rows: list[dict[str, Any]], last: bool = False) -> list[str]:
+        """Convert rows to one string per row
+
+        Each string is a converted row followed by the delimiter and a
+        newline, so a value containing a newline never splits a row.
+
+        Args:
+            rows (list[dict[str, Any]]): Source data
+            last (bool, optional): True: the last row is followed by the last delimiter. Defaults to False.
+
+        Returns:
+            list[str]: Converted rows
+        """
+        lines = self._convert_lines(rows)
+        if len(lines) <= 0:
+            return []
+
+        delimiter = self.get_delimiter()
+        result = ["{}{}\n".format(e, delimiter) for e in lines]
+        if last:
+            result[-1] = "{}{}\n".format(lines[-1], self.get_last_delimiter())
+        return result
+
+    def _convert_lines(self, rows: list[dict[str, Any]]) -> list[str]:
+        # subclasses can override this method to build all rows at once
+        return [self.convert(e) for e in rows]
+
+    def convert_update(self, row: dict[str, Any], key: str) -> str:
+        """Convert to a statement updating the row identified by the key column
+
+        Args:
+            row (dict[str, Any]): Source data
+            key (str): Key column name
+
+        Raises:
+            NotImplementedError: When called directly this method.
+
+        Returns:
+            str: Converted data
+        """
+        raise NotImplementedError
+
+    def convert_delete(self, key: str, value: Any) -> str:
+        """Convert to a statement deleting the row identified by the key column
+
+        Args:
+            key (str): Key column name
+            value (Any): Key value
+
+        Raises:
+            NotImplementedError: When called directly this method.
+
+        Returns:
+            str: Converted data
+        """
+        raise NotImplementedError
+
+    def is_update_supported(self) -> bool:
+        """Get whether `convert_update` and `convert_delete` are implemented
+
+        Returns:
+            bool: True: supported
+        """
+        return False
+
+    def convert_block(self, rows: list[dict[str, Any]]) -> bytes:
+        """Convert rows as one block
+
+        Block-oriented converters override this method instead of `convert`.
+
+        Args:
+            rows (list[dict[str, Any]]): Source data
+
+        Raises:
+            NotImplementedError: When called directly this method.
+
+        Returns:
+            bytes: Converted block
+        """
+        raise NotImplementedError
+
+    def prepare(self, rows: list[dict[str, Any]]):
+        """Prepare with the first converted rows
+
+        Called once before `pre_data`, so that subclasses can inspect more
+        rows than the one passed to `pre_data`.
+
+        Args:
+            rows (list[dict[str, Any]]): First rows
+        """
+        pass
+
     def pre_data(self, row: dict[str, Any]) -> str:
         return ""
 
@@ -100,19 +400,29 @@ class Converter(object):
 
 
 class CsvConverter(Converter):
-    """CSV converter class"""
+    """CSV converter class
+
+    By default, values are converted with `to_string`. When a csv dialect is
+    set, rows are written by `csv.writer` (quoting and escaping per the
+    dialect, RFC 4180 for "excel") with the configured null representation.
+    """
 
     def __init__(self):
         super().__init__()
         self.set_filename("")
         self.set_table_name("")
+        self.set_csv_dialect(None)
+        self.set_null("")
+        self.__columns: list[str] = []
 
     @classmethod
-    def to_string(cls, value: Any, escape_dq: bool = False) -> str:
+    def to_string(
+        cls, value: Any, escape_dq: bool = False, standard_json: bool = False
+    ) -> str:
         if value is None:
             return ""
 
-        return super().to_string(value, escape_dq)
+        return super().to_string(value, escape_dq, standard_json)
 
     def get_filename(self) -> str:
         return self.__filename
@@ -136,14 +446,120 @@ class CsvConverter(Converter):
         """
         self.__table_name = name
 
-    def pre_data(self, row: dict[str, Any]) -> str:
-        print(
-            "LOAD DATA LOCAL INFILE '{}.csv' INTO TABLE {} FIELDS TERMINATED BY ',' ENCLOSED BY '\"' LINES TERMINATED BY '\\n' IGNORE 1 LINES ({});".format(
+    def get_csv_dialect(self) -> str | type[csv.Dialect] | None:
+        """Get csv dialect
+
+        Returns:
+            str | type[csv.Dialect] | None: csv dialect. None: converted with `to_string`.
+        """
+        return self.__csv_dialect
+
+    def set_csv_dialect(self, dialect: str | type[csv.Dialect] | None):
+        """Set csv dialect
+
+        Args:
+            dialect (str | type[csv.Dialect] | None): csv dialect name or class (e.g. "excel"). None: converted with `to_string`.
+        """
+        self.__csv_dialect = dialect
+
+    def get_null(self) -> str:
+        """Get null representation used with csv dialect
+
+        Returns:
+            str: Null representation
+        """
+        return self.__null
+
+    def set_null(self, null: str):
+        """Set null representation used with csv dialect
+
+        Args:
+            null (str): Null representation (e.g. "NULL" for LOAD DATA with the statement of `get_load_data_statement`)
+        """
+        self.__null = null
+
+    def get_load_data_statement(self, columns: list[str] | None = None) -> str:
+        """Get LOAD DATA statement for the converted file
+
+        Args:
+            columns (list[str] | None, optional): Column names. Defaults to None (columns of the last `pre_data`).
+
+        Returns:
+            str: LOAD DATA statement
+        """
+        if columns is None:
+            columns = self.__columns
+
+        dialect = self.get_csv_dialect()
+        if dialect is None:
+            return "LOAD DATA LOCAL INFILE '{}.csv' INTO TABLE {} FIELDS TERMINATED BY ',' ENCLOSED BY '\"' LINES TERMINATED BY '\\n' IGNORE 1 LINES ({});".format(
                 self.get_filename(),
                 self.get_table_name(),
-                ",".join(row.keys()),
+                ",".join(columns),
             )
+
+        d = csv.get_dialect(dialect) if isinstance(dialect, str) else dialect
+        return "LOAD DATA LOCAL INFILE {} INTO TABLE {} FIELDS TERMINATED BY {} ENCLOSED BY {} ESCAPED BY {} LINES TERMINATED BY '\\n' IGNORE 1 LINES ({});".format(
+            SqlLiteral.quote("{}.csv".format(self.get_filename()), SqlDialect.MySql),
+            self.get_table_name(),
+            SqlLiteral.quote(d.delimiter, SqlDialect.MySql),
+            SqlLiteral.quote(d.quotechar or "", SqlDialect.MySql),
+            SqlLiteral.quote(
+                "" if d.doublequote else d.escapechar or "", SqlDialect.MySql
+            ),
+            ",".join(columns),
         )
+
+    def __to_cell(self, value: Any) -> Any:
+        if value is None:
+            return self.__null
+
+        if isinstance(value, bool):
+            return 1 if value else 0
+
+        if isinstance(value, (int, float, str)):
+            return value
+
+        if isinstance(value, datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+
+        if isinstance(value, (date, time)):
+            return value.isoformat()
+
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False, default=str)
+
+        raise Exception("{} is invalid type".format(value))
+
+    def __write_rows(self, rows: Iterable[Iterable[Any]]) -> str:
+        dialect = self.get_csv_dialect()
+        if dialect is None:
+            raise Exception("csv dialect is not set")
+
+        buf = io.StringIO()
+        writer = csv.writer(buf, dialect, lineterminator="\n")
+        writer.writerows(rows)
+        return buf.getvalue()
+
+    def __write_values(self, rows: list[dict[str, Any]]) -> str:
+        to_cell = self.__to_cell
+        # str and int are written as they are
+        return self.__write_rows(
+            [
+                [
+                    v if type(v) is str or type(v) is int else to_cell(v)
+                    for v in e.values()
+                ]
+                for e in rows
+            ]
+        )
+
+    def pre_data(self, row: dict[str, Any]) -> str:
+        self.__columns = list(row.keys())
+
+        if self.get_csv_dialect() is not None:
+            return self.__write_rows([self.__columns])[:-1]
+
         return ",".join(self._list_items_to_string(list(row.keys())))
 
     def convert(self, row: dict[str, Any]) -> str:
@@ -155,16 +571,157 @@ class CsvConverter(Converter):
         Returns:
             str: Converted data
         """
+        self._count_cells((row,))
 
-        return ",".join(self._list_items_to_string(list(row.values())))
+        if self.get_csv_dialect() is not None:
+            return self.__write_values([row])[:-1]
 
+        return ",".join(map(self._get_to_string(), row.values()))
+
+    def convert_many(self, rows: list[dict[str, Any]], last: bool = False) -> str:
+        """Convert rows
+
+        Args:
+            rows (list[dict[str, Any]]): Source data
+            last (bool, optional): True: the last row is followed by the last delimiter. Defaults to False.
+
+        Returns:
+            str: Converted data
+        """
+        if self.get_csv_dialect() is None:
+            return super().convert_many(rows, last)
+
+        self._count_cells(rows)
+        return self.__write_values(rows)
+
+    def _convert_lines(self, rows: list[dict[str, Any]]) -> list[str]:
+        self._count_cells(rows)
+
+        if self.get_csv_dialect() is not None:
+            return [self.__write_values([e])[:-1] for e in rows]
+
+        to_string = self._get_to_string()
+        return [",".join(map(to_string, e.values())) for e in rows]
+
+
+class SqlDialect(enum.IntEnum):
+    """SQL dialect
+
+    Generic is the traditional output, strings are enclosed in double quotes
+    without escaping.
+    """
+
+    Generic = enum.auto()
+    MySql = enum.auto()
+    PostgreSql = enum.auto()
+    Sqlite = enum.auto()
+
+
+class SqlLiteral(object):
+    """Dialect-aware SQL literal class
+
+    Strings are escaped in one pass with precomputed `str.translate` tables.
+    Strings without special characters skip the translation.
+    """
+
+    __MySqlTable = str.maketrans(
+        {
+            "\\": "\\\\",
+            "'": "\\'",
+            '"': '\\"',
+            "\0": "\\0",
+            "\n": "\\n",
+            "\r": "\\r",
+            "\t": "\\t",
+            "\x1a": "\\Z",
+        }
+    )
+    __MySqlSpecialRe = re.compile("[\\\\'\"\0\n\r\t\x1a]")
+    __StandardTable = str.maketrans({"'": "''"})
+
+    @classmethod
+    def quote(cls, value: str, dialect: SqlDialect) -> str:
+        """Escape and quote string
+
+        Args:
+            value (str): Source string
+            dialect (SqlDialect): SQL dialect except Generic
+
+        Returns:
+            str: Quoted string literal
+        """
+        if dialect == SqlDialect.MySql:
+            if cls.__MySqlSpecialRe.search(value) is None:
+                return "'" + value + "'"
+            return "'" + value.translate(cls.__MySqlTable) + "'"
+
+        if "'" not in value:
+            return "'" + value + "'"
+        return "'" + value.translate(cls.__StandardTable) + "'"
+
+    @classmethod
+    def to_string(cls, value: Any, dialect: SqlDialect) -> str:
+        """Convert to SQL literal
+
+        Args:
+            value (Any): Source value
+            dialect (SqlDialect): SQL dialect except Generic
+
+        Raises:
+            Exception: Unexpected type
+
+        Returns:
+            str: SQL literal
+        """
+        if value is None:
+            return "NULL"
+
+        if isinstance(value, bool):
+            if dialect == SqlDialect.PostgreSql:
+                return "TRUE" if value else "FALSE"
+            return "1" if value else "0"
+
+        if isinstance(value, (int, float)):
+            return "{}".format(value)
+
+        if isinstance(value, str):
+            return cls.quote(value, dialect)
+
+        if isinstance(value, datetime):
+            return cls.quote(value.strftime("%Y-%m-%d %H:%M:%S"), dialect)
+
+        if isinstance(value, (date, time)):
+            return cls.quote(value.isoformat(), dialect)
+
+        if isinstance(value, (list, dict)):
+            return cls.quote(
+                json.dumps(value, ensure_ascii=False, default=str), dialect
+            )
+
+        raise Exception("{} is invalid type".format(value))
+
+    @classmethod
+    def get_function(cls, dialect: SqlDialect) -> Callable[[Any], str]:
+        """Get function converting to SQL literal of the dialect
+
+        Args:
+            dialect (SqlDialect): SQL dialect except Generic
+
+        Returns:
+            Callable[[Any], str]: Function
+        """
+        to_string = cls.to_string
+        return lambda value: to_string(value, dialect)
 
-class SqlConverter(Converter):
-    """SQL converter class"""
+
+class SqlConverterBase(Converter):
+    """SQL converter base class"""
 
     def __init__(self):
         super().__init__()
         self.set_table_name("")
+        self.set_upsert(False)
+        self.set_dialect(SqlDialect.Generic)
 
     def get_table_name(self) -> str:
         """Get table name
@@ -182,6 +739,137 @@ class SqlConverter(Converter):
         """
         self.__table_name = name
 
+    def is_upsert(self) -> bool:
+        """Get whether updates are converted to upsert statements
+
+        Returns:
+            bool: True: upsert, False: UPDATE
+        """
+        return self.__upsert
+
+    def set_upsert(self, upsert: bool):
+        """Set whether updates are converted to upsert statements
+
+        Args:
+            upsert (bool): True: upsert, False: UPDATE
+        """
+        self.__upsert = upsert
+
+    def get_dialect(self) -> SqlDialect:
+        """Get SQL dialect
+
+        Returns:
+            SqlDialect: SQL dialect
+        """
+        return self.__dialect
+
+    def set_dialect(self, dialect: SqlDialect):
+        """Set SQL dialect
+
+        Args:
+            dialect (SqlDialect): SQL dialect
+        """
+        self.__dialect = dialect
+        self.__update_value_to_string()
+
+    def set_standard_json(self, standard_json: bool):
+        """Set whether list and dict values are converted to standard json
+
+        Values are always converted to standard json with a dialect other
+        than Generic.
+
+        Args:
+            standard_json (bool): True: standard json, False: traditional format
+        """
+        super().set_standard_json(standard_json)
+        self.__update_value_to_string()
+
+    def __update_value_to_string(self):
+        self.__value_to_string: Callable[[Any], str]
+        if self.__dialect == SqlDialect.Generic:
+            self.__value_to_string = self._get_to_string()
+        else:
+            self.__value_to_string = SqlLiteral.get_function(self.__dialect)
+
+    def _get_value_to_string(self) -> Callable[[Any], str]:
+        return self.__value_to_string
+
+    def _values_to_string(self, row: dict[str, Any]) -> str:
+        return ", ".join(map(self.__value_to_string, row.values()))
+
+    def convert_update(self, row: dict[str, Any], key: str) -> str:
+        """Convert to a statement updating the row identified by the key column
+
+        Args:
+            row (dict[str, Any]): Source data
+            key (str): Key column name
+
+        Returns:
+            str: Converted data
+        """
+        if key not in row:
+            raise Exception("{} not in row".format(key))
+
+        self._count_cells((row,))
+        table_name = self.get_table_name()
+        to_string = self.__value_to_string
+
+        if self.is_upsert():
+            insert = "INSERT INTO {} ({}) VALUES ({})".format(
+                table_name, ", ".join(row.keys()), self._values_to_string(row)
+            )
+            if self.get_dialect() in (SqlDialect.PostgreSql, SqlDialect.Sqlite):
+                return "{} ON CONFLICT ({}) DO UPDATE SET {}".format(
+                    insert,
+                    key,
+                    ", ".join(
+                        "{0} = excluded.{0}".format(k) for k in row.keys() if k != key
+                    ),
+                )
+
+            return "{} ON DUPLICATE KEY UPDATE {}".format(
+                insert,
+                ", ".join(
+                    "{0} = VALUES({0})".format(k) for k in row.keys() if k != key
+                ),
+            )
+
+        return "UPDATE {} SET {} WHERE {} = {}".format(
+            table_name,
+            ", ".join(
+                "{} = {}".format(k, to_string(v)) for k, v in row.items() if k != key
+            ),
+            key,
+            to_string(row[key]),
+        )
+
+    def convert_delete(self, key: str, value: Any) -> str:
+        """Convert to a statement deleting the row identified by the key column
+
+        Args:
+            key (str): Key column name
+            value (Any): Key value
+
+        Returns:
+            str: Converted data
+        """
+        self._count_cells(({key: value},))
+        return "DELETE FROM {} WHERE {} = {}".format(
+            self.get_table_name(), key, self.__value_to_string(value)
+        )
+
+    def is_update_supported(self) -> bool:
+        """Get whether `convert_update` and `convert_delete` are implemented
+
+        Returns:
+            bool: True: supported
+        """
+        return True
+
+
+class SqlConverter(SqlConverterBase):
+    """SQL converter class"""
+
     def convert(self, row: dict[str, Any]) -> str:
         """Convert
 
@@ -191,12 +879,33 @@ class SqlConverter(Converter):
         Returns:
             str: Converted data
         """
+        self._count_cells((row,))
         return "INSERT INTO {} ({}) VALUES ({})".format(
             self.get_table_name(),
             ", ".join(row.keys()),
-            ", ".join(self._list_items_to_string(list(row.values()))),
+            self._values_to_string(row),
         )
 
+    def _convert_lines(self, rows: list[dict[str, Any]]) -> list[str]:
+        # the statement prefix is built once while the columns are unchanged
+        self._count_cells(rows)
+        to_string = self._get_value_to_string()
+        table_name = self.get_table_name()
+        keys: tuple[str, ...] | None = None
+        prefix = ""
+
+        lines = []
+        for e in rows:
+            row_keys = tuple(e.keys())
+            if row_keys != keys:
+                keys = row_keys
+                prefix = "INSERT INTO {} ({}) VALUES (".format(
+                    table_name, ", ".join(keys)
+                )
+            lines.append("{}{})".format(prefix, ", ".join(map(to_string, e.values()))))
+
+        return lines
+
     def get_delimiter(self) -> str:
         return ";"
 
@@ -204,35 +913,448 @@ class SqlConverter(Converter):
         return ";"
 
 
-class BulkSqlConverter(Converter):
+class BulkSqlConverter(SqlConverterBase):
     """SQL converter using bulk insert class"""
 
-    def __init__(self):
+    def pre_data(self, row: dict[str, Any]) -> str:
+        return "INSERT INTO {} ({}) VALUES".format(
+            self.get_table_name(),
+            ", ".join(row.keys()),
+        )
+
+    def convert(self, row: dict[str, Any]) -> str:
+        """Convert
+
+        Args:
+            row (dict[str, Any]): Source data
+
+        Returns:
+            str: Converted data
+        """
+        self._count_cells((row,))
+        return "    ({})".format(self._values_to_string(row))
+
+    def _convert_lines(self, rows: list[dict[str, Any]]) -> list[str]:
+        self._count_cells(rows)
+        to_string = self._get_value_to_string()
+        return ["    ({})".format(", ".join(map(to_string, e.values()))) for e in rows]
+
+    def get_delimiter(self) -> str:
+        return ","
+
+    def get_last_delimiter(self) -> str:
+        return ";"
+
+
+class SqlLoadScriptConverter(Converter):
+    """SQL load script converter class
+
+    Wraps a SQL converter to emit a script tuned for bulk loading:
+
+    - session options disabling checks during the load (per dialect)
+    - `CREATE TABLE IF NOT EXISTS` with column types inferred from the first rows
+    - disabling keys (MySQL) and dropping secondary indexes before the load,
+      and enabling and recreating them after the load
+    - an explicit transaction per batch of rows
+
+    Each batch is converted to complete statements of the wrapped converter.
+    """
+
+    SessionOptions: dict[SqlDialect, list[tuple[str, str, str]]] = {
+        SqlDialect.Generic: [],
+        SqlDialect.MySql: [
+            ("unique_checks", "0", "1"),
+            ("foreign_key_checks", "0", "1"),
+        ],
+        SqlDialect.PostgreSql: [
+            ("synchronous_commit", "off", "DEFAULT"),
+        ],
+        SqlDialect.Sqlite: [
+            ("foreign_keys", "OFF", "ON"),
+            ("synchronous", "OFF", "FULL"),
+        ],
+    }
+
+    __ColumnTypes: dict[SqlDialect, dict[str, str]] = {
+        SqlDialect.Generic: {
+            "int64": "BIGINT",
+            "float64": "DOUBLE PRECISION",
+            "bool": "BOOLEAN",
+            "str": "TEXT",
+            "datetime": "TIMESTAMP",
+            "date": "DATE",
+            "time": "TIME",
+            "json": "TEXT",
+        },
+        SqlDialect.MySql: {
+            "int64": "BIGINT",
+            "float64": "DOUBLE",
+            "bool": "BOOLEAN",
+            "str": "TEXT",
+            "datetime": "DATETIME",
+            "date": "DATE",
+            "time": "TIME",
+            "json": "JSON",
+        },
+        SqlDialect.PostgreSql: {
+            "int64": "BIGINT",
+            "float64": "DOUBLE PRECISION",
+            "bool": "BOOLEAN",
+            "str": "TEXT",
+            "datetime": "TIMESTAMP",
+            "date": "DATE",
+            "time": "TIME",
+            "json": "JSONB",
+        },
+        SqlDialect.Sqlite: {
+            "int64": "INTEGER",
+            "float64": "REAL",
+            "bool": "INTEGER",
+            "str": "TEXT",
+            "datetime": "TEXT",
+            "date": "TEXT",
+            "time": "TEXT",
+            "json": "TEXT",
+        },
+    }
+
+    __MySqlVarcharSize = 255
+
+    def __init__(self, converter: SqlConverterBase):
         super().__init__()
-        self.set_table_name("")
+        self.__converter = converter
+        self.__prepared_types: dict[str, str] = {}
+        self.set_column_types({})
+        self.set_create_table(True)
+        self.set_primary_key([])
+        self.set_transaction(True)
+        self.set_batch_size(None)
+        self.set_disable_keys(False)
+        self.set_secondary_indexes({})
+        self.set_session_options(True)
+
+    def get_converter(self) -> SqlConverterBase:
+        """Get wrapped SQL converter
 
-    def get_table_name(self) -> str:
-        """Get table name
+        Returns:
+            SqlConverterBase: Wrapped SQL converter
+        """
+        return self.__converter
+
+    def set_stats(self, stats: Stats | None):
+        """Set statistics for counting converted cells
+
+        The statistics are set to the wrapped converter, which converts cells.
+
+        Args:
+            stats (Stats | None): Statistics. None to disable counting.
+        """
+        super().set_stats(stats)
+        self.__converter.set_stats(stats)
+
+    def set_standard_json(self, standard_json: bool):
+        """Set whether list and dict values are converted to standard json
+
+        The setting is set to the wrapped converter, which converts values.
+
+        Args:
+            standard_json (bool): True: standard json, False: traditional format
+        """
+        super().set_standard_json(standard_json)
+        self.__converter.set_standard_json(standard_json)
+
+    def is_create_table(self) -> bool:
+        """Get whether `CREATE TABLE` is emitted
 
         Returns:
-            str: Table name
+            bool: True: emitted
         """
-        return self.__table_name
+        return self.__create_table
 
-    def set_table_name(self, name: str):
-        """Set table name
+    def set_create_table(self, create_table: bool):
+        """Set whether `CREATE TABLE` is emitted
 
         Args:
-            name (str): Table name
+            create_table (bool): True: emitted
         """
-        self.__table_name = name
+        self.__create_table = create_table
 
-    def pre_data(self, row: dict[str, Any]) -> str:
-        return "INSERT INTO {} ({}) VALUES".format(
-            self.get_table_name(),
-            ", ".join(row.keys()),
+    def get_primary_key(self) -> list[str]:
+        """Get primary key columns of `CREATE TABLE`
+
+        Returns:
+            list[str]: Column names
+        """
+        return self.__primary_key
+
+    def set_primary_key(self, columns: list[str]):
+        """Set primary key columns of `CREATE TABLE`
+
+        Args:
+            columns (list[str]): Column names
+        """
+        self.__primary_key = columns
+
+    def is_transaction(self) -> bool:
+        """Get whether batches are wrapped in explicit transactions
+
+        Returns:
+            bool: True: wrapped
+        """
+        return self.__transaction
+
+    def set_transaction(self, transaction: bool):
+        """Set whether batches are wrapped in explicit transactions
+
+        Args:
+            transaction (bool): True: wrapped
+        """
+        self.__transaction = transaction
+
+    def get_batch_size(self) -> int | None:
+        """Get max number of rows per batch
+
+        Returns:
+            int | None: Number of rows. None: rows converted at once make a batch.
+        """
+        return self.__batch_size
+
+    def set_batch_size(self, size: int | None):
+        """Set max number of rows per batch
+
+        Args:
+            size (int | None): Number of rows. None: rows converted at once make a batch.
+        """
+        if size is not None and size <= 0:
+            raise Exception("batch size must be positive: {}".format(size))
+        self.__batch_size = size
+
+    def is_disable_keys(self) -> bool:
+        """Get whether keys are disabled during the load (MySQL only)
+
+        Returns:
+            bool: True: disabled
+        """
+        return self.__disable_keys
+
+    def set_disable_keys(self, disable_keys: bool):
+        """Set whether keys are disabled during the load (MySQL only)
+
+        Args:
+            disable_keys (bool): True: disabled
+        """
+        self.__disable_keys = disable_keys
+
+    def get_secondary_indexes(self) -> dict[str, list[str]]:
+        """Get secondary indexes dropped before and recreated after the load
+
+        Returns:
+            dict[str, list[str]]: Index name and its column names
+        """
+        return self.__secondary_indexes
+
+    def set_secondary_indexes(self, indexes: dict[str, list[str]]):
+        """Set secondary indexes dropped before and recreated after the load
+
+        Args:
+            indexes (dict[str, list[str]]): Index name and its column names
+        """
+        self.__secondary_indexes = indexes
+
+    def is_session_options(self) -> bool:
+        """Get whether session options in `SessionOptions` are set during the load
+
+        Returns:
+            bool: True: set
+        """
+        return self.__session_options
+
+    def set_session_options(self, session_options: bool):
+        """Set whether session options in `SessionOptions` are set during the load
+
+        Args:
+            session_options (bool): True: set
+        """
+        self.__session_options = session_options
+
+    def get_column_types(self) -> dict[str, str]:
+        """Get column types of `CREATE TABLE`
+
+        Returns:
+            dict[str, str]: Column name and its SQL type
+        """
+        return self.__column_types
+
+    def set_column_types(self, types: dict[str, str]):
+        """Set column types of `CREATE TABLE`
+
+        Inferred types are used for the other columns.
+
+        Args:
+            types (dict[str, str]): Column name and its SQL type
+        """
+        self.__column_types = types
+
+    def infer_column_types(self, rows: list[dict[str, Any]]) -> dict[str, str]:
+        """Infer SQL column types from rows
+
+        Args:
+            rows (list[dict[str, Any]]): Source data
+
+        Returns:
+            dict[str, str]: Column name and its SQL type
+        """
+        dialect = self.__converter.get_dialect()
+        names = self.__ColumnTypes[dialect]
+
+        names_in_rows: dict[str, None] = {}
+        for row in rows:
+            for k in row.keys():
+                names_in_rows.setdefault(k, None)
+
+        key_columns = set(self.__primary_key)
+        for columns in self.__secondary_indexes.values():
+            key_columns.update(columns)
+
+        result = {}
+        for name in names_in_rows.keys():
+            column_type = ColumnarConverter.infer_type([row.get(name) for row in rows])
+            result[name] = names[column_type]
+
+            # TEXT cannot be a key without a prefix length
+            if (
+                dialect == SqlDialect.MySql
+                and column_type == ColumnarConverter.TypeStr
+                and name in key_columns
+            ):
+                result[name] = "VARCHAR({})".format(self.__MySqlVarcharSize)
+
+        return result
+
+    def prepare(self, rows: list[dict[str, Any]]):
+        """Infer column types from the first rows
+
+        Args:
+            rows (list[dict[str, Any]]): First rows
+        """
+        self.__prepared_types = self.infer_column_types(rows)
+
+    def __set_option(self, name: str, value: str) -> str:
+        if self.__converter.get_dialect() == SqlDialect.Sqlite:
+            return "PRAGMA {} = {};".format(name, value)
+        return "SET {} = {};".format(name, value)
+
+    def __drop_index(self, name: str) -> str:
+        if self.__converter.get_dialect() != SqlDialect.MySql:
+            return "DROP INDEX IF EXISTS {};".format(name)
+
+        # MySQL has no DROP INDEX IF EXISTS, and the table may be just created
+        table_name = self.__converter.get_table_name()
+        schema, _, table = table_name.rpartition(".")
+        condition = (
+            "table_schema = {} AND table_name = '{}' AND index_name = '{}'".format(
+                "'{}'".format(schema) if len(schema) > 0 else "DATABASE()",
+                table,
+                name,
+            )
+        )
+        return "\n".join(
+            [
+                "SET @pykombu_sql = (SELECT IF(COUNT(*) > 0, 'DROP INDEX {} ON {}', 'DO 0') FROM information_schema.statistics WHERE {});".format(
+                    name, table_name, condition
+                ),
+                "PREPARE pykombu_stmt FROM @pykombu_sql;",
+                "EXECUTE pykombu_stmt;",
+                "DEALLOCATE PREPARE pykombu_stmt;",
+            ]
         )
 
+    def get_create_table_statement(self, row: dict[str, Any]) -> str:
+        """Get `CREATE TABLE` statement
+
+        Args:
+            row (dict[str, Any]): Source data. Types of columns not prepared are inferred from it.
+
+        Returns:
+            str: Statement
+        """
+        types = self.infer_column_types([row])
+        types.update(self.__prepared_types)
+        types.update(self.__column_types)
+
+        definitions = ["    {} {}".format(k, v) for k, v in types.items()]
+        if len(self.__primary_key) > 0:
+            definitions.append(
+                "    PRIMARY KEY ({})".format(", ".join(self.__primary_key))
+            )
+
+        return "CREATE TABLE IF NOT EXISTS {} (\n{}\n);".format(
+            self.__converter.get_table_name(), ",\n".join(definitions)
+        )
+
+    def pre_data(self, row: dict[str, Any]) -> str:
+        table_name = self.__converter.get_table_name()
+        dialect = self.__converter.get_dialect()
+        lines: list[str] = []
+
+        if self.__session_options:
+            lines.extend(
+                self.__set_option(name, value)
+                for name, value, _ in self.SessionOptions[dialect]
+            )
+
+        if self.__create_table:
+            lines.append(self.get_create_table_statement(row))
+
+        if self.__disable_keys and dialect == SqlDialect.MySql:
+            lines.append("ALTER TABLE {} DISABLE KEYS;".format(table_name))
+
+        lines.extend(self.__drop_index(k) for k in self.__secondary_indexes.keys())
+
+        return "\n".join(lines)
+
+    def post_data(self, row: dict[str, Any]) -> str:
+        table_name = self.__converter.get_table_name()
+        dialect = self.__converter.get_dialect()
+        lines = [
+            "CREATE INDEX {} ON {} ({});".format(k, table_name, ", ".join(v))
+            for k, v in self.__secondary_indexes.items()
+        ]
+
+        if self.__disable_keys and dialect == SqlDialect.MySql:
+            lines.append("ALTER TABLE {} ENABLE KEYS;".format(table_name))
+
+        if self.__session_options:
+            lines.extend(
+                self.__set_option(name, value)
+                for name, _, value in self.SessionOptions[dialect]
+            )
+
+        return "\n".join(lines)
+
+    def __convert_batch(self, rows: list[dict[str, Any]]) -> str:
+        converter = self.__converter
+        result = []
+        if self.__transaction:
+            result.append(
+                "START TRANSACTION;\n"
+                if converter.get_dialect() == SqlDialect.MySql
+                else "BEGIN;\n"
+            )
+
+        pre = converter.pre_data(rows[0])
+        if len(pre) > 0:
+            result.append("{}\n".format(pre))
+        result.append(converter.convert_many(rows, last=True))
+        post = converter.post_data(rows[0])
+        if len(post) > 0:
+            result.append("{}\n".format(post))
+
+        if self.__transaction:
+            result.append("COMMIT;\n")
+
+        return "".join(result)
+
     def convert(self, row: dict[str, Any]) -> str:
         """Convert
 
@@ -242,12 +1364,250 @@ class BulkSqlConverter(Converter):
         Returns:
             str: Converted data
         """
-        return "    ({})".format(
-            ", ".join(self._list_items_to_string(list(row.values()))),
+        return self.__convert_batch([row]).rstrip("\n")
+
+    def convert_many(self, rows: list[dict[str, Any]], last: bool = False) -> str:
+        """Convert rows
+
+        Rows are split into batches, and each batch is converted to complete
+        statements.
+
+        Args:
+            rows (list[dict[str, Any]]): Source data
+            last (bool, optional): Ignored. Batches have no delimiter between them. Defaults to False.
+
+        Returns:
+            str: Converted data
+        """
+        if len(rows) <= 0:
+            return ""
+
+        return "".join(self.convert_each(rows, last))
+
+    def convert_each(self, rows: list[dict[str, Any]], last: bool = False) -> list[str]:
+        """Convert rows to one string per batch
+
+        A batch is converted to complete statements, so it is not split into rows.
+
+        Args:
+            rows (list[dict[str, Any]]): Source data
+            last (bool, optional): Ignored. Batches have no delimiter between them. Defaults to False.
+
+        Returns:
+            list[str]: Converted batches
+        """
+        if len(rows) <= 0:
+            return []
+
+        size = self.__batch_size or len(rows)
+        return [
+            self.__convert_batch(rows[i : i + size]) for i in range(0, len(rows), size)
+        ]
+
+    def is_update_supported(self) -> bool:
+        return self.__converter.is_update_supported()
+
+    def convert_update(self, row: dict[str, Any], key: str) -> str:
+        return "{}{}".format(
+            self.__converter.convert_update(row, key),
+            self.__converter.get_last_delimiter(),
         )
 
-    def get_delimiter(self) -> str:
-        return ","
+    def convert_delete(self, key: str, value: Any) -> str:
+        return "{}{}".format(
+            self.__converter.convert_delete(key, value),
+            self.__converter.get_last_delimiter(),
+        )
 
-    def get_last_delimiter(self) -> str:
-        return ";"
+
+class ColumnarConverter(Converter):
+    """Binary columnar converter class
+
+    Rows are converted to self-contained blocks. Each block has a json schema
+    header followed by typed column data aligned to 8 bytes:
+
+    - magic (4 bytes) and header length (uint32, little endian)
+    - header json: row count, data size and per column name, type and ranges
+    - per column null bitmap (bit set: null)
+    - int64 / float64 / bool columns: packed little endian values
+    - other columns: dictionary encoded utf8 strings (uint32 offsets and blob)
+      and uint32 indices
+
+    `ColumnarReader` in reader.py reads this format.
+    """
+
+    Magic = b"PKCB"
+    HeaderFormat = "<4sI"
+    Alignment = 8
+
+    TypeInt = "int64"
+    TypeFloat = "float64"
+    TypeBool = "bool"
+    TypeStr = "str"
+    TypeDatetime = "datetime"
+    TypeDate = "date"
+    TypeTime = "time"
+    TypeJson = "json"
+
+    __Int64Min = -(2**63)
+    __Int64Max = 2**63 - 1
+
+    @classmethod
+    def infer_type(cls, values: list[Any]) -> str:
+        """Infer column type
+
+        Args:
+            values (list[Any]): Column values
+
+        Returns:
+            str: Column type name
+        """
+        types = {type(e) for e in values if e is not None}
+        if len(types) <= 0:
+            return cls.TypeStr
+
+        if types == {bool}:
+            return cls.TypeBool
+
+        if types == {int}:
+            if all(
+                cls.__Int64Min <= e <= cls.__Int64Max for e in values if e is not None
+            ):
+                return cls.TypeInt
+            return cls.TypeJson
+
+        if types <= {int, float}:
+            return cls.TypeFloat
+
+        for t, name in (
+            (str, cls.TypeStr),
+            (datetime, cls.TypeDatetime),
+            (date, cls.TypeDate),
+            (time, cls.TypeTime),
+        ):
+            if types == {t}:
+                return name
+
+        return cls.TypeJson
+
+    @classmethod
+    def __align(cls, buf: bytearray):
+        buf.extend(b"\0" * (-len(buf) % cls.Alignment))
+
+    @staticmethod
+    def __to_le_bytes(values: array.array) -> bytes:
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values.tobytes()
+
+    @classmethod
+    def __encode_column(
+        cls, values: list[Any], column_type: str, buf: bytearray
+    ) -> dict[str, Any]:
+        column: dict[str, Any] = {"type": column_type}
+
+        nulls = bytearray((len(values) + 7) // 8)
+        for i, v in enumerate(values):
+            if v is None:
+                nulls[i >> 3] |= 1 << (i & 7)
+        column["nulls"] = [len(buf), len(nulls)]
+        buf.extend(nulls)
+        cls.__align(buf)
+
+        if column_type == cls.TypeInt:
+            data = cls.__to_le_bytes(
+                array.array("q", [0 if v is None else v for v in values])
+            )
+        elif column_type == cls.TypeFloat:
+            data = cls.__to_le_bytes(
+                array.array("d", [0.0 if v is None else v for v in values])
+            )
+        elif column_type == cls.TypeBool:
+            data = bytes(1 if v else 0 for v in values)
+        else:
+            if column_type == cls.TypeStr:
+                strings = values
+            elif column_type == cls.TypeJson:
+                strings = [
+                    (
+                        None
+                        if v is None
+                        else json.dumps(v, ensure_ascii=False, default=str)
+                    )
+                    for v in values
+                ]
+            else:
+                strings = [None if v is None else v.isoformat() for v in values]
+
+            dictionary: dict[str, int] = {}
+            indices = array.array(
+                "I",
+                [
+                    0 if v is None else dictionary.setdefault(v, len(dictionary))
+                    for v in strings
+                ],
+            )
+            blob = "".join(dictionary.keys()).encode("utf8")
+            offsets = array.array("I", [0])
+            total = 0
+            for k in dictionary.keys():
+                total += len(k.encode("utf8"))
+                offsets.append(total)
+
+            column["dict_offsets"] = [len(buf), len(offsets) * offsets.itemsize]
+            buf.extend(cls.__to_le_bytes(offsets))
+            cls.__align(buf)
+            column["dict"] = [len(buf), len(blob)]
+            buf.extend(blob)
+            cls.__align(buf)
+            data = cls.__to_le_bytes(indices)
+
+        column["data"] = [len(buf), len(data)]
+        buf.extend(data)
+        cls.__align(buf)
+        return column
+
+    def convert_block(self, rows: list[dict[str, Any]]) -> bytes:
+        """Convert rows as one columnar block
+
+        Args:
+            rows (list[dict[str, Any]]): Source data
+
+        Returns:
+            bytes: Converted block
+        """
+        names: dict[str, None] = {}
+        for row in rows:
+            for k in row.keys():
+                names.setdefault(k, None)
+
+        buf = bytearray()
+        columns = []
+        for name in names.keys():
+            values = [row.get(name) for row in rows]
+            column = self.__encode_column(values, self.infer_type(values), buf)
+            column["name"] = name
+            columns.append(column)
+
+        header = json.dumps(
+            {"rows": len(rows), "size": len(buf), "columns": columns}
+        ).encode("utf8")
+        result = bytearray(struct.pack(self.HeaderFormat, self.Magic, len(header)))
+        result.extend(header)
+        self.__align(result)
+        result.extend(buf)
+        return bytes(result)
+
+    def convert(self, row: dict[str, Any]) -> str:
+        """Convert
+
+        Args:
+            row (dict[str, Any]): Source data
+
+        Raises:
+            Exception: This converter is block-oriented.
+
+        Returns:
+            str: Converted data
+        """
+        raise Exception("{} supports convert_block only".format(type(self).__name__))
@@ -0,0 +1,325 @@
+import argparse
+import json
+import os
+import os.path
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from cache import SourceCache
+from pykombu2 import PyKombu, parse_arguments, run
+from stats import Stats
+
+DefaultSocketPath = os.path.join(tempfile.gettempdir(), "pykombu.sock")
+
+
+class ConfigCache(object):
+    """Cache of replace tables, initialization tables and handlers
+
+    Each file is loaded at the first use and reloaded only when its mtime or
+    size changes, so handler scripts are not executed again per conversion.
+    """
+
+    def __init__(self):
+        self.__entries: dict[tuple[str, str], tuple[tuple[int, int], Any]] = {}
+        self.__lock = threading.Lock()
+        self.__load_count: int = 0
+
+    def get_load_count(self) -> int:
+        """Get number of files loaded so far
+
+        Returns:
+            int: Number of loads
+        """
+        return self.__load_count
+
+    def __get(self, kind: str, path: str, load: Callable[[str], Any]) -> Any:
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            raise Exception("{} not exists".format(path))
+
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self.__lock:
+            entry = self.__entries.get((kind, path))
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+
+            value = load(path)
+            self.__entries[(kind, path)] = (signature, value)
+            self.__load_count += 1
+            return value
+
+    def get_table(self, path: str) -> dict[str, Any]:
+        """Get replace or initialization table
+
+        Args:
+            path (str): Table json filepath
+
+        Returns:
+            dict[str, Any]: Table
+        """
+        table: dict[str, Any] = self.__get("table", path, PyKombu.load_table)
+        return table
+
+    def get_handlers(self, path: str) -> tuple[dict[str, Any], int | None]:
+        """Get handlers
+
+        Args:
+            path (str): Handlers python script filepath
+
+        Returns:
+            tuple[dict[str, Any], int | None]: Handlers and HandlerConcurrency
+        """
+        handlers: tuple[dict[str, Any], int | None] = self.__get(
+            "handlers", path, PyKombu.load_handlers
+        )
+        return handlers
+
+    def load(
+        self,
+        src_path: str,
+        replace_path: str,
+        init_path: str | None = None,
+        handler_path: str | None = None,
+        stats: Stats | None = None,
+        lazy: bool = False,
+        sheet: str | int | None = None,
+        row_filter: dict[str, Any] | None = None,
+        cache: SourceCache | None = None,
+        joins: list[dict[str, Any]] | None = None,
+    ) -> PyKombu:
+        """Load data with cached parameter
+
+        Args are the same as `PyKombu.load`.
+
+        Returns:
+            PyKombu: Instance
+        """
+        handlers = None
+        handler_concurrency = None
+        if handler_path is not None:
+            handlers, handler_concurrency = self.get_handlers(handler_path)
+
+        return PyKombu.create(
+            src_path,
+            self.get_table(replace_path) if replace_path is not None else {},
+            self.get_table(init_path) if init_path is not None else None,
+            handlers,
+            handler_concurrency,
+            stats=stats,
+            lazy=lazy,
+            sheet=sheet,
+            row_filter=row_filter,
+            cache=cache,
+            joins=joins,
+        )
+
+
+class ConversionDaemon(object):
+    """Long-running conversion server on a Unix domain socket
+
+    A request is one json line, answered with one json line:
+
+    - `{"command": "convert", "argv": [...], "cwd": "..."}` runs a conversion
+      with the command line arguments of pykombu2.py. Relative paths are
+      resolved against `cwd`.
+    - `{"command": "ping"}` and `{"command": "shutdown"}`
+
+    Conversions run on a thread pool. Replace tables, initialization tables
+    and handlers are kept in a `ConfigCache`, and imported modules stay warm.
+    Each conversion creates its own converters and statistics, so settings
+    such as `--standard-json` never leak into other conversions.
+    """
+
+    PathArguments = (
+        "source",
+        "replace",
+        "output",
+        "init",
+        "handlers",
+        "filter",
+        "joins",
+        "stats",
+        "delta_index",
+        "indexes",
+        "cache_dir",
+        "spill_dir",
+    )
+
+    def __init__(self, socket_path: str = DefaultSocketPath, workers: int = 4):
+        if workers <= 0:
+            raise Exception("workers must be positive: {}".format(workers))
+
+        self.__socket_path = socket_path
+        self.__workers = workers
+        self.__config_cache = ConfigCache()
+        self.__stopped = threading.Event()
+
+    def get_socket_path(self) -> str:
+        """Get socket filepath
+
+        Returns:
+            str: Socket filepath
+        """
+        return self.__socket_path
+
+    def get_config_cache(self) -> ConfigCache:
+        """Get cache of replace tables, initialization tables and handlers
+
+        Returns:
+            ConfigCache: Cache
+        """
+        return self.__config_cache
+
+    def handle_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Handle request
+
+        Args:
+            request (dict[str, Any]): Request
+
+        Returns:
+            dict[str, Any]: Response
+        """
+        command = request.get("command")
+        if command == "ping":
+            return {"ok": True}
+
+        if command == "shutdown":
+            self.shutdown()
+            return {"ok": True}
+
+        if command != "convert":
+            return {"ok": False, "error": "{} is invalid command".format(command)}
+
+        start = time.perf_counter()
+        try:
+            args = parse_arguments(request.get("argv", []))
+        except SystemExit:
+            return {"ok": False, "error": "invalid arguments"}
+
+        cwd = request.get("cwd", os.getcwd())
+        for k in self.PathArguments:
+            v = getattr(args, k)
+            if v is not None:
+                setattr(args, k, os.path.join(cwd, v))
+        args.also = [os.path.join(cwd, e) for e in args.also]
+
+        try:
+            messages = run(args, self.__config_cache.load)
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+        return {
+            "ok": True,
+            "messages": messages,
+            "elapsed": time.perf_counter() - start,
+        }
+
+    def __handle_connection(self, connection: socket.socket):
+        with connection:
+            try:
+                with connection.makefile(mode="rb") as f:
+                    request = json.loads(f.readline())
+                response = self.handle_request(request)
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+
+            connection.sendall(
+                "{}\n".format(json.dumps(response, ensure_ascii=False)).encode("utf8")
+            )
+
+    def serve_forever(self):
+        """Accept requests until shutdown"""
+        if os.path.exists(self.__socket_path):
+            os.remove(self.__socket_path)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(self.__socket_path)
+            server.listen()
+            server.settimeout(0.5)
+            try:
+                with ThreadPoolExecutor(max_workers=self.__workers) as executor:
+                    while not self.__stopped.is_set():
+                        try:
+                            connection, _ = server.accept()
+                        except socket.timeout:
+                            continue
+                        connection.settimeout(None)
+                        executor.submit(self.__handle_connection, connection)
+            finally:
+                os.remove(self.__socket_path)
+
+    def shutdown(self):
+        """Stop accepting requests. Running conversions are completed."""
+        self.__stopped.set()
+
+
+def send_request(
+    request: dict[str, Any], socket_path: str = DefaultSocketPath
+) -> dict[str, Any]:
+    """Send request to the daemon
+
+    Args:
+        request (dict[str, Any]): Request
+        socket_path (str, optional): Socket filepath. Defaults to DefaultSocketPath.
+
+    Returns:
+        dict[str, Any]: Response
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(
+            "{}\n".format(json.dumps(request, ensure_ascii=False)).encode("utf8")
+        )
+        with client.makefile(mode="rb") as f:
+            response: dict[str, Any] = json.loads(f.readline())
+            return response
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--socket", default=DefaultSocketPath, help="unix domain socket filepath"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve = subparsers.add_parser("serve", help="run the daemon")
+    serve.add_argument(
+        "--workers", type=int, default=4, help="number of conversions run at once"
+    )
+    convert = subparsers.add_parser(
+        "convert", help="run a conversion with the arguments of pykombu2.py"
+    )
+    convert.add_argument("argv", nargs=argparse.REMAINDER)
+    subparsers.add_parser("ping", help="check the daemon is running")
+    subparsers.add_parser("stop", help="stop the daemon")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        ConversionDaemon(args.socket, args.workers).serve_forever()
+        return
+
+    if args.command == "convert":
+        convert_argv = args.argv[1:] if args.argv[:1] == ["--"] else args.argv
+        # report invalid arguments here rather than in the daemon
+        parse_arguments(convert_argv)
+        request = {"command": "convert", "argv": convert_argv, "cwd": os.getcwd()}
+    elif args.command == "stop":
+        request = {"command": "shutdown"}
+    else:
+        request = {"command": "ping"}
+
+    response = send_request(request, args.socket)
+    if not response["ok"]:
+        print(response["error"], file=sys.stderr)
+        sys.exit(1)
+
+    for e in response.get("messages", []):
+        print(e)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import sqlite3
+from typing import Any, Iterator
+
+
+class DeltaIndex(object):
+    """On-disk index of row key and content hash of the previous run
+
+    The index is a SQLite database holding the json encoded key and a 64-bit
+    content hash per row, so it stays compact and off the Python heap for
+    tens of millions of keys. Rows seen in the current run are recorded into
+    a separate table, which replaces the previous snapshot on commit.
+    """
+
+    __LookupSize = 500
+
+    def __init__(self, path: str):
+        self.__connection = sqlite3.connect(path, isolation_level=None)
+        self.__connection.execute("PRAGMA synchronous = NORMAL")
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS snapshot (key TEXT PRIMARY KEY, hash INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        self.__connection.execute("DROP TABLE IF EXISTS next_snapshot")
+        self.__connection.execute(
+            "CREATE TABLE next_snapshot (key TEXT PRIMARY KEY, hash INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        self.__connection.execute("BEGIN")
+
+    def __enter__(self) -> "DeltaIndex":
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
+
+    @staticmethod
+    def encode_key(value: Any) -> str:
+        """Encode key value
+
+        Args:
+            value (Any): Key value
+
+        Returns:
+            str: Encoded key
+        """
+        return json.dumps(value, ensure_ascii=False, default=str)
+
+    @staticmethod
+    def decode_key(key: str) -> Any:
+        """Decode key value
+
+        Args:
+            key (str): Encoded key
+
+        Returns:
+            Any: Key value
+        """
+        return json.loads(key)
+
+    @staticmethod
+    def hash_row(row: dict[str, Any]) -> int:
+        """Calculate content hash of the row
+
+        Args:
+            row (dict[str, Any]): Row
+
+        Returns:
+            int: Signed 64-bit content hash
+        """
+        encoded = json.dumps(row, ensure_ascii=False, default=str).encode("utf8")
+        return int.from_bytes(
+            hashlib.blake2b(encoded, digest_size=8).digest(), "little", signed=True
+        )
+
+    def classify(
+        self, rows: list[dict[str, Any]], key: str
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Classify rows into inserted and updated ones, and record them
+
+        Args:
+            rows (list[dict[str, Any]]): Pre-processed rows
+            key (str): Key column name
+
+        Raises:
+            Exception: Key column is missing or duplicated
+
+        Returns:
+            tuple[list[dict[str, Any]], list[dict[str, Any]]]: Inserted rows and updated rows
+        """
+        entries = []
+        for row in rows:
+            if key not in row:
+                raise Exception("{} not in row".format(key))
+            entries.append((self.encode_key(row[key]), self.hash_row(row)))
+
+        previous: dict[str, int] = {}
+        for i in range(0, len(entries), self.__LookupSize):
+            keys = [e[0] for e in entries[i : i + self.__LookupSize]]
+            previous.update(
+                self.__connection.execute(
+                    "SELECT key, hash FROM snapshot WHERE key IN ({})".format(
+                        ", ".join("?" for _ in keys)
+                    ),
+                    keys,
+                )
+            )
+
+        try:
+            self.__connection.executemany(
+                "INSERT INTO next_snapshot (key, hash) VALUES (?, ?)", entries
+            )
+        except sqlite3.IntegrityError:
+            raise Exception("{} has duplicated values".format(key))
+
+        inserts = []
+        updates = []
+        for row, (k, h) in zip(rows, entries):
+            if k not in previous:
+                inserts.append(row)
+            elif previous[k] != h:
+                updates.append(row)
+
+        return inserts, updates
+
+    def iter_deleted_keys(self) -> Iterator[Any]:
+        """Iterate keys in the previous snapshot but not recorded in this run
+
+        Yields:
+            Any: Key value
+        """
+        cursor = self.__connection.execute(
+            "SELECT key FROM snapshot WHERE key NOT IN (SELECT key FROM next_snapshot)"
+        )
+        for (k,) in cursor:
+            yield self.decode_key(k)
+
+    def commit(self):
+        """Replace the previous snapshot with the rows recorded in this run"""
+        self.__connection.execute("DROP TABLE snapshot")
+        self.__connection.execute("ALTER TABLE next_snapshot RENAME TO snapshot")
+        self.__connection.execute("COMMIT")
+
+    def close(self):
+        """Close the index. Uncommitted rows are discarded."""
+        if self.__connection.in_transaction:
+            self.__connection.execute("ROLLBACK")
+        self.__connection.close()
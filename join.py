@@ -0,0 +1,176 @@
+from typing import Any
+from reader import create_source_reader
+
+
+class LookupJoin(object):
+    """Lookup join enriching rows with columns of a secondary source
+
+    The secondary source (json exported by DBeaver, csv or xlsx) is read once
+    into a hash index by its key column. Each row is looked up by the value of
+    its `on` column, and the pulled columns are added to the row (None when
+    not found). Null keys are neither indexed nor looked up. Keys are compared
+    as strings, so numbers of a json source match the text of a csv source.
+    """
+
+    def __init__(
+        self,
+        src_path: str,
+        key: str,
+        columns: list[str] | dict[str, str],
+        on: str | None = None,
+        sheet: str | int | None = None,
+    ):
+        """Constructor
+
+        Args:
+            src_path (str): Secondary source filepath
+            key (str): Key column name of the secondary source
+            columns (list[str] | dict[str, str]): Column names pulled in, or secondary column name and its column name in the row
+            on (str | None, optional): Column name of the row looked up. Defaults to None (same as key).
+            sheet (str | int | None, optional): Sheet name or index of xlsx source. Defaults to None (active sheet).
+        """
+        if len(columns) <= 0:
+            raise Exception("columns must not be empty")
+
+        self.__src_path = src_path
+        self.__key = key
+        self.__columns = (
+            dict(columns) if isinstance(columns, dict) else {k: k for k in columns}
+        )
+        self.__on = on if on is not None else key
+        self.__sheet = sheet
+        self.__index: dict[str, tuple[Any, ...]] | None = None
+
+    @staticmethod
+    def from_dict(spec: dict[str, Any]) -> "LookupJoin":
+        """Create from the json representation
+
+        Args:
+            spec (dict[str, Any]): `source`, `key`, `columns` and optional `on` and `sheet`
+
+        Raises:
+            Exception: Required item is missing
+
+        Returns:
+            LookupJoin: Instance
+        """
+        for k in ("source", "key", "columns"):
+            if k not in spec:
+                raise Exception("{} not in join".format(k))
+
+        return LookupJoin(
+            spec["source"],
+            spec["key"],
+            spec["columns"],
+            spec.get("on"),
+            spec.get("sheet"),
+        )
+
+    def get_source_path(self) -> str:
+        """Get secondary source filepath
+
+        Returns:
+            str: Secondary source filepath
+        """
+        return self.__src_path
+
+    def get_key(self) -> str:
+        """Get key column name of the secondary source
+
+        Returns:
+            str: Key column name
+        """
+        return self.__key
+
+    def get_on(self) -> str:
+        """Get column name of the row looked up
+
+        Returns:
+            str: Column name
+        """
+        return self.__on
+
+    def get_columns(self) -> dict[str, str]:
+        """Get columns pulled in
+
+        Returns:
+            dict[str, str]: Secondary column name and its column name in the row
+        """
+        return self.__columns
+
+    @staticmethod
+    def encode_key(value: Any) -> str | None:
+        """Encode key value
+
+        Args:
+            value (Any): Key value
+
+        Returns:
+            str | None: Encoded key. None for None.
+        """
+        return None if value is None else "{}".format(value)
+
+    def build(self) -> int:
+        """Build the hash index unless built
+
+        Raises:
+            Exception: Key column is missing or duplicated
+
+        Returns:
+            int: Number of indexed rows
+        """
+        if self.__index is not None:
+            return len(self.__index)
+
+        reader = create_source_reader(self.__src_path, self.__sheet)
+        reader.set_columns([self.__key] + list(self.__columns.keys()))
+
+        index: dict[str, tuple[Any, ...]] = {}
+        names = list(self.__columns.keys())
+        for row in reader.iter_rows():
+            if self.__key not in row:
+                raise Exception("{} not in {}".format(self.__key, self.__src_path))
+
+            k = self.encode_key(row[self.__key])
+            if k is None:
+                # null never matches, as in SQL
+                continue
+            if k in index:
+                raise Exception(
+                    "{} has duplicated values in {}".format(self.__key, self.__src_path)
+                )
+            index[k] = tuple(row.get(e) for e in names)
+
+        self.__index = index
+        return len(index)
+
+    def apply(self, data: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Add the pulled columns to rows
+
+        Args:
+            data (list[dict[str, Any]]): Rows
+
+        Raises:
+            Exception: Column looked up is missing
+
+        Returns:
+            list[dict[str, Any]]: Enriched rows
+        """
+        self.build()
+        index = self.__index or {}
+        on = self.__on
+        targets = list(self.__columns.values())
+        missing = (None,) * len(targets)
+        encode_key = self.encode_key
+
+        result = []
+        for e in data:
+            if on not in e:
+                raise Exception("{} not in row".format(on))
+
+            k = encode_key(e[on])
+            row = dict(e)
+            row.update(zip(targets, missing if k is None else index.get(k, missing)))
+            result.append(row)
+
+        return result
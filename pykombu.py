@@ -8,8 +8,11 @@ import pprint
 import sys
 import re
 import xml.etree.ElementTree as ET
+import zipfile
 from typing import Optional, Union
 
+from reader import XlsxSourceReader
+
 
 class ArgumentManager(object):
 
@@ -167,6 +170,14 @@ class SqlReader(ReaderBase):
     pass
 
 
+class XlsxReader(ReaderBase):
+    def __init__(self, sheet: Optional[Union[str, int]] = None):
+        self.__sheet = sheet
+
+    def load(self, file_path: str) -> list:
+        return XlsxSourceReader(file_path, self.__sheet).read()
+
+
 class ConverterBase(object):
     def load(self, file_path: str) -> list:
         with open(file_path, 'r') as f:
@@ -331,6 +342,7 @@ class FileTypeDetecter(object):
         Xml = enum.auto()
         ExportedKeepFormatAndLayoutTextByMsAccess = enum.auto()
         Sql = enum.auto()
+        Xlsx = enum.auto()
         Others = 255
 
     @classmethod
@@ -444,6 +456,13 @@ class FileTypeDetecter(object):
                     return True
         return False
 
+    @classmethod
+    def __is_xlsx(cls, file_path: str) -> bool:
+        if not cls.__is_eq_ext(file_path, "xlsx"):
+            return False
+
+        return zipfile.is_zipfile(file_path)
+
     @classmethod
     def __helper(cls, file_type: FileType, judgement: bool) -> FileType:
         return file_type if judgement else cls.FileType.Others
@@ -462,6 +481,7 @@ class FileTypeDetecter(object):
             cls.FileType.ExportedKeepFormatAndLayoutTextByMsAccess
         ] = cls.__is_exported_keep_format_and_layout_text_by_ms_access(file_path)
         results[cls.FileType.Sql] = cls.__is_sql(file_path)
+        results[cls.FileType.Xlsx] = cls.__is_xlsx(file_path)
         results[cls.FileType.Others] = True
         Logger.print_container(results)
 
@@ -474,6 +494,7 @@ class FileTypeDetecter(object):
             cls.FileType.Json: JsonReader(),
             cls.FileType.Xml: XmlReader(),
             cls.FileType.ExportedKeepFormatAndLayoutTextByMsAccess: ExportedKeepFormatAndLayoutByMsAccessReader(),
+            cls.FileType.Xlsx: XlsxReader(),
             cls.FileType.Others: None,
         }
 
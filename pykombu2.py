@@ -1,13 +1,52 @@
+import argparse
+import asyncio
+import csv
+import inspect
 import json
+import os
 import os.path
-from typing import Any
-from converter import Converter
+import shutil
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, TypedDict
+from cache import SourceCache
+from converter import (
+    Converter,
+    SqlConverterBase,
+    SqlConverter,
+    BulkSqlConverter,
+    CsvConverter,
+    ColumnarConverter,
+    SqlDialect,
+    SqlLoadScriptConverter,
+)
+from delta import DeltaIndex
+from join import LookupJoin
+from reader import RowFilter, SourceReader, create_source_reader
+from sink import ConverterSink, Sink, SqliteSink
+from spill import SortBuffer, SpillBuffer, chunk_rows, get_max_rss
+from stats import Stats
+
+
+class Checkpoint(TypedDict):
+    """Progress of `PyKombu.process_resumable` recorded after each segment"""
+
+    segment: int
+    offset: int
+    row_index: int
+    pre: str | None
+    post: str | None
+    columns: list[str] | None
 
 
 class PyKombu:
     """Converter control class"""
 
     __HandlersKey = "Handlers"
+    __HandlerConcurrencyKey = "HandlerConcurrency"
+    __CheckpointName = "checkpoint.json"
+    __SegmentNameFormat = "{:08d}.part"
 
     @staticmethod
     def load(
@@ -15,6 +54,12 @@ class PyKombu:
         replace_path: str,
         init_path: str | None = None,
         handler_path: str | None = None,
+        stats: Stats | None = None,
+        lazy: bool = False,
+        sheet: str | int | None = None,
+        row_filter: dict[str, Any] | None = None,
+        cache: SourceCache | None = None,
+        joins: list[dict[str, Any]] | None = None,
     ) -> "PyKombu":
         """Load data and parameter
 
@@ -23,6 +68,12 @@ class PyKombu:
             replace_path (str): Replace table json filepath
             init_path (str | None, optional): Initialization table json filepath. Defaults to None.
             handler_path (str | None, optional): Handlers python script filepath. Defaults to None.
+            stats (Stats | None, optional): Statistics to record into. Defaults to None.
+            lazy (bool, optional): True: defer loading source data until it is needed, and stream it chunk by chunk in process. Defaults to False.
+            sheet (str | int | None, optional): Sheet name or index of xlsx source. Defaults to None (active sheet).
+            row_filter (dict[str, Any] | None, optional): Conditions of RowFilter on source columns, applied as rows are read. Defaults to None.
+            cache (SourceCache | None, optional): Cache of parsed source data, used when the source is unchanged. Defaults to None.
+            joins (list[dict[str, Any]] | None, optional): Lookup joins (`source`, `key`, `columns` and optional `on` and `sheet` of LookupJoin) applied after the initialization table. Defaults to None.
 
         Raises:
             Exception: Unexpected error
@@ -30,80 +81,253 @@ class PyKombu:
         Returns:
             PyKombu: Instance
         """
-        result = PyKombu()
-        result.__initialize_instance()
-
         if not os.path.exists(src_path):
             raise Exception("{} not exists".format(src_path))
 
-        with open(src_path, mode="r", encoding="utf8") as f:
-            loaded_json = json.load(f)
+        handlers = None
+        handler_concurrency = None
+        if handler_path is not None:
+            handlers, handler_concurrency = PyKombu.load_handlers(handler_path)
 
-            if len(loaded_json.keys()) <= 0:
-                raise Exception("{} is maybe empty".format(src_path))
+        return PyKombu.create(
+            src_path,
+            PyKombu.load_table(replace_path) if replace_path is not None else {},
+            PyKombu.load_table(init_path) if init_path is not None else None,
+            handlers,
+            handler_concurrency,
+            stats=stats,
+            lazy=lazy,
+            sheet=sheet,
+            row_filter=row_filter,
+            cache=cache,
+            joins=joins,
+        )
 
-            first_key = list(loaded_json.keys())[0]
-            data = loaded_json[first_key]
+    @staticmethod
+    def load_table(path: str) -> dict[str, Any]:
+        """Load replace or initialization table
 
-            result.__set_loaded_data(data)
+        Args:
+            path (str): Table json filepath
 
-        if replace_path is not None:
-            if not os.path.exists(replace_path):
-                raise Exception("{} not exists".format(replace_path))
+        Raises:
+            Exception: File not exists or empty
 
-            with open(replace_path, mode="r", encoding="utf8") as f:
-                loaded_json = json.load(f)
+        Returns:
+            dict[str, Any]: Table
+        """
+        if not os.path.exists(path):
+            raise Exception("{} not exists".format(path))
 
-                if len(loaded_json.keys()) <= 0:
-                    raise Exception("{} is maybe empty".format(replace_path))
+        with open(path, mode="r", encoding="utf8") as f:
+            loaded_json: dict[str, Any] = json.load(f)
 
-                result.__set_replace_table(loaded_json)
+        if len(loaded_json.keys()) <= 0:
+            raise Exception("{} is maybe empty".format(path))
 
-        if init_path is not None:
-            if not os.path.exists(init_path):
-                raise Exception("{} not exists", format(init_path))
+        return loaded_json
 
-            with open(init_path, mode="r", encoding="utf8") as f:
-                loaded_json = json.load(f)
+    @staticmethod
+    def load_handlers(path: str) -> tuple[dict[str, Any], int | None]:
+        """Load handlers python script
 
-                if len(loaded_json.keys()) <= 0:
-                    raise Exception("{} is maybe empty".format(init_path))
+        Args:
+            path (str): Handlers python script filepath
 
-                result.__set_initialization_table(loaded_json)
+        Raises:
+            Exception: File not exists or Handlers not defined
 
-        if handler_path is not None:
-            if not os.path.exists(handler_path):
-                raise Exception("{} not exists".format(handler_path))
+        Returns:
+            tuple[dict[str, Any], int | None]: Handlers and HandlerConcurrency (None when not defined)
+        """
+        if not os.path.exists(path):
+            raise Exception("{} not exists".format(path))
 
-            with open(handler_path, mode="r", encoding="utf8") as f:
-                loaded_code = f.read()
-                global_objects: dict[str, Any] = {}
+        with open(path, mode="r", encoding="utf8") as f:
+            loaded_code = f.read()
 
-                exec(loaded_code, global_objects)
+        global_objects: dict[str, Any] = {}
+        exec(loaded_code, global_objects)
 
-                if PyKombu.__HandlersKey not in global_objects.keys():
-                    raise Exception(
-                        "{} not in {}".format(PyKombu.__HandlersKey, handler_path)
-                    )
+        if PyKombu.__HandlersKey not in global_objects.keys():
+            raise Exception("{} not in {}".format(PyKombu.__HandlersKey, path))
+
+        return (
+            global_objects[PyKombu.__HandlersKey],
+            global_objects.get(PyKombu.__HandlerConcurrencyKey),
+        )
 
-                result.__set_handlers(global_objects[PyKombu.__HandlersKey])
+    @staticmethod
+    def create(
+        src_path: str,
+        replace_table: dict[str, str | None],
+        initialization_table: dict[str, Any] | None = None,
+        handlers: dict[str, Any] | None = None,
+        handler_concurrency: int | None = None,
+        stats: Stats | None = None,
+        lazy: bool = False,
+        sheet: str | int | None = None,
+        row_filter: dict[str, Any] | None = None,
+        cache: SourceCache | None = None,
+        joins: list[dict[str, Any]] | None = None,
+    ) -> "PyKombu":
+        """Create instance with loaded parameter
+
+        Args:
+            src_path (str): Source data filepath
+            replace_table (dict[str, str | None]): Replace table
+            initialization_table (dict[str, Any] | None, optional): Initialization table. Defaults to None.
+            handlers (dict[str, Any] | None, optional): Handlers. Defaults to None.
+            handler_concurrency (int | None, optional): Max number of concurrent handler calls. Defaults to None (1).
+            stats (Stats | None, optional): Statistics to record into. Defaults to None.
+            lazy (bool, optional): True: defer loading source data until it is needed. Defaults to False.
+            sheet (str | int | None, optional): Sheet name or index of xlsx source. Defaults to None (active sheet).
+            row_filter (dict[str, Any] | None, optional): Conditions of RowFilter on source columns. Defaults to None.
+            cache (SourceCache | None, optional): Cache of parsed source data. Defaults to None.
+            joins (list[dict[str, Any]] | None, optional): Lookup joins. Defaults to None.
+
+        Raises:
+            Exception: Unexpected error
+
+        Returns:
+            PyKombu: Instance
+        """
+        result = PyKombu()
+        result.__initialize_instance()
+        result.set_stats(stats)
+        result.set_source_cache(cache)
+
+        if not os.path.exists(src_path):
+            raise Exception("{} not exists".format(src_path))
+
+        result.__set_replace_table(replace_table)
+        if initialization_table is not None:
+            result.__set_initialization_table(initialization_table)
+        if handlers is not None:
+            result.__set_handlers(handlers)
+        if handler_concurrency is not None:
+            result.set_handler_concurrency(handler_concurrency)
+        if joins is not None:
+            result.set_joins([LookupJoin.from_dict(e) for e in joins])
+
+        reader = create_source_reader(src_path, sheet)
+        if row_filter is not None:
+            reader.set_row_filter(RowFilter(row_filter))
+        reader.set_columns(result.__get_source_columns(row_filter))
+        result.__set_source_reader(reader)
+        if not lazy:
+            result.__load_source()
 
         return result
 
+    def __get_source_columns(
+        self, row_filter: dict[str, Any] | None
+    ) -> list[str] | None:
+        replace_table = self.get_replace_table()
+        if len(replace_table) <= 0:
+            return None
+
+        columns = [v for v in replace_table.values() if v is not None]
+        if row_filter is not None:
+            columns.extend(k for k in row_filter.keys() if k not in columns)
+        return columns
+
     def __initialize_instance(self):
         self.__set_replace_table({})
         self.__set_initialization_table({})
         self.__set_handlers({})
+        self.set_handler_concurrency(1)
+        self.set_joins([])
+        self.set_stats(None)
+        self.set_source_cache(None)
+        self.set_memory_budget(None)
+        self.set_spill_dir(None)
+        self.set_order_by(None)
+        self.__set_loaded_data(None)
+
+    def __load_source(self) -> list[dict[str, Any]]:
+        start = time.perf_counter()
+        cache = self.get_source_cache()
+        key = cache.get_key(self.get_source_reader()) if cache is not None else None
+        if cache is None or key is None:
+            data = self.get_source_reader().read()
+        elif cache.contains(key):
+            data = cache.read(key)
+        else:
+            data = self.get_source_reader().read()
+            for _ in cache.store(key, [data]):
+                pass
+        self.__set_loaded_data(data)
+
+        stats = self.get_stats()
+        if stats is not None:
+            stats.add_stage("load", time.perf_counter() - start, len(data))
+
+        return data
+
+    def get_source_path(self) -> str:
+        """Get source data filepath
+
+        Returns:
+            str: Source data filepath
+        """
+        return self.get_source_reader().get_file_path()
+
+    def get_source_reader(self) -> SourceReader:
+        """Get source reader
+
+        Returns:
+            SourceReader: Source reader
+        """
+        return self.__source_reader
+
+    def __set_source_reader(self, reader: SourceReader):
+        self.__source_reader = reader
+
+    def __iter_source_chunks(self, chunk_size: int) -> Iterator[list[dict[str, Any]]]:
+        if self.__loaded_data is not None:
+            for i in range(0, len(self.__loaded_data), chunk_size):
+                yield self.__loaded_data[i : i + chunk_size]
+            return
+
+        stats = self.get_stats()
+        start = time.perf_counter()
+        for rows in self.__read_source_chunks(chunk_size):
+            if stats is not None:
+                stats.add_stage("load", time.perf_counter() - start, len(rows))
+            yield rows
+            start = time.perf_counter()
+
+    def __read_source_chunks(self, chunk_size: int) -> Iterator[list[dict[str, Any]]]:
+        reader = self.get_source_reader()
+        chunks = (rows for _, rows in reader.read_chunks(chunk_size))
+
+        cache = self.get_source_cache()
+        key = cache.get_key(reader) if cache is not None else None
+        if cache is None or key is None:
+            return chunks
+
+        if cache.contains(key):
+            return chunk_rows(
+                (row for e in cache.iter_chunks(key) for row in e), chunk_size
+            )
+
+        return cache.store(key, chunks)
 
     def get_loaded_data(self) -> list[dict[str, Any]]:
         """Get loaded json data
 
+        When loaded lazily, the source data is loaded at the first call.
+
         Returns:
             list[dict[str, Any]]: Loaded json data
         """
+        if self.__loaded_data is None:
+            return self.__load_source()
+
         return self.__loaded_data
 
-    def __set_loaded_data(self, data: list[dict[str, Any]]):
+    def __set_loaded_data(self, data: list[dict[str, Any]] | None):
         self.__loaded_data = data
 
     def get_replace_table(self) -> dict[str, str | None]:
@@ -139,6 +363,167 @@ class PyKombu:
     def __set_handlers(self, handlers: dict[str, Any]):
         self.__handlers = handlers
 
+    def get_joins(self) -> list[LookupJoin]:
+        """Get lookup joins
+
+        Returns:
+            list[LookupJoin]: Lookup joins applied after the initialization table
+        """
+        return self.__joins
+
+    def set_joins(self, joins: list[LookupJoin]):
+        """Set lookup joins
+
+        Rows are enriched with the pulled columns after the initialization
+        table is applied, so handlers can read them from the row.
+
+        Args:
+            joins (list[LookupJoin]): Lookup joins applied after the initialization table
+        """
+        self.__joins = joins
+
+    def get_handler_concurrency(self) -> int:
+        """Get max number of handler calls running concurrently
+
+        Returns:
+            int: Max number of concurrent handler calls. 1: serial execution.
+        """
+        return self.__handler_concurrency
+
+    def set_handler_concurrency(self, concurrency: int):
+        """Set max number of handler calls running concurrently
+
+        Handler calls for a chunk of rows run on a thread pool, or on an event
+        loop for `async def` handlers. Row order is preserved.
+
+        Args:
+            concurrency (int): Max number of concurrent handler calls. 1: serial execution.
+        """
+        if concurrency <= 0:
+            raise Exception("concurrency must be positive: {}".format(concurrency))
+        self.__handler_concurrency = concurrency
+
+    def get_source_cache(self) -> SourceCache | None:
+        """Get cache of parsed source data
+
+        Returns:
+            SourceCache | None: Cache. None when caching is disabled.
+        """
+        return self.__source_cache
+
+    def set_source_cache(self, cache: SourceCache | None):
+        """Set cache of parsed source data
+
+        Args:
+            cache (SourceCache | None): Cache. None to disable caching.
+        """
+        self.__source_cache = cache
+
+    def get_stats(self) -> Stats | None:
+        """Get statistics
+
+        Returns:
+            Stats | None: Statistics. None when instrumentation is disabled.
+        """
+        return self.__stats
+
+    def set_stats(self, stats: Stats | None):
+        """Set statistics
+
+        Args:
+            stats (Stats | None): Statistics to record into. None to disable instrumentation.
+        """
+        self.__stats = stats
+
+    def get_memory_budget(self) -> int | None:
+        """Get memory budget of buffered rows
+
+        Returns:
+            int | None: Memory budget in bytes. None: unlimited.
+        """
+        return self.__memory_budget
+
+    def set_memory_budget(self, budget: int | None):
+        """Set memory budget of buffered rows
+
+        Pre-processed rows beyond the budget are spilled to disk in
+        `process_to_file`.
+
+        Args:
+            budget (int | None): Memory budget in bytes. None: unlimited.
+        """
+        if budget is not None and budget <= 0:
+            raise Exception("memory budget must be positive: {}".format(budget))
+        self.__memory_budget = budget
+
+    def get_spill_dir(self) -> str | None:
+        """Get directory where spilled rows are written
+
+        Returns:
+            str | None: Directory. None: system default temporary directory.
+        """
+        return self.__spill_dir
+
+    def set_spill_dir(self, directory: str | None):
+        """Set directory where spilled rows are written
+
+        Args:
+            directory (str | None): Directory. None: system default temporary directory.
+        """
+        self.__spill_dir = directory
+
+    def get_order_by(self) -> list[str] | None:
+        """Get column names to order output rows by
+
+        Returns:
+            list[str] | None: Column names after renaming. None: source order.
+        """
+        return self.__order_by
+
+    def set_order_by(self, columns: list[str] | None):
+        """Set column names to order output rows by
+
+        Pre-processed rows are sorted in ascending order before conversion.
+        Beyond the memory budget, sorted runs are spilled to disk and merged.
+
+        Args:
+            columns (list[str] | None): Column names after renaming. None: source order.
+        """
+        if columns is not None and len(columns) <= 0:
+            raise Exception("order_by must not be empty")
+        self.__order_by = columns
+
+    def __create_buffer(self) -> SpillBuffer | SortBuffer:
+        order_by = self.get_order_by()
+        if order_by is not None:
+            return SortBuffer(order_by, self.get_memory_budget(), self.get_spill_dir())
+        return SpillBuffer(self.get_memory_budget(), self.get_spill_dir())
+
+    def __iter_processed_chunks(
+        self, chunk_size: int
+    ) -> Iterator[list[dict[str, Any]]]:
+        if self.get_order_by() is not None:
+            return self.__iter_sorted_chunks(chunk_size)
+        return (self.__pre_process(e) for e in self.__iter_source_chunks(chunk_size))
+
+    def __iter_sorted_chunks(self, chunk_size: int) -> Iterator[list[dict[str, Any]]]:
+        with self.__create_buffer() as buffer:
+            for chunk in self.__iter_source_chunks(chunk_size):
+                buffer.append(self.__pre_process(chunk))
+
+            stats = self.get_stats()
+            elapsed = 0.0
+            start = time.perf_counter()
+            for chunk in buffer.iter_chunks(chunk_size):
+                elapsed += time.perf_counter() - start
+                yield chunk
+                start = time.perf_counter()
+            elapsed += time.perf_counter() - start
+
+            if stats is not None:
+                stats.add_stage("sort", elapsed, buffer.get_row_count())
+            self.__record_memory(buffer)
+
     @staticmethod
     def __replace_column_name(
         data: list[dict[str, Any]], replace_table: dict[str, str | None]
@@ -184,8 +569,21 @@ class PyKombu:
 
     @staticmethod
     def __execute_handler_table(
-        data: list[dict[str, Any]], handlers: dict[str, Any]
+        data: list[dict[str, Any]],
+        handlers: dict[str, Any],
+        stats: Stats | None = None,
+        concurrency: int = 1,
     ) -> list[dict[str, Any]]:
+        if concurrency > 1 or any(
+            inspect.iscoroutinefunction(e) for e in handlers.values()
+        ):
+            return PyKombu.__execute_handler_table_concurrently(
+                data, handlers, stats, concurrency
+            )
+
+        if stats is not None:
+            return PyKombu.__execute_handler_table_with_stats(data, handlers, stats)
+
         result = []
         for e in data:
             row = {}
@@ -200,44 +598,1269 @@ class PyKombu:
 
         return result
 
-    def __pre_process(self) -> list[dict[str, Any]]:
-        data = self.__replace_column_name(
-            self.get_loaded_data(), self.get_replace_table()
-        )
+    @staticmethod
+    def __execute_handler_table_with_stats(
+        data: list[dict[str, Any]], handlers: dict[str, Any], stats: Stats
+    ) -> list[dict[str, Any]]:
+        elapsed = {k: 0.0 for k in handlers.keys()}
+        calls = {k: 0 for k in handlers.keys()}
+
+        result = []
+        for e in data:
+            row = {}
+            for k, v in e.items():
+                if k in handlers.keys():
+                    start = time.perf_counter()
+                    row[k] = handlers[k](k, v, e)
+                    elapsed[k] += time.perf_counter() - start
+                    calls[k] += 1
+                    continue
+
+                row[k] = v
+
+            result.append(row)
+
+        for k in handlers.keys():
+            stats.add_handler(k, elapsed[k], calls[k])
+
+        return result
+
+    @staticmethod
+    def __execute_handler_table_concurrently(
+        data: list[dict[str, Any]],
+        handlers: dict[str, Any],
+        stats: Stats | None,
+        concurrency: int,
+    ) -> list[dict[str, Any]]:
+        calls = [
+            (handlers[k], k, v, e) for e in data for k, v in e.items() if k in handlers
+        ]
+
+        if any(inspect.iscoroutinefunction(e) for e in handlers.values()):
+            results = asyncio.run(PyKombu.__call_handlers_async(calls, concurrency))
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(PyKombu.__call_handler, calls))
+
+        if stats is not None:
+            elapsed = {k: 0.0 for k in handlers.keys()}
+            calls_per_key = {k: 0 for k in handlers.keys()}
+            for (_, k, _, _), (_, t) in zip(calls, results):
+                elapsed[k] += t
+                calls_per_key[k] += 1
+            for k in handlers.keys():
+                stats.add_handler(k, elapsed[k], calls_per_key[k])
+
+        it = iter(results)
+        result = []
+        for e in data:
+            row = {}
+            for k, v in e.items():
+                row[k] = next(it)[0] if k in handlers else v
+            result.append(row)
+
+        return result
+
+    @staticmethod
+    def __call_handler(c: tuple[Any, str, Any, dict[str, Any]]) -> tuple[Any, float]:
+        handler, k, v, e = c
+        start = time.perf_counter()
+        value = handler(k, v, e)
+        return value, time.perf_counter() - start
+
+    @staticmethod
+    async def __call_handlers_async(
+        calls: list[tuple[Any, str, Any, dict[str, Any]]], concurrency: int
+    ) -> list[tuple[Any, float]]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(c: tuple[Any, str, Any, dict[str, Any]]) -> tuple[Any, float]:
+            handler, k, v, e = c
+            async with semaphore:
+                start = time.perf_counter()
+                value = handler(k, v, e)
+                if inspect.isawaitable(value):
+                    value = await value
+                return value, time.perf_counter() - start
+
+        return await asyncio.gather(*[call(c) for c in calls])
+
+    def __pre_process(self, data: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        stats = self.get_stats()
+        if stats is None:
+            data = self.__replace_column_name(data, self.get_replace_table())
+            data = self.__apply_initialization_table(
+                data, self.get_initialization_table()
+            )
+            for join in self.get_joins():
+                data = join.apply(data)
+            data = self.__execute_handler_table(
+                data, self.get_handlers(), None, self.get_handler_concurrency()
+            )
+            return data
+
+        start = time.perf_counter()
+        data = self.__replace_column_name(data, self.get_replace_table())
+        stats.add_stage("replace", time.perf_counter() - start, len(data))
+
+        start = time.perf_counter()
         data = self.__apply_initialization_table(data, self.get_initialization_table())
-        data = self.__execute_handler_table(data, self.get_handlers())
+        stats.add_stage("init", time.perf_counter() - start, len(data))
+
+        if len(self.get_joins()) > 0:
+            start = time.perf_counter()
+            for join in self.get_joins():
+                data = join.apply(data)
+            stats.add_stage("join", time.perf_counter() - start, len(data))
+
+        start = time.perf_counter()
+        data = self.__execute_handler_table(
+            data, self.get_handlers(), stats, self.get_handler_concurrency()
+        )
+        stats.add_stage("handlers", time.perf_counter() - start, len(data))
+
         return data
 
-    def process(self, converter: Converter) -> list[str]:
+    def process(self, converter: Converter, chunk_size: int = 1000) -> list[str]:
         """Execute convert process
 
+        Rows are pre-processed and converted chunk by chunk with
+        `Converter.convert_many`. When loaded lazily, the source data is
+        streamed without being materialized. When `order_by` is set, all rows
+        are pre-processed and sorted before conversion.
+
         Args:
             converter (Converter): Instance of inherited the Converter class
+            chunk_size (int, optional): Number of rows converted at once. Defaults to 1000.
 
         Returns:
-            list[str]: Convert result
+            list[str]: Convert result. Each element is the pre data, one converted row or the post data, ending with a newline.
         """
-        data = self.__pre_process()
-        if len(data) <= 0:
-            return []
+        if chunk_size <= 0:
+            raise Exception("chunk_size must be positive: {}".format(chunk_size))
 
-        result = []
+        return list(
+            self.__convert_chunks(converter, self.__iter_processed_chunks(chunk_size))
+        )
+
+    def process_many(
+        self, targets: list[tuple[Converter, str]], chunk_size: int = 1000
+    ) -> int:
+        """Execute convert process writing to several outputs in one pass
+
+        Rows are pre-processed once, and each chunk is converted by all
+        converters and written to their output files. Each output has its own
+        pre data, post data and delimiters.
+
+        Args:
+            targets (list[tuple[Converter, str]]): Pairs of instance of inherited the Converter class and output filepath
+            chunk_size (int, optional): Number of rows processed at once. Defaults to 1000.
+
+        Returns:
+            int: Number of written rows per output
+        """
+        if len(targets) <= 0:
+            raise Exception("targets must not be empty")
+        if chunk_size <= 0:
+            raise Exception("chunk_size must be positive: {}".format(chunk_size))
+
+        stats = self.get_stats()
+        elapsed = 0.0
+        rows = 0
+
+        sinks: list[ConverterSink] = []
+        try:
+            for converter, output_path in targets:
+                sinks.append(ConverterSink(converter, output_path))
+
+            for data in self.__iter_processed_chunks(chunk_size):
+                start = time.perf_counter()
+                for sink in sinks:
+                    sink.write(data)
+                elapsed += time.perf_counter() - start
+                rows += len(data)
+
+            start = time.perf_counter()
+        finally:
+            for sink in sinks:
+                sink.close()
+
+        if stats is not None:
+            elapsed += time.perf_counter() - start
+            stats.add_stage("convert", elapsed, rows)
+
+        return rows
 
-        pre = converter.pre_data(data[0])
-        if len(pre) > 0:
-            result.append("{}\n".format(pre))
+    def process_to_file(
+        self, converter: Converter, output_path: str, chunk_size: int = 1000
+    ) -> int:
+        """Execute convert process and write the result to the file
 
-        for e in data[:-1]:
-            result.append(
-                "{}{}\n".format(converter.convert(e), converter.get_delimiter())
+        Pre-processed rows are buffered within the memory budget and spilled
+        to a temporary directory beyond it, then streamed back and converted
+        chunk by chunk. When `order_by` is set, rows are sorted with an
+        external merge sort. Peak usage is recorded into the statistics.
+
+        Args:
+            converter (Converter): Instance of inherited the Converter class
+            output_path (str): Output filepath
+            chunk_size (int, optional): Number of rows processed at once. Defaults to 1000.
+
+        Returns:
+            int: Number of written rows
+        """
+        if chunk_size <= 0:
+            raise Exception("chunk_size must be positive: {}".format(chunk_size))
+
+        with self.__create_buffer() as buffer:
+            for chunk in self.__iter_source_chunks(chunk_size):
+                buffer.append(self.__pre_process(chunk))
+
+            with open(output_path, mode="w", encoding="utf8") as f:
+                f.writelines(
+                    self.__convert_chunks(converter, buffer.iter_chunks(chunk_size))
+                )
+
+            self.__record_memory(buffer)
+            return buffer.get_row_count()
+
+    def __record_memory(self, buffer: SpillBuffer | SortBuffer):
+        stats = self.get_stats()
+        if stats is None:
+            return
+
+        stats.set_memory("buffer_peak", buffer.get_peak_bytes())
+        stats.set_memory("spilled", buffer.get_spilled_bytes())
+        stats.set_memory("max_rss", get_max_rss())
+
+    def __convert_chunks(
+        self, converter: Converter, chunks: Iterable[list[dict[str, Any]]]
+    ) -> Iterator[str]:
+        stats = self.get_stats()
+        elapsed = 0.0
+        rows = 0
+
+        first = None
+        pending: list[dict[str, Any]] = []
+        for data in chunks:
+            if len(data) <= 0:
+                continue
+
+            start = time.perf_counter()
+            if first is None:
+                first = data[0]
+                converter.prepare(data)
+                pre = converter.pre_data(first)
+                texts = ["{}\n".format(pre)] if len(pre) > 0 else []
+            else:
+                texts = converter.convert_each(pending)
+
+            elapsed += time.perf_counter() - start
+            rows += len(pending)
+            pending = data
+            yield from texts
+
+        if first is None:
+            return
+
+        start = time.perf_counter()
+        texts = converter.convert_each(pending, last=True)
+
+        post = converter.post_data(first)
+        if len(post) > 0:
+            texts.append("{}\n".format(post))
+
+        elapsed += time.perf_counter() - start
+        rows += len(pending)
+
+        if stats is not None:
+            stats.add_stage("convert", elapsed, rows)
+
+        yield from texts
+
+    def process_partitioned(
+        self,
+        converter: Converter,
+        output_path: str,
+        partitions: int | None = None,
+        key: str | None = None,
+        max_bytes: int | None = None,
+        chunk_size: int = 1000,
+    ) -> list[str]:
+        """Execute convert process writing rows into several files
+
+        Rows are partitioned by hash of the key column into `partitions`
+        files, or written in order into files of about `max_bytes` each (a
+        file is closed at the chunk boundary after reaching the size). Each
+        file has its own pre data, post data and last delimiter, so the files
+        can be loaded concurrently. The files are named by inserting the
+        partition number before the extension of `output_path`, e.g.
+        `output.0000.sql`. A load script is not supported, because each file
+        would infer its own types and repeat the table and index statements.
+
+        Args:
+            converter (Converter): Instance of inherited the Converter class
+            output_path (str): Base output filepath
+            partitions (int | None, optional): Number of files partitioned by hash of the key column. Defaults to None.
+            key (str | None, optional): Key column name after renaming. Required with `partitions`. Defaults to None.
+            max_bytes (int | None, optional): Target size of each file in bytes. Defaults to None.
+            chunk_size (int, optional): Number of rows processed at once. Defaults to 1000.
+
+        Raises:
+            Exception: Invalid partitioning
+
+        Returns:
+            list[str]: Written filepaths
+        """
+        if (partitions is None) == (max_bytes is None):
+            raise Exception("either partitions or max_bytes must be specified")
+        if isinstance(converter, SqlLoadScriptConverter):
+            raise Exception("load script is not supported with partitions")
+        if partitions is not None and (partitions <= 0 or key is None):
+            raise Exception(
+                "partitions must be positive with key: {}".format(partitions)
             )
+        if max_bytes is not None and max_bytes <= 0:
+            raise Exception("max_bytes must be positive: {}".format(max_bytes))
+        if chunk_size <= 0:
+            raise Exception("chunk_size must be positive: {}".format(chunk_size))
+
+        sinks: list[ConverterSink] = []
+        try:
+            if partitions is not None and key is not None:
+                self.__write_hash_partitions(
+                    converter, output_path, sinks, key, partitions, chunk_size
+                )
+            elif max_bytes is not None:
+                self.__write_size_partitions(
+                    converter, output_path, sinks, max_bytes, chunk_size
+                )
+        finally:
+            start = time.perf_counter()
+            for sink in sinks:
+                sink.close()
+            self.__add_convert_stage(time.perf_counter() - start, 0)
+
+        return [e.get_output_path() for e in sinks]
 
-        result.append(
-            "{}{}\n".format(converter.convert(data[-1]), converter.get_last_delimiter())
+    def __add_convert_stage(self, elapsed: float, rows: int):
+        stats = self.get_stats()
+        if stats is not None:
+            stats.add_stage("convert", elapsed, rows)
+
+    @staticmethod
+    def __open_partition(
+        converter: Converter, output_path: str, sinks: list[ConverterSink]
+    ) -> ConverterSink:
+        sink = ConverterSink(
+            converter, PyKombu.__get_partition_path(output_path, len(sinks))
         )
+        sinks.append(sink)
+        return sink
 
-        post = converter.post_data(data[0])
-        if len(post) > 0:
-            result.append("{}\n".format(post))
+    def __write_hash_partitions(
+        self,
+        converter: Converter,
+        output_path: str,
+        sinks: list[ConverterSink],
+        key: str,
+        partitions: int,
+        chunk_size: int,
+    ):
+        for _ in range(partitions):
+            PyKombu.__open_partition(converter, output_path, sinks)
+
+        for data in self.__iter_processed_chunks(chunk_size):
+            start = time.perf_counter()
+            for i, e in enumerate(PyKombu.__partition_rows(data, key, partitions)):
+                sinks[i].write(e)
+            self.__add_convert_stage(time.perf_counter() - start, len(data))
+
+    def __write_size_partitions(
+        self,
+        converter: Converter,
+        output_path: str,
+        sinks: list[ConverterSink],
+        max_bytes: int,
+        chunk_size: int,
+    ):
+        sink = PyKombu.__open_partition(converter, output_path, sinks)
+        for data in self.__iter_processed_chunks(chunk_size):
+            start = time.perf_counter()
+            if sink.get_byte_count() >= max_bytes:
+                sink.close()
+                sink = PyKombu.__open_partition(converter, output_path, sinks)
+            sink.write(data)
+            self.__add_convert_stage(time.perf_counter() - start, len(data))
+
+    @staticmethod
+    def __get_partition_path(output_path: str, index: int) -> str:
+        root, ext = os.path.splitext(output_path)
+        return "{}.{:04d}{}".format(root, index, ext)
+
+    @staticmethod
+    def __partition_rows(
+        data: list[dict[str, Any]], key: str, partitions: int
+    ) -> list[list[dict[str, Any]]]:
+        result: list[list[dict[str, Any]]] = [[] for _ in range(partitions)]
+        for row in data:
+            if key not in row:
+                raise Exception("{} not in row".format(key))
+            # stable across processes unlike hash() of str
+            encoded = DeltaIndex.encode_key(row[key]).encode("utf8")
+            result[zlib.crc32(encoded) % partitions].append(row)
 
         return result
+
+    def process_delta(
+        self,
+        converter: Converter,
+        output_path: str,
+        index_path: str,
+        key: str,
+        chunk_size: int = 1000,
+    ):
+        """Execute convert process writing only the difference from the previous run
+
+        Rows are compared with the snapshot in the index by the key column.
+        New rows are converted as inserts chunk by chunk, changed rows with
+        `Converter.convert_update` and vanished rows with
+        `Converter.convert_delete`. Changed rows are buffered within the
+        memory budget until the inserts are written. The snapshot is
+        replaced only after the output file is written.
+
+        Args:
+            converter (Converter): Instance of inherited the Converter class supporting update and delete
+            output_path (str): Output filepath
+            index_path (str): Index filepath. Created at the first run.
+            key (str): Key column name in the replace table
+            chunk_size (int, optional): Number of rows processed at once. Defaults to 1000.
+
+        Raises:
+            Exception: Key column is not in the replace table, or the converter does not support update and delete
+        """
+        if chunk_size <= 0:
+            raise Exception("chunk_size must be positive: {}".format(chunk_size))
+        if key not in self.get_replace_table().keys():
+            raise Exception("{} not in replace table".format(key))
+        if not converter.is_update_supported():
+            raise Exception(
+                "{} does not support update and delete".format(type(converter).__name__)
+            )
+
+        with DeltaIndex(index_path) as index, SpillBuffer(
+            self.get_memory_budget(), self.get_spill_dir()
+        ) as updates:
+            with open(output_path, mode="w", encoding="utf8") as f:
+                f.writelines(
+                    self.__convert_chunks(
+                        converter,
+                        self.__iter_delta_inserts(index, key, updates, chunk_size),
+                    )
+                )
+                f.writelines(
+                    self.__convert_changes(converter, index, key, updates, chunk_size)
+                )
+
+            index.commit()
+
+    def __iter_delta_inserts(
+        self, index: DeltaIndex, key: str, updates: SpillBuffer, chunk_size: int
+    ) -> Iterator[list[dict[str, Any]]]:
+        stats = self.get_stats()
+        elapsed = 0.0
+        rows = 0
+
+        for data in self.__iter_processed_chunks(chunk_size):
+            start = time.perf_counter()
+            inserts, chunk_updates = index.classify(data, key)
+            updates.append(chunk_updates)
+            elapsed += time.perf_counter() - start
+            rows += len(data)
+            yield inserts
+
+        if stats is not None:
+            stats.add_stage("delta", elapsed, rows)
+
+    def __convert_changes(
+        self,
+        converter: Converter,
+        index: DeltaIndex,
+        key: str,
+        updates: SpillBuffer,
+        chunk_size: int,
+    ) -> Iterator[str]:
+        stats = self.get_stats()
+        elapsed = 0.0
+        rows = 0
+        terminator = "{}\n".format(converter.get_last_delimiter())
+
+        start = time.perf_counter()
+        for data in updates.iter_chunks(chunk_size):
+            text = "".join(
+                "{}{}".format(converter.convert_update(e, key), terminator)
+                for e in data
+            )
+            elapsed += time.perf_counter() - start
+            rows += len(data)
+            yield text
+            start = time.perf_counter()
+
+        for v in index.iter_deleted_keys():
+            text = "{}{}".format(converter.convert_delete(key, v), terminator)
+            elapsed += time.perf_counter() - start
+            rows += 1
+            yield text
+            start = time.perf_counter()
+
+        if stats is not None:
+            stats.add_stage("convert", elapsed, rows)
+
+    def process_blocks(
+        self, converter: Converter, output_path: str, block_size: int = 65536
+    ) -> int:
+        """Execute convert process with a block-oriented converter
+
+        Each pre-processed chunk of `block_size` rows is written as one block,
+        so the whole table is never materialized unless it is already loaded.
+
+        Args:
+            converter (Converter): Instance of the Converter class implementing `convert_block`
+            output_path (str): Output filepath
+            block_size (int, optional): Number of rows per block. Defaults to 65536.
+
+        Returns:
+            int: Number of written rows
+        """
+        if block_size <= 0:
+            raise Exception("block_size must be positive: {}".format(block_size))
+
+        stats = self.get_stats()
+        row_count = 0
+        elapsed = 0.0
+
+        with open(output_path, mode="wb") as f:
+            for data in self.__iter_processed_chunks(block_size):
+                if len(data) <= 0:
+                    continue
+
+                start = time.perf_counter()
+                f.write(converter.convert_block(data))
+                elapsed += time.perf_counter() - start
+                row_count += len(data)
+
+        if stats is not None:
+            stats.add_stage("convert", elapsed, row_count)
+
+        return row_count
+
+    def process_sink(self, sink: Sink, chunk_size: int = 1000) -> int:
+        """Execute process and write pre-processed rows to the sink directly
+
+        The source is read, pre-processed and written chunk by chunk, so the
+        whole table is never materialized unless it is already loaded.
+
+        Args:
+            sink (Sink): Instance of inherited the Sink class
+            chunk_size (int, optional): Number of rows processed at once. Defaults to 1000.
+
+        Returns:
+            int: Number of written rows
+        """
+        if chunk_size <= 0:
+            raise Exception("chunk_size must be positive: {}".format(chunk_size))
+
+        stats = self.get_stats()
+        row_count = 0
+        elapsed = 0.0
+
+        try:
+            for data in self.__iter_processed_chunks(chunk_size):
+                start = time.perf_counter()
+                sink.write(data)
+                elapsed += time.perf_counter() - start
+                row_count += len(data)
+        finally:
+            start = time.perf_counter()
+            sink.close()
+            elapsed += time.perf_counter() - start
+
+        if stats is not None:
+            stats.add_stage("sink", elapsed, row_count)
+
+        return row_count
+
+    def process_resumable(
+        self,
+        converter: Converter,
+        output_path: str,
+        chunk_size: int = 10000,
+        resume: bool = False,
+    ):
+        """Execute convert process chunk by chunk with checkpoints
+
+        Each chunk is written to a numbered segment file in the work directory
+        (`<output_path>.parts`), and a checkpoint is recorded after each
+        segment. When `resume` is True, completed segments are skipped and
+        reading restarts from the checkpoint. Finally the segments are
+        concatenated into `output_path` and the work directory is removed.
+        Segments follow the source order, so `order_by` is not supported.
+
+        Args:
+            converter (Converter): Instance of inherited the Converter class
+            output_path (str): Output filepath
+            chunk_size (int, optional): Number of source rows per segment. Defaults to 10000.
+            resume (bool, optional): True: resume from the last checkpoint. Defaults to False.
+
+        Raises:
+            Exception: `order_by` is set
+        """
+        if self.get_order_by() is not None:
+            raise Exception("order_by is not supported with checkpoints")
+
+        work_dir = "{}.parts".format(output_path)
+        checkpoint_path = os.path.join(work_dir, PyKombu.__CheckpointName)
+
+        checkpoint: Checkpoint = {
+            "segment": 0,
+            "offset": 0,
+            "row_index": 0,
+            "pre": None,
+            "post": None,
+            "columns": None,
+        }
+        if resume and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, mode="r", encoding="utf8") as f:
+                checkpoint = json.load(f)
+
+            # restore the converter state set by pre_data (e.g. csv columns)
+            columns = checkpoint.get("columns")
+            if columns is not None:
+                converter.pre_data(dict.fromkeys(columns))
+        elif os.path.exists(work_dir):
+            shutil.rmtree(work_dir)
+        os.makedirs(work_dir, exist_ok=True)
+
+        reader = self.get_source_reader()
+        stats = self.get_stats()
+        start = time.perf_counter()
+
+        for offset, rows in reader.read_chunks(chunk_size, checkpoint["offset"]):
+            if stats is not None:
+                stats.add_stage("load", time.perf_counter() - start, len(rows))
+
+            data = self.__pre_process(rows)
+
+            start = time.perf_counter()
+            if checkpoint["pre"] is None and len(data) > 0:
+                converter.prepare(data)
+                checkpoint["pre"] = converter.pre_data(data[0])
+                checkpoint["post"] = converter.post_data(data[0])
+                checkpoint["columns"] = list(data[0].keys())
+
+            segment_path = os.path.join(
+                work_dir, PyKombu.__SegmentNameFormat.format(checkpoint["segment"])
+            )
+            PyKombu.__write_atomic(segment_path, converter.convert_many(data))
+
+            if stats is not None:
+                stats.add_stage("convert", time.perf_counter() - start, len(data))
+
+            checkpoint["segment"] += 1
+            checkpoint["offset"] = offset
+            checkpoint["row_index"] += len(rows)
+            PyKombu.__write_atomic(checkpoint_path, json.dumps(checkpoint))
+            start = time.perf_counter()
+
+        self.__concatenate_segments(converter, output_path, work_dir, checkpoint)
+        shutil.rmtree(work_dir)
+
+    @staticmethod
+    def __write_atomic(path: str, text: str):
+        tmp_path = "{}.tmp".format(path)
+        with open(tmp_path, mode="w", encoding="utf8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def __concatenate_segments(
+        converter: Converter,
+        output_path: str,
+        work_dir: str,
+        checkpoint: Checkpoint,
+    ):
+        with open(output_path, mode="wb") as out:
+            pre = checkpoint["pre"]
+            if pre is None:
+                return
+
+            if len(pre) > 0:
+                out.write("{}\n".format(pre).encode("utf8"))
+
+            for i in range(checkpoint["segment"]):
+                segment_path = os.path.join(
+                    work_dir, PyKombu.__SegmentNameFormat.format(i)
+                )
+                with open(segment_path, mode="rb") as f:
+                    shutil.copyfileobj(f, out)
+
+            # replace the delimiter of the last row
+            out.seek(
+                -len("{}\n".format(converter.get_delimiter()).encode("utf8")),
+                os.SEEK_END,
+            )
+            out.truncate()
+            out.write("{}\n".format(converter.get_last_delimiter()).encode("utf8"))
+
+            post = checkpoint["post"]
+            if post is not None and len(post) > 0:
+                out.write("{}\n".format(post).encode("utf8"))
+
+
+def create_converter(format_name: str, table_name: str, output_path: str) -> Converter:
+    """Create converter
+
+    Args:
+        format_name (str): Output format name (sql, bulk, csv or columnar)
+        table_name (str): Table name
+        output_path (str): Output filepath
+
+    Raises:
+        Exception: Unexpected format name
+
+    Returns:
+        Converter: Instance of inherited the Converter class
+    """
+    if format_name == "sql":
+        sql_converter = SqlConverter()
+        sql_converter.set_table_name(table_name)
+        return sql_converter
+
+    if format_name == "bulk":
+        bulk_converter = BulkSqlConverter()
+        bulk_converter.set_table_name(table_name)
+        return bulk_converter
+
+    if format_name == "csv":
+        csv_converter = CsvConverter()
+        csv_converter.set_filename(os.path.splitext(os.path.basename(output_path))[0])
+        csv_converter.set_table_name(table_name)
+        return csv_converter
+
+    if format_name == "columnar":
+        return ColumnarConverter()
+
+    raise Exception("{} is invalid format".format(format_name))
+
+
+def guess_format(output_path: str) -> str:
+    """Guess output format name by the file extension
+
+    Args:
+        output_path (str): Output filepath
+
+    Returns:
+        str: Output format name (csv, columnar, sqlite or sql)
+    """
+    _, ext = os.path.splitext(output_path)
+    return {
+        ".csv": "csv",
+        ".pkc": "columnar",
+        ".db": "sqlite",
+        ".sqlite": "sqlite",
+        ".sqlite3": "sqlite",
+    }.get(ext.lower(), "sql")
+
+
+def create_configured_converter(
+    format_name: str, output_path: str, args: argparse.Namespace
+) -> Converter:
+    """Create converter configured by command line arguments
+
+    Args:
+        format_name (str): Output format name (sql, bulk, csv or columnar)
+        output_path (str): Output filepath
+        args (argparse.Namespace): Parsed arguments
+
+    Returns:
+        Converter: Instance of inherited the Converter class
+    """
+    converter = create_converter(format_name, args.table, output_path)
+    converter.set_standard_json(args.standard_json)
+    if isinstance(converter, SqlConverterBase):
+        converter.set_upsert(args.upsert)
+        if args.dialect is not None:
+            converter.set_dialect({e.name.lower(): e for e in SqlDialect}[args.dialect])
+        if args.load_script:
+            return create_load_script_converter(
+                converter, args.primary_key, args.disable_keys, args.indexes
+            )
+    elif isinstance(converter, CsvConverter):
+        converter.set_csv_dialect(args.csv_dialect)
+        converter.set_null(args.null)
+
+    return converter
+
+
+def create_load_script_converter(
+    converter: SqlConverterBase,
+    primary_key: str | None,
+    disable_keys: bool,
+    indexes_path: str | None,
+) -> SqlLoadScriptConverter:
+    """Create load script converter wrapping the SQL converter
+
+    Args:
+        converter (SqlConverterBase): SQL converter
+        primary_key (str | None): Comma separated primary key column names
+        disable_keys (bool): True: disable keys during the load
+        indexes_path (str | None): Secondary indexes json filepath
+
+    Returns:
+        SqlLoadScriptConverter: Load script converter
+    """
+    result = SqlLoadScriptConverter(converter)
+    if primary_key is not None:
+        result.set_primary_key([e.strip() for e in primary_key.split(",")])
+    result.set_disable_keys(disable_keys)
+    if indexes_path is not None:
+        with open(indexes_path, mode="r", encoding="utf8") as f:
+            result.set_secondary_indexes(json.load(f))
+    return result
+
+
+def parse_size(text: str) -> int:
+    """Parse size with an optional K, M or G suffix
+
+    Args:
+        text (str): Size text, e.g. "512M"
+
+    Raises:
+        ValueError: Invalid size text
+
+    Returns:
+        int: Size in bytes
+    """
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3}
+    text = text.strip().upper().removesuffix("B")
+    unit = units.get(text[-1:], 1)
+    if unit != 1:
+        text = text[:-1]
+    if not text.isdigit():
+        raise ValueError("{} is invalid size".format(text))
+    return int(text) * unit
+
+
+def parse_sheet(text: str) -> str | int:
+    """Parse sheet name or index
+
+    Args:
+        text (str): Sheet text. Digits only: zero-based sheet index.
+
+    Returns:
+        str | int: Sheet name or sheet index
+    """
+    if text.isascii() and text.isdigit():
+        return int(text)
+    return text
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    """Create command line argument parser
+
+    Returns:
+        argparse.ArgumentParser: Argument parser
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", help="source json file")
+    parser.add_argument("replace", help="replace table json file")
+    parser.add_argument("output", help="output file")
+    parser.add_argument("--init", default=None, help="initialization table json file")
+    parser.add_argument("--handlers", default=None, help="handlers python script")
+    parser.add_argument("--table", default="table", help="table name")
+    parser.add_argument(
+        "--dialect",
+        default=None,
+        choices=[e.name.lower() for e in SqlDialect],
+        help="SQL dialect for escaping literals (sql and bulk only)",
+    )
+    parser.add_argument(
+        "--csv-dialect",
+        default=None,
+        choices=csv.list_dialects(),
+        help="write csv with csv.writer of this dialect (csv only)",
+    )
+    parser.add_argument(
+        "--null", default="", help="null representation with --csv-dialect"
+    )
+    parser.add_argument(
+        "--standard-json",
+        action="store_true",
+        help="convert list and dict values to standard json",
+    )
+    parser.add_argument(
+        "--sheet",
+        type=parse_sheet,
+        default=None,
+        help="sheet name, or zero-based sheet index when digits only (xlsx only)",
+    )
+    parser.add_argument(
+        "--filter", default=None, help="row filter conditions json file"
+    )
+    parser.add_argument(
+        "--joins",
+        default=None,
+        help="lookup joins json file ([{source, key, columns, on}]); source paths are relative to this file",
+    )
+    parser.add_argument(
+        "--format",
+        default=None,
+        choices=["sql", "bulk", "csv", "sqlite", "columnar"],
+        help="output format (default: by output file extension)",
+    )
+    parser.add_argument(
+        "--also",
+        action="append",
+        default=[],
+        help="also write to this file (sql or csv by extension) from the same pre-processing pass; repeatable",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="process chunk by chunk with checkpoints",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="resume from the last checkpoint (implies --chunk-size)",
+    )
+    parser.add_argument(
+        "--handler-concurrency",
+        type=int,
+        default=None,
+        help="max number of handler calls running concurrently",
+    )
+    parser.add_argument("--stats", default=None, help="statistics report json file")
+    parser.add_argument(
+        "--delta-index",
+        default=None,
+        help="emit only the difference from the previous run recorded in this index file (requires --delta-key)",
+    )
+    parser.add_argument(
+        "--delta-key", default=None, help="key column name for --delta-index"
+    )
+    parser.add_argument(
+        "--upsert", action="store_true", help="convert updates to upsert statements"
+    )
+    parser.add_argument(
+        "--load-script",
+        action="store_true",
+        help="wrap sql and bulk output in a load script with CREATE TABLE, transactions and session options",
+    )
+    parser.add_argument(
+        "--primary-key",
+        default=None,
+        help="comma separated primary key column names of CREATE TABLE with --load-script",
+    )
+    parser.add_argument(
+        "--disable-keys",
+        action="store_true",
+        help="disable keys during the load with --load-script (mysql only)",
+    )
+    parser.add_argument(
+        "--indexes",
+        default=None,
+        help="secondary indexes json file ({name: [columns]}) dropped and recreated with --load-script",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="cache parsed source data in this directory and reuse it while the source is unchanged",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=parse_size,
+        default=SourceCache.DefaultMaxBytes,
+        help="max total size of --cache-dir, e.g. 4G",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=parse_size,
+        default=None,
+        help="memory budget of buffered rows, e.g. 512M; rows beyond it are spilled to disk",
+    )
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=None,
+        help="write rows into this number of files by hash of --partition-key",
+    )
+    parser.add_argument(
+        "--partition-key", default=None, help="key column name for --partitions"
+    )
+    parser.add_argument(
+        "--partition-size",
+        type=parse_size,
+        default=None,
+        help="write rows into files of about this size, e.g. 64M",
+    )
+    parser.add_argument(
+        "--order-by",
+        default=None,
+        help="comma separated column names to sort output rows by",
+    )
+    parser.add_argument(
+        "--spill-dir", default=None, help="directory where spilled rows are written"
+    )
+    return parser
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments
+
+    Args:
+        argv (list[str] | None, optional): Arguments. Defaults to None (sys.argv).
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = create_argument_parser()
+    args = parser.parse_args(argv)
+    validate_output_modes(parser, args)
+    if args.delta_index is not None and args.delta_key is None:
+        parser.error("--delta-index requires --delta-key")
+    if args.delta_index is not None and (
+        args.format or guess_format(args.output)
+    ) not in ("sql", "bulk"):
+        parser.error("--delta-index supports sql and bulk outputs only")
+    if args.partitions is not None and args.partition_key is None:
+        parser.error("--partitions requires --partition-key")
+    if args.order_by is not None and args.resume:
+        parser.error("--order-by cannot be combined with --resume")
+    if len(args.also) > 0:
+        formats = [args.format or guess_format(args.output)]
+        formats.extend(guess_format(e) for e in args.also)
+        if any(e in ("sqlite", "columnar") for e in formats):
+            parser.error("--also supports sql, bulk and csv outputs only")
+        if (
+            args.delta_index is not None
+            or args.partitions is not None
+            or args.partition_size is not None
+            or args.resume
+            or args.memory_budget is not None
+        ):
+            parser.error(
+                "--also cannot be combined with --delta-index, --partitions, --partition-size, --resume or --memory-budget"
+            )
+    return args
+
+
+def validate_output_modes(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """Reject output modes which would silently ignore each other
+
+    Args:
+        parser (argparse.ArgumentParser): Parser reporting the error
+        args (argparse.Namespace): Parsed arguments
+    """
+    partitioned = args.partitions is not None or args.partition_size is not None
+    if (args.format or guess_format(args.output)) == "columnar" and (
+        partitioned or args.resume
+    ):
+        parser.error(
+            "columnar output cannot be combined with --partitions, --partition-size or --resume"
+        )
+    if args.delta_index is not None and (partitioned or args.resume):
+        parser.error(
+            "--delta-index cannot be combined with --partitions, --partition-size or --resume"
+        )
+    if partitioned and (args.resume or args.load_script):
+        parser.error(
+            "--partitions and --partition-size cannot be combined with --resume or --load-script"
+        )
+    # without --order-by, --chunk-size writes checkpoints and buffers no rows
+    checkpointed = args.resume or (
+        args.chunk_size is not None and args.order_by is None
+    )
+    if checkpointed and args.memory_budget is not None:
+        parser.error(
+            "--memory-budget cannot be combined with --resume, or with --chunk-size without --order-by"
+        )
+
+
+def load_joins(path: str) -> list[dict[str, Any]]:
+    """Load lookup join definitions
+
+    Sources of the joins are resolved against the directory of the json file.
+
+    Args:
+        path (str): Joins json filepath
+
+    Returns:
+        list[dict[str, Any]]: Join definitions
+    """
+    with open(path, mode="r", encoding="utf8") as f:
+        joins: list[dict[str, Any]] = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for e in joins:
+        if "source" in e:
+            e["source"] = os.path.join(base_dir, e["source"])
+    return joins
+
+
+def create_configured_pykombu(
+    args: argparse.Namespace, loader: Callable[..., PyKombu], stats: Stats | None
+) -> PyKombu:
+    """Load PyKombu configured by command line arguments
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+        loader (Callable[..., PyKombu]): Function loading PyKombu with the arguments of `PyKombu.load`
+        stats (Stats | None): Statistics. None to disable recording.
+
+    Returns:
+        PyKombu: Instance loaded lazily
+    """
+    row_filter = None
+    if args.filter is not None:
+        with open(args.filter, mode="r", encoding="utf8") as f:
+            row_filter = json.load(f)
+
+    kombu = loader(
+        args.source,
+        args.replace,
+        args.init,
+        args.handlers,
+        stats=stats,
+        lazy=True,
+        sheet=args.sheet,
+        row_filter=row_filter,
+        cache=(
+            SourceCache(args.cache_dir, args.cache_size)
+            if args.cache_dir is not None
+            else None
+        ),
+        joins=load_joins(args.joins) if args.joins is not None else None,
+    )
+    if args.handler_concurrency is not None:
+        kombu.set_handler_concurrency(args.handler_concurrency)
+    kombu.set_memory_budget(args.memory_budget)
+    kombu.set_spill_dir(args.spill_dir)
+    if args.order_by is not None:
+        kombu.set_order_by([e.strip() for e in args.order_by.split(",")])
+    return kombu
+
+
+def process_output(
+    kombu: PyKombu,
+    converter: Converter,
+    args: argparse.Namespace,
+    stats: Stats | None,
+) -> list[str]:
+    """Convert to the single output in the mode selected by command line arguments
+
+    Args:
+        kombu (PyKombu): Instance
+        converter (Converter): Instance of inherited the Converter class
+        args (argparse.Namespace): Parsed arguments
+        stats (Stats | None): Statistics. None to disable recording.
+
+    Returns:
+        list[str]: Messages to print
+    """
+    # sorting needs the whole table, so --order-by never writes checkpoints
+    resumable = args.resume or (args.chunk_size is not None and args.order_by is None)
+
+    if (args.format or guess_format(args.output)) == "columnar":
+        kombu.process_blocks(converter, args.output)
+    elif args.delta_index is not None:
+        kombu.process_delta(converter, args.output, args.delta_index, args.delta_key)
+    elif args.partitions is not None or args.partition_size is not None:
+        kombu.process_partitioned(
+            converter,
+            args.output,
+            partitions=args.partitions,
+            key=args.partition_key,
+            max_bytes=args.partition_size,
+            chunk_size=args.chunk_size or 1000,
+        )
+    elif resumable:
+        kombu.process_resumable(
+            converter,
+            args.output,
+            chunk_size=args.chunk_size or 10000,
+            resume=args.resume,
+        )
+    elif args.memory_budget is not None:
+        memory_stats = stats if stats is not None else Stats()
+        kombu.set_stats(memory_stats)
+        kombu.process_to_file(
+            converter, args.output, chunk_size=args.chunk_size or 1000
+        )
+        memory = memory_stats.get_memory()
+        return [
+            "peak buffer: {} bytes, spilled: {} bytes, max rss: {} bytes".format(
+                memory["buffer_peak"], memory["spilled"], memory["max_rss"]
+            )
+        ]
+    else:
+        r = kombu.process(converter, chunk_size=args.chunk_size or 1000)
+        with open(args.output, mode="w", encoding="utf8") as f:
+            f.writelines(r)
+
+    return []
+
+
+def run(
+    args: argparse.Namespace, loader: Callable[..., PyKombu] = PyKombu.load
+) -> list[str]:
+    """Run conversion of parsed command line arguments
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+        loader (Callable[..., PyKombu], optional): Function loading PyKombu with the arguments of `PyKombu.load`. Defaults to PyKombu.load.
+
+    Returns:
+        list[str]: Messages to print
+    """
+    messages = []
+    format_name = args.format or guess_format(args.output)
+    stats = Stats() if args.stats is not None else None
+    kombu = create_configured_pykombu(args, loader, stats)
+
+    if format_name == "sqlite":
+        sink = SqliteSink(args.output)
+        sink.set_table_name(args.table)
+        kombu.process_sink(sink, chunk_size=args.chunk_size or 1000)
+    else:
+        converter = create_configured_converter(format_name, args.output, args)
+        targets = [(converter, args.output)] + [
+            (create_configured_converter(guess_format(e), e, args), e)
+            for e in args.also
+        ]
+        for e, _ in targets:
+            e.set_stats(stats)
+
+        if len(targets) > 1:
+            kombu.process_many(targets, chunk_size=args.chunk_size or 1000)
+        else:
+            messages.extend(process_output(kombu, converter, args, stats))
+
+        for e, _ in targets:
+            if isinstance(e, CsvConverter):
+                messages.append(e.get_load_data_statement())
+
+    if stats is not None:
+        stats.save_report(args.stats)
+
+    return messages
+
+
+def main(argv: list[str] | None = None):
+    for e in run(parse_arguments(argv)):
+        print(e)
+
+
+if __name__ == "__main__":
+    main()
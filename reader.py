@@ -0,0 +1,755 @@
+import codecs
+import csv
+import itertools
+import json
+import mmap
+import os.path
+import re
+import struct
+import sys
+from datetime import datetime, date, time
+import operator
+from typing import Any, Callable, Iterator
+
+from converter import ColumnarConverter
+
+
+class RowFilter(object):
+    """Declarative row predicate
+
+    Conditions map a source column name to an expected value, or to a dict of
+    operator and operand. A row is accepted when all conditions are true.
+
+    ```json
+    {
+      "tenant_id": 5,
+      "age": {">=": 20, "<": 65},
+      "code": {"in": ["A", "B"]}
+    }
+    ```
+    """
+
+    Operators: dict[str, Callable[[Any, Any], bool]] = {
+        "==": operator.eq,
+        "!=": operator.ne,
+        "<": operator.lt,
+        "<=": operator.le,
+        ">": operator.gt,
+        ">=": operator.ge,
+        "in": lambda a, b: a in b,
+        "not in": lambda a, b: a not in b,
+    }
+
+    def __init__(self, conditions: dict[str, Any]):
+        self.__conditions = conditions
+        self.__compiled: list[tuple[str, Callable[[Any, Any], bool], Any]] = []
+        for k, v in conditions.items():
+            if not isinstance(v, dict):
+                self.__compiled.append((k, operator.eq, v))
+                continue
+
+            for op, operand in v.items():
+                if op not in RowFilter.Operators:
+                    raise Exception("{} is invalid operator".format(op))
+                if op in ("in", "not in"):
+                    operand = set(operand)
+                self.__compiled.append((k, RowFilter.Operators[op], operand))
+
+    def get_conditions(self) -> dict[str, Any]:
+        """Get conditions
+
+        Returns:
+            dict[str, Any]: Conditions
+        """
+        return self.__conditions
+
+    def get_columns(self) -> list[str]:
+        """Get column names referenced by the conditions
+
+        Returns:
+            list[str]: Column names
+        """
+        return list(self.__conditions.keys())
+
+    def __call__(self, row: dict[str, Any]) -> bool:
+        for k, op, operand in self.__compiled:
+            try:
+                if not op(row.get(k), operand):
+                    return False
+            except TypeError:
+                # e.g. comparison between None and int
+                return False
+        return True
+
+
+class SourceReader(object):
+    """Source reader base class
+
+    Rows are read chunk by chunk. Each chunk is addressed by an offset at
+    which reading resumes, so reading can be restarted from any returned
+    offset.
+    """
+
+    ChunkSize = 1000
+
+    def __init__(self, file_path: str):
+        self.__file_path = file_path
+        self.set_row_filter(None)
+        self.set_columns(None)
+
+    def get_file_path(self) -> str:
+        """Get source filepath
+
+        Returns:
+            str: Source filepath
+        """
+        return self.__file_path
+
+    def get_row_filter(self) -> Callable[[dict[str, Any]], bool] | None:
+        """Get row predicate applied as rows are read
+
+        Returns:
+            Callable[[dict[str, Any]], bool] | None: Row predicate. None to accept all rows.
+        """
+        return self.__row_filter
+
+    def set_row_filter(self, row_filter: Callable[[dict[str, Any]], bool] | None):
+        """Set row predicate applied as rows are read
+
+        Args:
+            row_filter (Callable[[dict[str, Any]], bool] | None): Row predicate. None to accept all rows.
+        """
+        self.__row_filter = row_filter
+
+    def get_columns(self) -> list[str] | None:
+        """Get columns kept as rows are read
+
+        Returns:
+            list[str] | None: Column names. None to keep all columns.
+        """
+        return self.__columns
+
+    def set_columns(self, columns: list[str] | None):
+        """Set columns kept as rows are read
+
+        Args:
+            columns (list[str] | None): Column names. None to keep all columns.
+        """
+        self.__columns = columns
+
+    def _select(
+        self, rows: list[dict[str, Any]], project: bool = True
+    ) -> list[dict[str, Any]]:
+        row_filter = self.get_row_filter()
+        if row_filter is not None:
+            rows = [e for e in rows if row_filter(e)]
+
+        columns = self.get_columns()
+        if project and columns is not None:
+            # keep the column order of the source
+            selected = set(columns)
+            rows = [{k: v for k, v in e.items() if k in selected} for e in rows]
+
+        return rows
+
+    def read(self) -> list[dict[str, Any]]:
+        """Read all rows
+
+        Returns:
+            list[dict[str, Any]]: Table data
+        """
+        return list(self.iter_rows())
+
+    def iter_rows(self) -> Iterator[dict[str, Any]]:
+        """Iterate rows without materializing the table
+
+        Yields:
+            dict[str, Any]: Row
+        """
+        for _, rows in self.read_chunks(self.ChunkSize):
+            yield from rows
+
+    def read_chunks(
+        self, chunk_size: int, offset: int = 0
+    ) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        """Read rows chunk by chunk
+
+        Args:
+            chunk_size (int): Max number of rows per chunk
+            offset (int, optional): Offset returned by a previous chunk. Defaults to 0 (beginning of the source).
+
+        Raises:
+            NotImplementedError: When called directly this method.
+
+        Yields:
+            tuple[int, list[dict[str, Any]]]: Offset to resume after this chunk, and rows of this chunk
+        """
+        raise NotImplementedError
+
+
+class JsonTokenizer(object):
+    """Incremental tokenizer of a json file read block by block
+
+    Decoded text is buffered until `consume` is called, so the byte offset of
+    the next token is always known.
+    """
+
+    __BlockSize = 1024 * 1024
+    __TokenRe = re.compile(r"[^ \t\n\r]")
+
+    def __init__(self, f: Any, file_path: str, encoding: str):
+        self.__file = f
+        self.__file_path = file_path
+        self.__encoding = encoding
+        self.__text_decoder = codecs.getincrementaldecoder(encoding)()
+        self.__json_decoder = json.JSONDecoder()
+        self.__buf = ""
+        self.__pos = 0
+        self.__eof = False
+
+    def __fill(self) -> bool:
+        if self.__eof:
+            return False
+        block = self.__file.read(self.__BlockSize)
+        self.__eof = len(block) <= 0
+        self.__buf += self.__text_decoder.decode(block, final=self.__eof)
+        return True
+
+    def skip_bom(self):
+        """Skip byte order mark at the beginning of the file"""
+        if self.__fill() and self.__buf.startswith(
+            codecs.BOM_UTF8.decode(self.__encoding)
+        ):
+            self.__pos = 1
+
+    def peek(self) -> str | None:
+        """Get next non-whitespace character without consuming it
+
+        Returns:
+            str | None: Character. None at the end of the file.
+        """
+        while True:
+            match = self.__TokenRe.search(self.__buf, self.__pos)
+            if match is not None:
+                self.__pos = match.start()
+                return self.__buf[self.__pos]
+
+            self.__pos = len(self.__buf)
+            if not self.__fill():
+                return None
+
+    def expect(self, c: str):
+        """Consume expected character
+
+        Args:
+            c (str): Character
+
+        Raises:
+            Exception: Unexpected character
+        """
+        if self.peek() != c:
+            raise Exception(
+                "{} is invalid format: '{}' is expected".format(self.__file_path, c)
+            )
+        self.__pos += 1
+
+    def decode(self) -> Any:
+        """Decode next json value
+
+        Returns:
+            Any: Value
+        """
+        self.peek()
+        while True:
+            try:
+                value, self.__pos = self.__json_decoder.raw_decode(
+                    self.__buf, self.__pos
+                )
+                return value
+            except json.JSONDecodeError:
+                if not self.__fill():
+                    raise
+
+    def consume(self) -> int:
+        """Drop buffered text already tokenized
+
+        Returns:
+            int: Number of dropped bytes
+        """
+        size = len(self.__buf[: self.__pos].encode(self.__encoding))
+        self.__buf = self.__buf[self.__pos :]
+        self.__pos = 0
+        return size
+
+
+class JsonSourceReader(SourceReader):
+    """Chunk-addressable reader for the source json file exported by DBeaver
+
+    The source json file is read incrementally, so the whole table is never
+    materialized. Offsets are byte offsets in the file.
+    """
+
+    __Encoding = "utf8"
+
+    def read(self) -> list[dict[str, Any]]:
+        """Read all rows
+
+        Returns:
+            list[dict[str, Any]]: Table data
+        """
+        with open(self.get_file_path(), mode="r", encoding=self.__Encoding) as f:
+            loaded_json = json.load(f)
+
+            if len(loaded_json.keys()) <= 0:
+                raise Exception("{} is maybe empty".format(self.get_file_path()))
+
+            first_key = list(loaded_json.keys())[0]
+            return self._select(loaded_json[first_key])
+
+    def read_chunks(
+        self, chunk_size: int, offset: int = 0
+    ) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        """Read rows chunk by chunk
+
+        Args:
+            chunk_size (int): Max number of rows per chunk
+            offset (int, optional): Byte offset returned by a previous chunk. Defaults to 0 (beginning of the file).
+
+        Raises:
+            Exception: Unexpected format
+
+        Yields:
+            tuple[int, list[dict[str, Any]]]: Byte offset to resume after this chunk, and rows of this chunk
+        """
+        if chunk_size <= 0:
+            raise Exception("chunk_size must be positive: {}".format(chunk_size))
+
+        with open(self.get_file_path(), mode="rb") as f:
+            f.seek(offset)
+            tokenizer = JsonTokenizer(f, self.get_file_path(), self.__Encoding)
+            if offset == 0 and not self.__read_header(tokenizer):
+                return
+
+            first = offset == 0
+            base = offset
+            while True:
+                rows = self.__read_rows(tokenizer, chunk_size, first)
+                if len(rows) <= 0:
+                    return
+
+                first = False
+                base += tokenizer.consume()
+                yield base, self._select(rows)
+
+    @staticmethod
+    def __read_header(tokenizer: JsonTokenizer) -> bool:
+        # {"<table name>": [
+        tokenizer.skip_bom()
+        tokenizer.expect("{")
+        tokenizer.decode()
+        tokenizer.expect(":")
+        tokenizer.expect("[")
+        return tokenizer.peek() != "]"
+
+    @staticmethod
+    def __read_rows(
+        tokenizer: JsonTokenizer, chunk_size: int, first: bool
+    ) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        while len(rows) < chunk_size:
+            if tokenizer.peek() in (None, "]"):
+                break
+            if not first:
+                tokenizer.expect(",")
+            first = False
+            rows.append(tokenizer.decode())
+
+        return rows
+
+
+class XlsxSourceReader(SourceReader):
+    """Streaming reader for xlsx file
+
+    The worksheet is read in read-only mode of openpyxl, so the sheet is never
+    materialized. The first row is the header. Offsets are numbers of data
+    rows already read.
+    """
+
+    def __init__(self, file_path: str, sheet: str | int | None = None):
+        super().__init__(file_path)
+        self.__sheet = sheet
+
+    def get_sheet(self) -> str | int | None:
+        """Get sheet to read
+
+        Returns:
+            str | int | None: Sheet name, sheet index or None for the active sheet
+        """
+        return self.__sheet
+
+    def read_chunks(
+        self, chunk_size: int, offset: int = 0
+    ) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        """Read rows chunk by chunk
+
+        Args:
+            chunk_size (int): Max number of rows per chunk
+            offset (int, optional): Number of data rows to skip. Defaults to 0.
+
+        Raises:
+            Exception: Unexpected sheet
+
+        Yields:
+            tuple[int, list[dict[str, Any]]]: Offset to resume after this chunk, and rows of this chunk
+        """
+        if chunk_size <= 0:
+            raise Exception("chunk_size must be positive: {}".format(chunk_size))
+
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(
+            self.get_file_path(), read_only=True, data_only=True
+        )
+        try:
+            worksheet = self.__select_worksheet(workbook)
+            header = next(worksheet.iter_rows(max_row=1, values_only=True), None)
+            if header is None:
+                return
+
+            # columns not kept are never copied into rows
+            selected = self.get_columns()
+            selected_set = set(selected or [])
+            columns = [
+                (i, "{}".format(e))
+                for i, e in enumerate(header)
+                if e is not None
+                and (selected is None or "{}".format(e) in selected_set)
+            ]
+
+            rows = []
+            position = offset
+            for v in worksheet.iter_rows(min_row=offset + 2, values_only=True):
+                position += 1
+                if all(e is None for e in v):
+                    continue
+
+                rows.append({k: v[p] if p < len(v) else None for p, k in columns})
+                if len(rows) >= chunk_size:
+                    yield position, self._select(rows, project=False)
+                    rows = []
+
+            if len(rows) > 0:
+                yield position, self._select(rows, project=False)
+        finally:
+            workbook.close()
+
+    def __select_worksheet(self, workbook: Any) -> Any:
+        sheet = self.get_sheet()
+        if sheet is None:
+            return workbook.active
+
+        if isinstance(sheet, int):
+            if not -len(workbook.worksheets) <= sheet < len(workbook.worksheets):
+                raise Exception(
+                    "sheet {} not in {}".format(sheet, self.get_file_path())
+                )
+            return workbook.worksheets[sheet]
+
+        if sheet not in workbook.sheetnames:
+            raise Exception("{} not in {}".format(sheet, self.get_file_path()))
+        return workbook[sheet]
+
+
+class CsvSourceReader(SourceReader):
+    """Streaming reader for the csv file exported by DBeaver
+
+    The first row is the header, and values are read as strings. Offsets are
+    numbers of data rows already read.
+    """
+
+    def read_chunks(
+        self, chunk_size: int, offset: int = 0
+    ) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        """Read rows chunk by chunk
+
+        Args:
+            chunk_size (int): Max number of rows per chunk
+            offset (int, optional): Number of data rows to skip. Defaults to 0.
+
+        Yields:
+            tuple[int, list[dict[str, Any]]]: Offset to resume after this chunk, and rows of this chunk
+        """
+        if chunk_size <= 0:
+            raise Exception("chunk_size must be positive: {}".format(chunk_size))
+
+        with open(
+            self.get_file_path(), mode="r", encoding="utf-8-sig", newline=""
+        ) as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+
+            # columns not kept are never copied into rows
+            selected = self.get_columns()
+            selected_set = set(selected or [])
+            columns = [
+                (i, e)
+                for i, e in enumerate(header)
+                if selected is None or e in selected_set
+            ]
+
+            rows = []
+            position = offset
+            for v in itertools.islice(reader, offset, None):
+                position += 1
+                if len(v) <= 0:
+                    continue
+
+                rows.append({k: v[p] if p < len(v) else None for p, k in columns})
+                if len(rows) >= chunk_size:
+                    yield position, self._select(rows, project=False)
+                    rows = []
+
+            if len(rows) > 0:
+                yield position, self._select(rows, project=False)
+
+
+def create_source_reader(
+    file_path: str, sheet: str | int | None = None
+) -> SourceReader:
+    """Create source reader by file extension
+
+    Args:
+        file_path (str): Source filepath
+        sheet (str | int | None, optional): Sheet name or index (xlsx only). Defaults to None.
+
+    Returns:
+        SourceReader: Instance of inherited the SourceReader class
+    """
+    _, ext = os.path.splitext(file_path)
+    if ext.lower() == ".xlsx":
+        return XlsxSourceReader(file_path, sheet)
+
+    if ext.lower() == ".csv":
+        return CsvSourceReader(file_path)
+
+    return JsonSourceReader(file_path)
+
+
+class ColumnarBlock:
+    """Block of the columnar file written by ColumnarConverter"""
+
+    def __init__(self, header: dict[str, Any], data: memoryview):
+        self.__header = header
+        self.__data = data
+        self.__columns = {e["name"]: e for e in header["columns"]}
+
+    def get_row_count(self) -> int:
+        """Get number of rows
+
+        Returns:
+            int: Number of rows
+        """
+        return int(self.__header["rows"])
+
+    def get_column_names(self) -> list[str]:
+        """Get column names
+
+        Returns:
+            list[str]: Column names
+        """
+        return list(self.__columns.keys())
+
+    def get_column_type(self, name: str) -> str:
+        """Get column type
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            str: Column type name
+        """
+        return str(self.__columns[name]["type"])
+
+    def __slice(self, column: dict[str, Any], key: str) -> memoryview:
+        offset, length = column[key]
+        return self.__data[offset : offset + length]
+
+    def get_null_bitmap(self, name: str) -> memoryview:
+        """Get null bitmap without copying
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            memoryview: Null bitmap. Bit i is set when row i is null.
+        """
+        return self.__slice(self.__columns[name], "nulls")
+
+    def get_raw_column(self, name: str) -> "memoryview[int] | memoryview[float]":
+        """Get column data without copying
+
+        int64 and float64 columns are cast to their item type. For dictionary
+        encoded columns, indices into the dictionary are returned.
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            memoryview[int] | memoryview[float]: Column data
+        """
+        column = self.__columns[name]
+        data = self.__slice(column, "data")
+        column_type = column["type"]
+        if column_type == ColumnarConverter.TypeInt:
+            return data.cast("q")
+        if column_type == ColumnarConverter.TypeFloat:
+            return data.cast("d")
+        if column_type == ColumnarConverter.TypeBool:
+            return data
+        return self.__get_indices(column)
+
+    def __get_indices(self, column: dict[str, Any]) -> memoryview:
+        return self.__slice(column, "data").cast("I")
+
+    def get_dictionary(self, name: str) -> list[str]:
+        """Get dictionary of the dictionary encoded column
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            list[str]: Dictionary
+        """
+        column = self.__columns[name]
+        offsets = self.__slice(column, "dict_offsets").cast("I")
+        blob = bytes(self.__slice(column, "dict"))
+        return [
+            blob[offsets[i] : offsets[i + 1]].decode("utf8")
+            for i in range(len(offsets) - 1)
+        ]
+
+    def get_column(self, name: str) -> list[Any]:
+        """Get column values
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            list[Any]: Column values. None for null.
+        """
+        column_type = self.get_column_type(name)
+        if column_type == ColumnarConverter.TypeBool:
+            values: list[Any] = [e != 0 for e in self.get_raw_column(name)]
+        elif column_type in (ColumnarConverter.TypeInt, ColumnarConverter.TypeFloat):
+            values = self.get_raw_column(name).tolist()
+        else:
+            dictionary: list[Any] = self.get_dictionary(name)
+            parse = {
+                ColumnarConverter.TypeStr: None,
+                ColumnarConverter.TypeJson: json.loads,
+                ColumnarConverter.TypeDatetime: datetime.fromisoformat,
+                ColumnarConverter.TypeDate: date.fromisoformat,
+                ColumnarConverter.TypeTime: time.fromisoformat,
+            }[column_type]
+            if parse is not None:
+                dictionary = [parse(e) for e in dictionary]
+            values = [
+                dictionary[i] if len(dictionary) > 0 else None
+                for i in self.__get_indices(self.__columns[name])
+            ]
+
+        nulls = self.get_null_bitmap(name)
+        for i in range(len(values)):
+            if nulls[i >> 3] & (1 << (i & 7)):
+                values[i] = None
+        return values
+
+    def iter_rows(self) -> Iterator[dict[str, Any]]:
+        """Iterate rows
+
+        Yields:
+            dict[str, Any]: Row
+        """
+        names = self.get_column_names()
+        columns = [self.get_column(e) for e in names]
+        for values in zip(*columns):
+            yield dict(zip(names, values))
+
+
+class ColumnarReader:
+    """Reader for the columnar file written by ColumnarConverter
+
+    The file is memory-mapped, so columns can be scanned without parsing.
+    """
+
+    def __init__(self, file_path: str):
+        if sys.byteorder != "little":
+            raise Exception("big endian platform is not supported")
+
+        self.__file = open(file_path, mode="rb")
+        self.__mmap: mmap.mmap | None = None
+        try:
+            self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file can not be mapped
+            pass
+
+    def __enter__(self) -> "ColumnarReader":
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
+
+    def close(self):
+        """Release the mapping
+
+        Memoryviews returned by blocks must be released before closing.
+        """
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+        self.__file.close()
+
+    def iter_blocks(self) -> Iterator[ColumnarBlock]:
+        """Iterate blocks
+
+        Raises:
+            Exception: Unexpected format
+
+        Yields:
+            ColumnarBlock: Block
+        """
+        if self.__mmap is None:
+            return
+
+        view = memoryview(self.__mmap)
+        header_size = struct.calcsize(ColumnarConverter.HeaderFormat)
+        alignment = ColumnarConverter.Alignment
+        pos = 0
+        while pos < len(view):
+            magic, header_length = struct.unpack_from(
+                ColumnarConverter.HeaderFormat, view, pos
+            )
+            if magic != ColumnarConverter.Magic:
+                raise Exception("invalid block at {}".format(pos))
+
+            pos += header_size
+            header = json.loads(bytes(view[pos : pos + header_length]))
+            pos += header_length
+            pos += -pos % alignment
+
+            yield ColumnarBlock(header, view[pos : pos + header["size"]])
+            pos += header["size"]
+
+    def read(self) -> list[dict[str, Any]]:
+        """Read all rows
+
+        Returns:
+            list[dict[str, Any]]: Table data
+        """
+        result: list[dict[str, Any]] = []
+        for block in self.iter_blocks():
+            result.extend(block.iter_rows())
+        return result
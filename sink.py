@@ -0,0 +1,301 @@
+import json
+import os
+import sqlite3
+from typing import Any
+from datetime import datetime, date, time
+from converter import Converter
+
+
+class Sink(object):
+    """Sink base class
+
+    A sink receives pre-processed rows and stores them directly, without
+    converting them to text.
+    """
+
+    def write(self, rows: list[dict[str, Any]]):
+        """Write rows
+
+        Args:
+            rows (list[dict[str, Any]]): Pre-processed rows
+
+        Raises:
+            NotImplementedError: When called directly this method.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and release resources"""
+        pass
+
+
+class ConverterSink(Sink):
+    """Sink writing rows converted by the converter to the file
+
+    The pre data is written before the first row and the post data after the
+    last row, and the last row is followed by the last delimiter, so the file
+    is complete by itself. Without rows, the file is left empty.
+    """
+
+    def __init__(self, converter: Converter, output_path: str):
+        super().__init__()
+        self.__converter = converter
+        self.__output_path = output_path
+        self.__file: Any = open(output_path, mode="wb")
+        self.__first: dict[str, Any] | None = None
+        self.__row_count = 0
+
+    def get_converter(self) -> Converter:
+        """Get converter
+
+        Returns:
+            Converter: Instance of inherited the Converter class
+        """
+        return self.__converter
+
+    def get_output_path(self) -> str:
+        """Get output filepath
+
+        Returns:
+            str: Output filepath
+        """
+        return self.__output_path
+
+    def get_row_count(self) -> int:
+        """Get number of written rows
+
+        Returns:
+            int: Number of rows
+        """
+        return self.__row_count
+
+    def get_byte_count(self) -> int:
+        """Get number of written bytes
+
+        Returns:
+            int: Number of bytes
+        """
+        return self.__file.tell() if self.__file is not None else 0
+
+    def __write_text(self, text: str):
+        if len(text) > 0:
+            self.__file.write(text.encode("utf8"))
+
+    def write(self, rows: list[dict[str, Any]]):
+        """Write rows
+
+        Args:
+            rows (list[dict[str, Any]]): Pre-processed rows
+        """
+        if len(rows) <= 0:
+            return
+
+        if self.__first is None:
+            self.__first = rows[0]
+            self.__converter.prepare(rows)
+            pre = self.__converter.pre_data(self.__first)
+            if len(pre) > 0:
+                self.__write_text("{}\n".format(pre))
+
+        self.__write_text(self.__converter.convert_many(rows))
+        self.__row_count += len(rows)
+
+    def close(self):
+        """Write the last rows and the post data, and close the file"""
+        if self.__file is None:
+            return
+
+        if self.__first is not None:
+            # replace the delimiter of the last row
+            self.__file.seek(
+                -len("{}\n".format(self.__converter.get_delimiter()).encode("utf8")),
+                os.SEEK_END,
+            )
+            self.__file.truncate()
+            self.__write_text("{}\n".format(self.__converter.get_last_delimiter()))
+
+            post = self.__converter.post_data(self.__first)
+            if len(post) > 0:
+                self.__write_text("{}\n".format(post))
+
+        self.__file.close()
+        self.__file = None
+
+
+class SqliteSink(Sink):
+    """SQLite sink class inserting rows with executemany"""
+
+    DefaultPragmas: dict[str, Any] = {
+        "journal_mode": "OFF",
+        "synchronous": "OFF",
+        "temp_store": "MEMORY",
+        "cache_size": -64000,
+        "locking_mode": "EXCLUSIVE",
+    }
+
+    def __init__(self, db_path: str):
+        super().__init__()
+        self.__db_path = db_path
+        self.__connection: sqlite3.Connection | None = None
+        self.__columns: list[str] | None = None
+        self.__pending: list[tuple[Any, ...]] = []
+        self.set_table_name("")
+        self.set_batch_size(10000)
+        self.set_pragmas(dict(SqliteSink.DefaultPragmas))
+
+    def get_db_path(self) -> str:
+        """Get database filepath
+
+        Returns:
+            str: Database filepath
+        """
+        return self.__db_path
+
+    def get_table_name(self) -> str:
+        """Get table name
+
+        Returns:
+            str: Table name
+        """
+        return self.__table_name
+
+    def set_table_name(self, name: str):
+        """Set table name
+
+        Args:
+            name (str): Table name
+        """
+        self.__table_name = name
+
+    def get_batch_size(self) -> int:
+        """Get number of rows per transaction
+
+        Returns:
+            int: Number of rows per transaction
+        """
+        return self.__batch_size
+
+    def set_batch_size(self, size: int):
+        """Set number of rows per transaction
+
+        Args:
+            size (int): Number of rows per transaction
+        """
+        if size <= 0:
+            raise Exception("batch size must be positive: {}".format(size))
+        self.__batch_size = size
+
+    def get_pragmas(self) -> dict[str, Any]:
+        """Get pragmas applied on connect
+
+        Returns:
+            dict[str, Any]: Pragma name and its value
+        """
+        return self.__pragmas
+
+    def set_pragmas(self, pragmas: dict[str, Any]):
+        """Set pragmas applied on connect
+
+        Args:
+            pragmas (dict[str, Any]): Pragma name and its value
+        """
+        self.__pragmas = pragmas
+
+    @staticmethod
+    def quote_identifier(name: str) -> str:
+        """Quote identifier
+
+        Args:
+            name (str): Identifier
+
+        Returns:
+            str: Quoted identifier
+        """
+        return '"{}"'.format(name.replace('"', '""'))
+
+    @staticmethod
+    def to_parameter(value: Any) -> Any:
+        """Convert to a value bindable as a SQLite parameter
+
+        Args:
+            value (Any): Source value
+
+        Raises:
+            Exception: Unexpected type
+
+        Returns:
+            Any: Bindable value
+        """
+        if value is None or isinstance(value, (bool, int, float, str, bytes)):
+            return value
+
+        if isinstance(value, datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S")
+
+        if isinstance(value, (date, time)):
+            return value.isoformat()
+
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False, default=str)
+
+        raise Exception("{} is invalid type".format(value))
+
+    def __connect(self, columns: list[str]) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.get_db_path(), isolation_level=None)
+        for k, v in self.get_pragmas().items():
+            connection.execute("PRAGMA {} = {}".format(k, v))
+
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS {} ({})".format(
+                self.quote_identifier(self.get_table_name()),
+                ", ".join(self.quote_identifier(e) for e in columns),
+            )
+        )
+        return connection
+
+    def __flush(self):
+        if len(self.__pending) <= 0 or self.__connection is None:
+            return
+
+        columns = self.__columns or []
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            self.quote_identifier(self.get_table_name()),
+            ", ".join(self.quote_identifier(e) for e in columns),
+            ", ".join("?" for _ in columns),
+        )
+        self.__connection.execute("BEGIN")
+        self.__connection.executemany(sql, self.__pending)
+        self.__connection.execute("COMMIT")
+        self.__pending = []
+
+    def write(self, rows: list[dict[str, Any]]):
+        """Write rows
+
+        Rows are buffered and inserted in one transaction per batch.
+
+        Args:
+            rows (list[dict[str, Any]]): Pre-processed rows
+        """
+        if len(rows) <= 0:
+            return
+
+        if self.__connection is None:
+            self.__columns = list(rows[0].keys())
+            self.__connection = self.__connect(self.__columns)
+
+        columns = self.__columns or []
+        to_parameter = self.to_parameter
+        batch_size = self.get_batch_size()
+        for row in rows:
+            self.__pending.append(tuple(to_parameter(row.get(k)) for k in columns))
+            if len(self.__pending) >= batch_size:
+                self.__flush()
+
+    def close(self):
+        """Insert buffered rows and close the connection"""
+        if self.__connection is None:
+            return
+
+        self.__flush()
+        self.__connection.close()
+        self.__connection = None
@@ -0,0 +1,427 @@
+import heapq
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from typing import Any, Callable, Iterable, Iterator
+
+
+def get_max_rss() -> int:
+    """Get peak resident set size of this process
+
+    Returns:
+        int: Peak resident set size in bytes. 0 when not available.
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def estimate_row_size(row: dict[str, Any]) -> int:
+    """Estimate memory size of the row
+
+    Args:
+        row (dict[str, Any]): Row
+
+    Returns:
+        int: Estimated size in bytes
+    """
+    getsizeof = sys.getsizeof
+    return getsizeof(row) + sum(map(getsizeof, row.values()))
+
+
+def to_frames(
+    rows: list[dict[str, Any]],
+) -> list[tuple[tuple[str, ...], list[tuple[Any, ...]]]]:
+    """Convert rows to compact frames
+
+    Consecutive rows with the same columns share one column tuple.
+
+    Args:
+        rows (list[dict[str, Any]]): Rows
+
+    Returns:
+        list[tuple[tuple[str, ...], list[tuple[Any, ...]]]]: Column names and value tuples
+    """
+    frames: list[tuple[tuple[str, ...], list[tuple[Any, ...]]]] = []
+    keys: tuple[str, ...] | None = None
+    for row in rows:
+        row_keys = tuple(row.keys())
+        if row_keys != keys:
+            keys = row_keys
+            frames.append((keys, []))
+        frames[-1][1].append(tuple(row.values()))
+
+    return frames
+
+
+def from_frames(
+    frames: list[tuple[tuple[str, ...], list[tuple[Any, ...]]]],
+) -> Iterator[dict[str, Any]]:
+    """Iterate rows of frames made by `to_frames`
+
+    Args:
+        frames (list[tuple[tuple[str, ...], list[tuple[Any, ...]]]]): Column names and value tuples
+
+    Yields:
+        dict[str, Any]: Row
+    """
+    for keys, values in frames:
+        for v in values:
+            yield dict(zip(keys, v))
+
+
+def dump_rows(rows: list[dict[str, Any]], f: Any):
+    """Write rows to the binary file as one pickled frame
+
+    Args:
+        rows (list[dict[str, Any]]): Rows
+        f (Any): Binary file object
+    """
+    pickle.dump(to_frames(rows), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def iter_load_rows(f: Any, end: int) -> Iterator[dict[str, Any]]:
+    """Iterate rows written with `dump_rows` from the current position
+
+    Args:
+        f (Any): Binary file object
+        end (int): End position of the frames
+
+    Yields:
+        dict[str, Any]: Row
+    """
+    while f.tell() < end:
+        yield from from_frames(pickle.load(f))
+
+
+def chunk_rows(
+    rows: Iterable[dict[str, Any]], chunk_size: int
+) -> Iterator[list[dict[str, Any]]]:
+    """Group rows into chunks
+
+    Args:
+        rows (Iterable[dict[str, Any]]): Rows
+        chunk_size (int): Max number of rows per chunk
+
+    Yields:
+        list[dict[str, Any]]: Rows
+    """
+    chunk: list[dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if len(chunk) > 0:
+        yield chunk
+
+
+class SpillBuffer(object):
+    """Row buffer spilling to disk beyond the memory budget
+
+    Rows are kept in memory until their estimated size exceeds the budget.
+    Then the buffered rows are written to a temporary file as pickled frames,
+    where consecutive rows with the same columns share one column tuple.
+    Rows are streamed back in the appended order.
+    """
+
+    def __init__(self, budget: int | None, directory: str | None = None):
+        """Constructor
+
+        Args:
+            budget (int | None): Memory budget in bytes. None: never spill.
+            directory (str | None, optional): Parent directory of the temporary directory. Defaults to None (system default).
+        """
+        self.__budget = budget
+        self.__directory = directory
+        self.__temp_dir: str | None = None
+        self.__spill_file: Any = None
+        self.__rows: list[dict[str, Any]] = []
+        self.__bytes = 0
+        self.__peak_bytes = 0
+        self.__spilled_bytes = 0
+        self.__spilled_rows = 0
+
+    def __enter__(self) -> "SpillBuffer":
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
+
+    def get_row_count(self) -> int:
+        """Get number of appended rows
+
+        Returns:
+            int: Number of rows
+        """
+        return self.__spilled_rows + len(self.__rows)
+
+    def get_peak_bytes(self) -> int:
+        """Get peak estimated size of rows held in memory
+
+        Returns:
+            int: Peak size in bytes
+        """
+        return self.__peak_bytes
+
+    def get_spilled_bytes(self) -> int:
+        """Get size of spilled data on disk
+
+        Returns:
+            int: Spilled size in bytes
+        """
+        return self.__spilled_bytes
+
+    def append(self, rows: list[dict[str, Any]]):
+        """Append rows
+
+        Args:
+            rows (list[dict[str, Any]]): Rows
+        """
+        if len(rows) <= 0:
+            return
+
+        self.__rows.extend(rows)
+        if self.__budget is None:
+            return
+
+        self.__bytes += sum(map(estimate_row_size, rows))
+        self.__peak_bytes = max(self.__peak_bytes, self.__bytes)
+        if self.__bytes > self.__budget:
+            self.__spill()
+
+    def __spill(self):
+        if self.__spill_file is None:
+            self.__temp_dir = tempfile.mkdtemp(prefix="pykombu-", dir=self.__directory)
+            self.__spill_file = open(
+                os.path.join(self.__temp_dir, "spill.bin"), mode="w+b"
+            )
+
+        dump_rows(self.__rows, self.__spill_file)
+        self.__spilled_bytes = self.__spill_file.tell()
+        self.__spilled_rows += len(self.__rows)
+        self.__rows = []
+        self.__bytes = 0
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[list[dict[str, Any]]]:
+        """Iterate rows chunk by chunk in the appended order
+
+        Args:
+            chunk_size (int): Max number of rows per chunk
+
+        Yields:
+            list[dict[str, Any]]: Rows
+        """
+        if self.__spill_file is not None:
+            self.__spill_file.flush()
+            self.__spill_file.seek(0)
+            yield from chunk_rows(
+                iter_load_rows(self.__spill_file, self.__spilled_bytes), chunk_size
+            )
+
+        for i in range(0, len(self.__rows), chunk_size):
+            yield self.__rows[i : i + chunk_size]
+
+    def close(self):
+        """Remove spilled data"""
+        if self.__spill_file is not None:
+            self.__spill_file.close()
+            self.__spill_file = None
+        if self.__temp_dir is not None:
+            shutil.rmtree(self.__temp_dir, ignore_errors=True)
+            self.__temp_dir = None
+        self.__rows = []
+
+
+def _order_value(value: Any) -> tuple[Any, ...]:
+    if value is None:
+        return (0,)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, type(value).__name__, str(value))
+
+
+def sort_key(columns: list[str]) -> Callable[[dict[str, Any]], tuple[Any, ...]]:
+    """Create a sort key function of rows
+
+    None is ordered before any other value, like NULL in ascending order of
+    MySQL. Values of different types never compare with each other: numbers
+    come before strings, and other values follow ordered by type name and text.
+
+    Args:
+        columns (list[str]): Column names to order by
+
+    Returns:
+        Callable[[dict[str, Any]], tuple[Any, ...]]: Key function
+    """
+
+    def key(row: dict[str, Any]) -> tuple[Any, ...]:
+        return tuple(_order_value(row[k]) for k in columns)
+
+    return key
+
+
+class SortBuffer(object):
+    """Row buffer sorting rows by columns with external merge sort
+
+    Rows are kept in memory until their estimated size exceeds the budget.
+    Then the buffered rows are sorted and written to a temporary file as a
+    sorted run. Finally the runs and the rows in memory are merged with a
+    k-way heap merge. Rows with equal keys keep the appended order.
+    """
+
+    __FrameSize = 1000
+
+    def __init__(
+        self, columns: list[str], budget: int | None, directory: str | None = None
+    ):
+        """Constructor
+
+        Args:
+            columns (list[str]): Column names to order by
+            budget (int | None): Memory budget in bytes. None: sort in memory.
+            directory (str | None, optional): Parent directory of the temporary directory. Defaults to None (system default).
+        """
+        if len(columns) <= 0:
+            raise Exception("columns must not be empty")
+
+        self.__columns = columns
+        self.__key = sort_key(columns)
+        self.__budget = budget
+        self.__directory = directory
+        self.__temp_dir: str | None = None
+        self.__runs: list[tuple[str, int]] = []
+        self.__rows: list[dict[str, Any]] = []
+        self.__bytes = 0
+        self.__peak_bytes = 0
+        self.__spilled_bytes = 0
+        self.__spilled_rows = 0
+
+    def __enter__(self) -> "SortBuffer":
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
+
+    def get_columns(self) -> list[str]:
+        """Get column names to order by
+
+        Returns:
+            list[str]: Column names
+        """
+        return self.__columns
+
+    def get_row_count(self) -> int:
+        """Get number of appended rows
+
+        Returns:
+            int: Number of rows
+        """
+        return self.__spilled_rows + len(self.__rows)
+
+    def get_run_count(self) -> int:
+        """Get number of sorted runs written to disk
+
+        Returns:
+            int: Number of runs
+        """
+        return len(self.__runs)
+
+    def get_peak_bytes(self) -> int:
+        """Get peak estimated size of rows held in memory
+
+        Returns:
+            int: Peak size in bytes
+        """
+        return self.__peak_bytes
+
+    def get_spilled_bytes(self) -> int:
+        """Get size of sorted runs on disk
+
+        Returns:
+            int: Spilled size in bytes
+        """
+        return self.__spilled_bytes
+
+    def append(self, rows: list[dict[str, Any]]):
+        """Append rows
+
+        Args:
+            rows (list[dict[str, Any]]): Rows
+
+        Raises:
+            ValueError: Column to order by is missing in a row
+        """
+        if len(rows) <= 0:
+            return
+
+        for row in rows:
+            for k in self.__columns:
+                if k not in row:
+                    raise ValueError("{} not in row".format(k))
+
+        self.__rows.extend(rows)
+        if self.__budget is None:
+            return
+
+        self.__bytes += sum(map(estimate_row_size, rows))
+        self.__peak_bytes = max(self.__peak_bytes, self.__bytes)
+        if self.__bytes > self.__budget:
+            self.__write_run()
+
+    def __write_run(self):
+        if self.__temp_dir is None:
+            self.__temp_dir = tempfile.mkdtemp(prefix="pykombu-", dir=self.__directory)
+
+        self.__rows.sort(key=self.__key)
+        path = os.path.join(self.__temp_dir, "{:08d}.run".format(len(self.__runs)))
+        with open(path, mode="wb") as f:
+            for i in range(0, len(self.__rows), self.__FrameSize):
+                dump_rows(self.__rows[i : i + self.__FrameSize], f)
+            size = f.tell()
+
+        self.__runs.append((path, size))
+        self.__spilled_bytes += size
+        self.__spilled_rows += len(self.__rows)
+        self.__rows = []
+        self.__bytes = 0
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[list[dict[str, Any]]]:
+        """Iterate rows chunk by chunk in sorted order
+
+        Args:
+            chunk_size (int): Max number of rows per chunk
+
+        Yields:
+            list[dict[str, Any]]: Rows
+        """
+        self.__rows.sort(key=self.__key)
+        if len(self.__runs) <= 0:
+            yield from chunk_rows(self.__rows, chunk_size)
+            return
+
+        files = [open(path, mode="rb") for path, _ in self.__runs]
+        try:
+            runs = [iter_load_rows(f, size) for f, (_, size) in zip(files, self.__runs)]
+            runs.append(iter(self.__rows))
+            yield from chunk_rows(heapq.merge(*runs, key=self.__key), chunk_size)
+        finally:
+            for f in files:
+                f.close()
+
+    def close(self):
+        """Remove sorted runs"""
+        if self.__temp_dir is not None:
+            shutil.rmtree(self.__temp_dir, ignore_errors=True)
+            self.__temp_dir = None
+        self.__runs = []
+        self.__rows = []
@@ -0,0 +1,107 @@
+import json
+from typing import Any
+
+
+class Stats:
+    """Conversion statistics class"""
+
+    def __init__(self):
+        self.__stages: dict[str, dict[str, Any]] = {}
+        self.__handlers: dict[str, dict[str, Any]] = {}
+        self.__cells: dict[str, int] = {}
+        self.__memory: dict[str, int] = {}
+
+    def add_stage(self, name: str, elapsed: float, rows: int):
+        """Add stage result
+
+        Args:
+            name (str): Stage name
+            elapsed (float): Wall time in seconds
+            rows (int): Number of processed rows
+        """
+        stage = self.__stages.setdefault(name, {"elapsed": 0.0, "rows": 0})
+        stage["elapsed"] += elapsed
+        stage["rows"] += rows
+
+    def add_handler(self, key: str, elapsed: float, calls: int = 1):
+        """Add handler result
+
+        Args:
+            key (str): Column name of the handler
+            elapsed (float): Wall time in seconds
+            calls (int, optional): Number of calls. Defaults to 1.
+        """
+        handler = self.__handlers.setdefault(key, {"elapsed": 0.0, "calls": 0})
+        handler["elapsed"] += elapsed
+        handler["calls"] += calls
+
+    def count_cell(self, type_name: str):
+        """Count converted cell
+
+        Args:
+            type_name (str): Type name of the cell value
+        """
+        self.__cells[type_name] = self.__cells.get(type_name, 0) + 1
+
+    def set_memory(self, name: str, value: int):
+        """Set memory usage
+
+        Args:
+            name (str): Memory usage name
+            value (int): Size in bytes
+        """
+        self.__memory[name] = value
+
+    def get_stages(self) -> dict[str, dict[str, Any]]:
+        """Get stage results
+
+        Returns:
+            dict[str, dict[str, Any]]: Stage name and its wall time and rows
+        """
+        return self.__stages
+
+    def get_handlers(self) -> dict[str, dict[str, Any]]:
+        """Get handler results
+
+        Returns:
+            dict[str, dict[str, Any]]: Column name and its wall time and calls
+        """
+        return self.__handlers
+
+    def get_cells(self) -> dict[str, int]:
+        """Get converted cell counts
+
+        Returns:
+            dict[str, int]: Type name and its count
+        """
+        return self.__cells
+
+    def get_memory(self) -> dict[str, int]:
+        """Get memory usages
+
+        Returns:
+            dict[str, int]: Memory usage name and its size in bytes
+        """
+        return self.__memory
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dict
+
+        Returns:
+            dict[str, Any]: Statistics
+        """
+        return {
+            "stages": self.get_stages(),
+            "handlers": self.get_handlers(),
+            "cells": self.get_cells(),
+            "memory": self.get_memory(),
+        }
+
+    def save_report(self, path: str):
+        """Save statistics as json
+
+        Args:
+            path (str): Report json filepath
+        """
+        with open(path, mode="w", encoding="utf8") as f:
+            json.dump(self.to_dict(), f, indent=2)
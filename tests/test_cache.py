@@ -0,0 +1,78 @@
+import json
+import os
+from datetime import datetime
+
+from cache import SourceCache
+from pykombu2 import PyKombu
+from reader import JsonSourceReader
+
+
+class TestSourceCache:
+    def test_store_and_read(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(json.dumps({"table": [{"id": 1}]}))
+        cache = SourceCache(str(tmp_path / "cache"))
+        key = cache.get_key(JsonSourceReader(str(src_path)))
+
+        chunks = [[{"id": 1, "name": "foo"}], [{"id": 2, "at": datetime(2022, 1, 2)}]]
+        assert not cache.contains(key)
+        assert chunks == list(cache.store(key, chunks))
+        assert cache.contains(key)
+        assert chunks == list(cache.iter_chunks(key))
+
+        src_path.write_text(json.dumps({"table": [{"id": 2}]}))
+        assert key != cache.get_key(JsonSourceReader(str(src_path)))
+
+    def test_discard_halfway(self, tmp_path):
+        cache = SourceCache(str(tmp_path))
+        it = cache.store("key", [[{"id": 1}], [{"id": 2}]])
+        next(it)
+        it.close()
+        assert not cache.contains("key")
+        assert [] == os.listdir(tmp_path)
+
+    def test_store_concurrently(self, tmp_path):
+        cache = SourceCache(str(tmp_path))
+        chunks = [[{"id": 1}], [{"id": 2}]]
+        first = cache.store("key", chunks)
+        second = cache.store("key", chunks)
+        for _ in chunks:
+            next(first)
+            next(second)
+
+        for it in (first, second):
+            assert [] == list(it)
+        assert chunks == list(cache.iter_chunks("key"))
+        assert ["key.cache"] == os.listdir(tmp_path)
+
+    def test_evict(self, tmp_path):
+        cache = SourceCache(str(tmp_path), max_bytes=300)
+        rows = [{"id": i} for i in range(20)]
+        for i in range(3):
+            list(cache.store("key{}".format(i), [rows]))
+            path = tmp_path / "key{}.cache".format(i)
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+
+        cache.evict()
+        assert not cache.contains("key0")
+        assert cache.contains("key2")
+        assert 300 >= sum(e.stat().st_size for e in tmp_path.iterdir())
+
+    def test_load(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": i, "bbb": str(i)} for i in range(10)]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa"}))
+        cache = SourceCache(str(tmp_path / "cache"))
+
+        expected = [{"aaa": i} for i in range(10)]
+        for lazy in (False, True, False, True):
+            kombu = PyKombu.load(
+                str(src_path), str(replace_path), lazy=lazy, cache=cache
+            )
+            assert expected == [
+                r for e in kombu._PyKombu__iter_source_chunks(3) for r in e
+            ]
+        assert 1 == len(os.listdir(tmp_path / "cache"))
@@ -0,0 +1,66 @@
+import json
+from datetime import datetime, date, time
+
+from converter import ColumnarConverter
+from pykombu2 import PyKombu
+from reader import ColumnarReader
+
+
+class TestColumnar:
+    def test_round_trip(self, tmp_path):
+        rows = [
+            {
+                "aaa": i,
+                "bbb": "foo{}".format(i % 3) if i % 4 else None,
+                "ccc": i / 2,
+                "ddd": i % 2 == 0,
+                "eee": datetime(2022, 1, 23, 12, 34, i),
+                "fff": date(2022, 1, i + 1),
+                "ggg": time(12, 34, i),
+                "hhh": [i, "x", None] if i % 5 else {"a": i},
+                "iii": None,
+            }
+            for i in range(10)
+        ]
+        rows[3]["aaa"] = None
+
+        path = tmp_path / "test.pkc"
+        converter = ColumnarConverter()
+        with open(path, mode="wb") as f:
+            f.write(converter.convert_block(rows[:6]))
+            f.write(converter.convert_block(rows[6:]))
+
+        with ColumnarReader(str(path)) as reader:
+            assert rows == reader.read()
+
+    def test_raw_column(self, tmp_path):
+        rows = [{"aaa": i, "bbb": "foo" if i % 2 else "bar"} for i in range(100)]
+
+        path = tmp_path / "test.pkc"
+        with open(path, mode="wb") as f:
+            f.write(ColumnarConverter().convert_block(rows))
+
+        reader = ColumnarReader(str(path))
+        block = next(reader.iter_blocks())
+        assert "int64" == block.get_column_type("aaa")
+        assert 4950 == sum(block.get_raw_column("aaa"))
+        assert ["bar", "foo"] == block.get_dictionary("bbb")
+        assert 50 == sum(block.get_raw_column("bbb"))
+        del block
+        reader.close()
+
+    def test_process_blocks(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": i, "bbb": str(i)} for i in range(10)]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+
+        path = tmp_path / "test.pkc"
+        kombu = PyKombu.load(str(src_path), str(replace_path), lazy=True)
+        assert 10 == kombu.process_blocks(ColumnarConverter(), str(path), block_size=4)
+
+        with ColumnarReader(str(path)) as reader:
+            assert [4, 4, 2] == [e.get_row_count() for e in reader.iter_blocks()]
+            assert [{"AAA": i, "BBB": str(i)} for i in range(10)] == reader.read()
@@ -1,6 +1,15 @@
 from datetime import datetime, date, time
 
-from converter import SqlConverter, CsvConverter
+from converter import (
+    Converter,
+    SqlConverter,
+    BulkSqlConverter,
+    CsvConverter,
+    SqlDialect,
+    SqlLoadScriptConverter,
+    SqlLiteral,
+)
+from stats import Stats
 
 
 class TestConverter:
@@ -43,3 +52,240 @@ class TestConverter:
 
         actual_body = converter.convert(source)
         assert expected_body == actual_body
+
+    def test_convert_many(self):
+        source = [
+            {"aaa": 0, "bbb": "foo", "ccc": None},
+            {"aaa": 1, "bbb": "bar", "ccc": [1, "x"]},
+            {"bbb": "baz", "aaa": 2},
+        ]
+        for converter in (SqlConverter(), BulkSqlConverter(), CsvConverter()):
+            expected = "".join(
+                "{}{}\n".format(converter.convert(e), converter.get_delimiter())
+                for e in source[:-1]
+            ) + "{}{}\n".format(
+                converter.convert(source[-1]), converter.get_last_delimiter()
+            )
+
+            assert expected == converter.convert_many(source, last=True)
+            assert expected == Converter.convert_many(converter, source, last=True)
+            assert "" == converter.convert_many([], last=True)
+
+    def test_stats(self):
+        source = [{"aaa": 0, "bbb": "foo", "ccc": None}, {"aaa": 1, "bbb": [1]}]
+        stats = Stats()
+        converter = SqlConverter()
+        converter.set_stats(stats)
+        converter.convert_many(source)
+        CsvConverter().convert_many(source)
+
+        assert {"int": 2, "str": 1, "NoneType": 1, "list": 1} == stats.get_cells()
+
+    def test_sql_converter_update_delete(self):
+        source = {"id": 1, "bbb": "foo", "ccc": None}
+        converter = SqlConverter()
+        converter.set_table_name("test_table")
+
+        assert (
+            'UPDATE test_table SET bbb = "foo", ccc = null WHERE id = 1'
+            == converter.convert_update(source, "id")
+        )
+        assert 'DELETE FROM test_table WHERE id = "a"' == converter.convert_delete(
+            "id", "a"
+        )
+
+        converter.set_upsert(True)
+        assert (
+            'INSERT INTO test_table (id, bbb, ccc) VALUES (1, "foo", null) ON DUPLICATE KEY UPDATE bbb = VALUES(bbb), ccc = VALUES(ccc)'
+            == converter.convert_update(source, "id")
+        )
+
+    def test_sql_literal(self):
+        source = "a'b\"c\\d\ne"
+        assert "'a\\'b\\\"c\\\\d\\ne'" == SqlLiteral.quote(source, SqlDialect.MySql)
+        assert "'a''b\"c\\d\ne'" == SqlLiteral.quote(source, SqlDialect.PostgreSql)
+        assert "'a''b\"c\\d\ne'" == SqlLiteral.quote(source, SqlDialect.Sqlite)
+        assert "'abc'" == SqlLiteral.quote("abc", SqlDialect.MySql)
+
+    def test_sql_converter_dialect(self):
+        source = {
+            "aaa": 0,
+            "bbb": "it's",
+            "ccc": None,
+            "ddd": True,
+            "eee": datetime(2022, 1, 23, 12, 34, 56),
+            "fff": [1, "x"],
+        }
+        converter = SqlConverter()
+        converter.set_table_name("test_table")
+        converter.set_dialect(SqlDialect.PostgreSql)
+        assert (
+            "INSERT INTO test_table (aaa, bbb, ccc, ddd, eee, fff) VALUES (0, 'it''s', NULL, TRUE, '2022-01-23 12:34:56', '[1, \"x\"]')"
+            == converter.convert(source)
+        )
+        assert "{};\n".format(converter.convert(source)) == converter.convert_many(
+            [source]
+        )
+
+        converter.set_upsert(True)
+        assert converter.convert_update(source, "aaa").endswith(
+            "ON CONFLICT (aaa) DO UPDATE SET bbb = excluded.bbb, ccc = excluded.ccc, ddd = excluded.ddd, eee = excluded.eee, fff = excluded.fff"
+        )
+
+        converter = BulkSqlConverter()
+        converter.set_dialect(SqlDialect.MySql)
+        assert (
+            "    (0, 'it\\'s', NULL, 1, '2022-01-23 12:34:56', '[1, \\\"x\\\"]')"
+            == converter.convert(source)
+        )
+
+    def test_csv_converter_csv_dialect(self):
+        source = [
+            {"aaa": 0, "bbb": 'fo"o', "ccc": None, "ddd": True},
+            {"aaa": 1, "bbb": "a,b\nc", "ccc": [1, "x"], "ddd": False},
+        ]
+        converter = CsvConverter()
+        converter.set_filename("test")
+        converter.set_table_name("test_table")
+        converter.set_csv_dialect("excel")
+        converter.set_null("NULL")
+
+        assert "aaa,bbb,ccc,ddd" == converter.pre_data(source[0])
+        expected = '0,"fo""o",NULL,1\n1,"a,b\nc","[1, ""x""]",0\n'
+        assert expected == converter.convert_many(source, last=True)
+        assert '0,"fo""o",NULL,1' == converter.convert(source[0])
+        assert (
+            "LOAD DATA LOCAL INFILE 'test.csv' INTO TABLE test_table FIELDS TERMINATED BY ',' ENCLOSED BY '\\\"' ESCAPED BY '' LINES TERMINATED BY '\\n' IGNORE 1 LINES (aaa,bbb,ccc,ddd);"
+            == converter.get_load_data_statement()
+        )
+
+    def test_container_to_string(self):
+        sources = [
+            [123, "foobar", None, 1.5],
+            {"a": 1, "b": "c", "d": None},
+            [True, 1],
+            [[1, "x"], {"a": [None]}],
+            {"a": {"b": [1, {"c": "[d]"}]}, "e": []},
+            ["a[b]{c}", {"x]": "{y"}],
+            [[1, "x"], [True]],
+            {1: "a"},
+            {"a": {1: "b"}},
+            ['a"b', "a\\b", "a\nb", "日本語"],
+            [[float("nan")]],
+            [{"a": datetime(2022, 1, 23, 12, 34, 56)}],
+            [],
+            {},
+            [[], {}],
+        ]
+        for source in sources:
+            assert Converter._container_to_string_slow(source) == Converter.to_string(
+                source
+            )
+
+    def test_standard_json(self):
+        source = {"a": [1, True, None], "b": 'x"y'}
+        expected = '"{\\"a\\": [1, true, null], \\"b\\": \\"x\\\\\\"y\\"}"'
+        assert expected == Converter.to_string(source, standard_json=True)
+
+        converter = SqlConverter()
+        converter.set_table_name("test_table")
+        converter.set_standard_json(True)
+        assert "INSERT INTO test_table (c) VALUES ({})".format(
+            expected
+        ) == converter.convert({"c": source})
+        assert converter.is_standard_json()
+        assert not SqlConverter().is_standard_json()
+
+        converter = CsvConverter()
+        converter.set_standard_json(True)
+        assert "{}\n".format(expected) == converter.convert_many([{"c": source}])
+
+    def test_sql_load_script_converter(self):
+        bulk = BulkSqlConverter()
+        bulk.set_table_name("test_table")
+        bulk.set_dialect(SqlDialect.MySql)
+        converter = SqlLoadScriptConverter(bulk)
+        converter.set_primary_key(["id"])
+        converter.set_batch_size(2)
+        converter.set_disable_keys(True)
+        converter.set_secondary_indexes({"idx_name": ["name"]})
+
+        rows = [
+            {"id": 1, "name": None, "at": datetime(2022, 1, 23)},
+            {"id": 2, "name": "foo", "at": None},
+            {"id": 3, "name": "bar", "at": None},
+        ]
+        converter.prepare(rows)
+
+        expected_pre = (
+            "SET unique_checks = 0;\n"
+            "SET foreign_key_checks = 0;\n"
+            "CREATE TABLE IF NOT EXISTS test_table (\n"
+            "    id BIGINT,\n"
+            "    name VARCHAR(255),\n"
+            "    at DATETIME,\n"
+            "    PRIMARY KEY (id)\n"
+            ");\n"
+            "ALTER TABLE test_table DISABLE KEYS;\n"
+            "SET @pykombu_sql = (SELECT IF(COUNT(*) > 0, 'DROP INDEX idx_name ON test_table', 'DO 0') "
+            "FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'test_table' AND index_name = 'idx_name');\n"
+            "PREPARE pykombu_stmt FROM @pykombu_sql;\n"
+            "EXECUTE pykombu_stmt;\n"
+            "DEALLOCATE PREPARE pykombu_stmt;"
+        )
+        assert expected_pre == converter.pre_data(rows[0])
+
+        # strings not in keys are TEXT
+        assert {"id": "BIGINT", "name": "VARCHAR(255)", "note": "TEXT"} == (
+            converter.infer_column_types([{"id": 1, "name": "foo", "note": "bar"}])
+        )
+
+        expected = (
+            "START TRANSACTION;\n"
+            "INSERT INTO test_table (id, name, at) VALUES\n"
+            "    (1, NULL, '2022-01-23 00:00:00'),\n"
+            "    (2, 'foo', NULL);\n"
+            "COMMIT;\n"
+            "START TRANSACTION;\n"
+            "INSERT INTO test_table (id, name, at) VALUES\n"
+            "    (3, 'bar', NULL);\n"
+            "COMMIT;\n"
+        )
+        assert expected == converter.convert_many(rows, last=True)
+
+        expected_post = (
+            "CREATE INDEX idx_name ON test_table (name);\n"
+            "ALTER TABLE test_table ENABLE KEYS;\n"
+            "SET unique_checks = 1;\n"
+            "SET foreign_key_checks = 1;"
+        )
+        assert expected_post == converter.post_data(rows[0])
+
+    def test_sql_load_script_converter_sqlite(self):
+        sql = SqlConverter()
+        sql.set_table_name("test_table")
+        sql.set_dialect(SqlDialect.Sqlite)
+        converter = SqlLoadScriptConverter(sql)
+        converter.set_column_types({"flag": "BOOLEAN"})
+        converter.set_secondary_indexes({"idx_value": ["value"]})
+
+        row = {"value": 1.5, "flag": True}
+        assert (
+            "PRAGMA foreign_keys = OFF;\n"
+            "PRAGMA synchronous = OFF;\n"
+            "CREATE TABLE IF NOT EXISTS test_table (\n"
+            "    value REAL,\n"
+            "    flag BOOLEAN\n"
+            ");\n"
+            "DROP INDEX IF EXISTS idx_value;"
+        ) == converter.pre_data(row)
+        assert (
+            "BEGIN;\n"
+            "INSERT INTO test_table (value, flag) VALUES (1.5, 1);\n"
+            "COMMIT;\n"
+        ) == converter.convert_many([row])
+        assert (
+            "UPDATE test_table SET flag = 1 WHERE value = 1.5;"
+            == converter.convert_update(row, "value")
+        )
@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+
+from daemon import ConfigCache, ConversionDaemon, send_request
+
+
+def write_source(tmp_path):
+    (tmp_path / "source.json").write_text(
+        json.dumps({"table": [{"aaa": i, "bbb": str(i)} for i in range(3)]})
+    )
+    (tmp_path / "replace.json").write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+    (tmp_path / "handlers.py").write_text(
+        "Handlers = {'BBB': lambda k, v, e: v + '!'}\n"
+    )
+
+
+class TestConfigCache:
+    def test_reload_on_change(self, tmp_path):
+        write_source(tmp_path)
+        cache = ConfigCache()
+        handlers_path = str(tmp_path / "handlers.py")
+
+        handlers, concurrency = cache.get_handlers(handlers_path)
+        assert concurrency is None
+        assert handlers is cache.get_handlers(handlers_path)[0]
+        assert 1 == cache.get_load_count()
+
+        (tmp_path / "handlers.py").write_text(
+            "Handlers = {'BBB': lambda k, v, e: v}\nHandlerConcurrency = 2\n"
+        )
+        stat = os.stat(handlers_path)
+        os.utime(handlers_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert 2 == cache.get_handlers(handlers_path)[1]
+        assert 2 == cache.get_load_count()
+
+
+class TestConversionDaemon:
+    def test_handle_request(self, tmp_path):
+        write_source(tmp_path)
+        daemon = ConversionDaemon(str(tmp_path / "daemon.sock"))
+        argv = [
+            "source.json",
+            "replace.json",
+            "output.sql",
+            "--handlers",
+            "handlers.py",
+        ]
+
+        for _ in range(2):
+            response = daemon.handle_request(
+                {"command": "convert", "argv": argv, "cwd": str(tmp_path)}
+            )
+            assert response["ok"]
+            assert 'INSERT INTO table (AAA, BBB) VALUES (2, "2!");\n' == (
+                (tmp_path / "output.sql").read_text().splitlines(keepends=True)[-1]
+            )
+        assert 2 == daemon.get_config_cache().get_load_count()
+
+        response = daemon.handle_request(
+            {"command": "convert", "argv": ["nope.json"], "cwd": str(tmp_path)}
+        )
+        assert not response["ok"]
+
+        argv.extend(["--also", "also.csv"])
+        response = daemon.handle_request(
+            {"command": "convert", "argv": argv, "cwd": str(tmp_path)}
+        )
+        assert response["ok"]
+        assert (tmp_path / "also.csv").exists()
+
+    def test_concurrent_settings(self, tmp_path):
+        (tmp_path / "source.json").write_text(
+            json.dumps({"table": [{"aaa": i, "bbb": [True, None]} for i in range(50)]})
+        )
+        (tmp_path / "replace.json").write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+        daemon = ConversionDaemon(str(tmp_path / "daemon.sock"))
+
+        def convert(i):
+            argv = ["source.json", "replace.json", "output{}.sql".format(i)]
+            argv.extend(["--stats", "stats{}.json".format(i)])
+            if i % 2 == 0:
+                argv.append("--standard-json")
+            return daemon.handle_request(
+                {"command": "convert", "argv": argv, "cwd": str(tmp_path)}
+            )
+
+        for i in range(2):
+            assert convert(i)["ok"]
+        expected = [(tmp_path / "output{}.sql".format(i)).read_text() for i in range(2)]
+        assert expected[0] != expected[1]
+
+        threads = [threading.Thread(target=convert, args=(i,)) for i in range(8)]
+        for e in threads:
+            e.start()
+        for e in threads:
+            e.join()
+
+        for i in range(8):
+            assert expected[i % 2] == (tmp_path / "output{}.sql".format(i)).read_text()
+            report = json.loads((tmp_path / "stats{}.json".format(i)).read_text())
+            assert 50 == report["cells"]["list"]
+
+    def test_serve(self, tmp_path):
+        write_source(tmp_path)
+        socket_path = str(tmp_path / "daemon.sock")
+        daemon = ConversionDaemon(socket_path, workers=2)
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        try:
+            for _ in range(100):
+                if os.path.exists(socket_path):
+                    break
+                time.sleep(0.01)
+
+            assert send_request({"command": "ping"}, socket_path)["ok"]
+            response = send_request(
+                {
+                    "command": "convert",
+                    "argv": ["source.json", "replace.json", "output.csv"],
+                    "cwd": str(tmp_path),
+                },
+                socket_path,
+            )
+            assert response["ok"]
+            assert response["messages"][0].startswith("LOAD DATA")
+            assert (tmp_path / "output.csv").exists()
+        finally:
+            send_request({"command": "shutdown"}, socket_path)
+            thread.join()
+
+        assert not os.path.exists(socket_path)
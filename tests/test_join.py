@@ -0,0 +1,94 @@
+import json
+
+from converter import SqlConverter
+from join import LookupJoin
+from pykombu2 import PyKombu
+
+
+class TestLookupJoin:
+    def test_apply(self, tmp_path):
+        master_path = tmp_path / "master.csv"
+        master_path.write_text("code,label,extra\n1,one,x\n2,two,y\n")
+
+        join = LookupJoin(str(master_path), "code", {"label": "LABEL"}, on="CODE")
+        rows = [{"CODE": 2}, {"CODE": 3}, {"CODE": None}]
+        expected = [
+            {"CODE": 2, "LABEL": "two"},
+            {"CODE": 3, "LABEL": None},
+            {"CODE": None, "LABEL": None},
+        ]
+        assert expected == join.apply(rows)
+        assert 2 == join.build()
+
+    def test_null_key(self, tmp_path):
+        master_path = tmp_path / "master.json"
+        master_path.write_text(
+            json.dumps(
+                {
+                    "master": [
+                        {"code": None, "label": "a"},
+                        {"code": None, "label": "b"},
+                        {"code": 1, "label": "c"},
+                    ]
+                }
+            )
+        )
+
+        join = LookupJoin(str(master_path), "code", ["label"])
+        assert [{"code": None, "label": None}, {"code": 1, "label": "c"}] == (
+            join.apply([{"code": None}, {"code": 1}])
+        )
+        assert 1 == join.build()
+
+    def test_duplicated_key(self, tmp_path):
+        master_path = tmp_path / "master.json"
+        master_path.write_text(
+            json.dumps({"master": [{"code": 1, "label": "a"}, {"code": 1}]})
+        )
+
+        try:
+            LookupJoin(str(master_path), "code", ["label"]).build()
+            assert False
+        except Exception as e:
+            assert str(e).startswith("code has duplicated values")
+
+    def test_load(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"id": 1, "code": 10}, {"id": 2, "code": 20}]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"ID": "id", "CODE": "code"}))
+        master_path = tmp_path / "master.json"
+        master_path.write_text(
+            json.dumps(
+                {
+                    "master": [
+                        {"code": 10, "name": "ten"},
+                        {"code": 20, "name": "twenty"},
+                    ]
+                }
+            )
+        )
+
+        kombu = PyKombu.load(
+            str(src_path),
+            str(replace_path),
+            joins=[
+                {
+                    "source": str(master_path),
+                    "key": "code",
+                    "on": "CODE",
+                    "columns": {"name": "NAME"},
+                }
+            ],
+        )
+        kombu._PyKombu__set_handlers({"CODE": lambda k, v, e: e["NAME"].upper()})
+        converter = SqlConverter()
+        converter.set_table_name("test_table")
+
+        expected = (
+            'INSERT INTO test_table (ID, CODE, NAME) VALUES (1, "TEN", "ten");\n'
+            'INSERT INTO test_table (ID, CODE, NAME) VALUES (2, "TWENTY", "twenty");\n'
+        )
+        assert expected == "".join(kombu.process(converter))
@@ -1,4 +1,19 @@
-from pykombu2 import PyKombu
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from converter import (
+    BulkSqlConverter,
+    CsvConverter,
+    SqlConverter,
+    SqlLoadScriptConverter,
+)
+from pykombu2 import PyKombu, parse_arguments
+from sink import Sink
+from stats import Stats
 
 
 class TestPyKombu:
@@ -74,3 +89,466 @@ class TestPyKombu:
         actual = PyKombu._PyKombu__execute_handler_table(source, handlers)
 
         assert expected == actual
+
+    def test_stats(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": 1, "bbb": "x"}, {"aaa": 2, "bbb": None}]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+
+        stats = Stats()
+        kombu = PyKombu.load(str(src_path), str(replace_path), stats=stats)
+        kombu._PyKombu__set_handlers({"BBB": lambda k, v, e: v})
+        converter = SqlConverter()
+        converter.set_table_name("test_table")
+        converter.set_stats(stats)
+        kombu.process(converter)
+
+        stages = stats.get_stages()
+        assert ["load", "replace", "init", "handlers", "convert"] == list(stages.keys())
+        assert all(e["rows"] == 2 for e in stages.values())
+        assert 2 == stats.get_handlers()["BBB"]["calls"]
+        assert {"int": 2, "str": 1, "NoneType": 1} == stats.get_cells()
+
+        report_path = tmp_path / "report.json"
+        stats.save_report(str(report_path))
+        assert stats.to_dict() == json.loads(report_path.read_text())
+
+    def test_process_resumable(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": i, "bbb": str(i)} for i in range(10)]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+        output_path = tmp_path / "output.sql"
+
+        converter = SqlConverter()
+        converter.set_table_name("test_table")
+        expected = "".join(
+            PyKombu.load(str(src_path), str(replace_path)).process(converter)
+        )
+
+        def fail(k, v, e):
+            if v == "7":
+                raise Exception("failed")
+            return v
+
+        kombu = PyKombu.load(str(src_path), str(replace_path), lazy=True)
+        kombu._PyKombu__set_handlers({"BBB": fail})
+        try:
+            kombu.process_resumable(converter, str(output_path), chunk_size=3)
+            assert False
+        except Exception:
+            pass
+
+        with open("{}.parts/checkpoint.json".format(output_path)) as f:
+            checkpoint = json.load(f)
+        assert 2 == checkpoint["segment"]
+        assert 6 == checkpoint["row_index"]
+
+        resumed = []
+        kombu._PyKombu__set_handlers({"BBB": lambda k, v, e: resumed.append(v) or v})
+        kombu.process_resumable(converter, str(output_path), chunk_size=3, resume=True)
+
+        assert ["6", "7", "8", "9"] == resumed
+        assert expected == output_path.read_text()
+
+    def test_process_resumable_load_data_statement(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": i, "bbb": str(i)} for i in range(10)]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+        output_path = tmp_path / "output.csv"
+
+        def fail(k, v, e):
+            if v == "7":
+                raise Exception("failed")
+            return v
+
+        kombu = PyKombu.load(str(src_path), str(replace_path), lazy=True)
+        kombu._PyKombu__set_handlers({"BBB": fail})
+        with pytest.raises(Exception):
+            kombu.process_resumable(CsvConverter(), str(output_path), chunk_size=3)
+
+        # a new process resumes with a new converter
+        converter = CsvConverter()
+        converter.set_filename("output")
+        converter.set_table_name("test_table")
+        kombu._PyKombu__set_handlers({})
+        kombu.process_resumable(converter, str(output_path), chunk_size=3, resume=True)
+
+        assert converter.get_load_data_statement().endswith("IGNORE 1 LINES (AAA,BBB);")
+
+    def test_process_chunk_size(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": i, "bbb": str(i)} for i in range(10)]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+
+        kombu = PyKombu.load(str(src_path), str(replace_path))
+        converter = SqlConverter()
+        converter.set_table_name("test_table")
+
+        expected = "".join(
+            'INSERT INTO test_table (AAA, BBB) VALUES ({}, "{}");\n'.format(i, i)
+            for i in range(10)
+        )
+        lazy_kombu = PyKombu.load(str(src_path), str(replace_path), lazy=True)
+        for chunk_size in (1, 3, 10, 100):
+            assert expected.splitlines(keepends=True) == kombu.process(
+                converter, chunk_size=chunk_size
+            )
+            assert expected == "".join(
+                lazy_kombu.process(converter, chunk_size=chunk_size)
+            )
+
+    def test_process_multiline_value(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": i, "bbb": "a\nb"} for i in range(3)]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+
+        kombu = PyKombu.load(str(src_path), str(replace_path))
+        converter = SqlConverter()
+        converter.set_table_name("test_table")
+
+        for chunk_size in (1, 2, 10):
+            assert [
+                'INSERT INTO test_table (AAA, BBB) VALUES ({}, "a\nb");\n'.format(i)
+                for i in range(3)
+            ] == kombu.process(converter, chunk_size=chunk_size)
+
+    def test_process_sink(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": i, "bbb": str(i)} for i in range(10)]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+
+        class RecordingSink(Sink):
+            def __init__(self):
+                self.chunks = []
+                self.closed = False
+
+            def write(self, rows):
+                self.chunks.append(rows)
+
+            def close(self):
+                self.closed = True
+
+        sink = RecordingSink()
+        kombu = PyKombu.load(str(src_path), str(replace_path), lazy=True)
+
+        assert 10 == kombu.process_sink(sink, chunk_size=3)
+        assert [3, 3, 3, 1] == [len(e) for e in sink.chunks]
+        assert [{"AAA": i, "BBB": str(i)} for i in range(10)] == [
+            row for e in sink.chunks for row in e
+        ]
+        assert sink.closed
+
+    def test_process_to_file(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": i, "bbb": str(i)} for i in range(10)]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+        output_path = tmp_path / "output.sql"
+        spill_dir = tmp_path / "spill"
+        spill_dir.mkdir()
+
+        converter = BulkSqlConverter()
+        converter.set_table_name("test_table")
+        expected = "".join(
+            PyKombu.load(str(src_path), str(replace_path)).process(converter)
+        )
+
+        stats = Stats()
+        kombu = PyKombu.load(str(src_path), str(replace_path), stats=stats, lazy=True)
+        kombu.set_memory_budget(256)
+        kombu.set_spill_dir(str(spill_dir))
+        assert 10 == kombu.process_to_file(converter, str(output_path), chunk_size=3)
+
+        assert expected == output_path.read_text()
+        assert 0 < stats.get_memory()["spilled"]
+        assert [] == list(spill_dir.iterdir())
+
+    def test_order_by(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": i % 4, "bbb": str(i)} for i in range(10)]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+        output_path = tmp_path / "output.sql"
+
+        converter = SqlConverter()
+        converter.set_table_name("test_table")
+        expected = "".join(
+            'INSERT INTO test_table (AAA, BBB) VALUES ({}, "{}");\n'.format(i % 4, i)
+            for i in sorted(range(10), key=lambda i: i % 4)
+        )
+
+        kombu = PyKombu.load(str(src_path), str(replace_path), lazy=True)
+        kombu.set_order_by(["AAA"])
+        assert expected == "".join(kombu.process(converter, chunk_size=3))
+
+        kombu.set_memory_budget(256)
+        kombu.process_to_file(converter, str(output_path), chunk_size=3)
+        assert expected == output_path.read_text()
+
+        index_path = tmp_path / "index.db"
+        kombu.process_delta(converter, str(output_path), str(index_path), "BBB", 3)
+        assert expected == output_path.read_text()
+
+        class RecordingSink(Sink):
+            def __init__(self):
+                self.rows = []
+
+            def write(self, rows):
+                self.rows.extend(rows)
+
+        sink = RecordingSink()
+        kombu.process_sink(sink, chunk_size=3)
+        assert sorted(sink.rows, key=lambda e: e["AAA"]) == sink.rows
+
+        with pytest.raises(Exception):
+            kombu.process_resumable(converter, str(output_path), chunk_size=3)
+
+        argv = ["source.json", "replace.json", "output.sql"]
+        argv.extend(["--order-by", "AAA", "--resume"])
+        with pytest.raises(SystemExit):
+            parse_arguments(argv)
+
+    def test_process_partitioned(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": i, "bbb": str(i)} for i in range(20)]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+        output_path = tmp_path / "output.sql"
+
+        converter = BulkSqlConverter()
+        converter.set_table_name("test_table")
+        kombu = PyKombu.load(str(src_path), str(replace_path), lazy=True)
+
+        def read_rows(paths):
+            result = []
+            for path in paths:
+                text = open(path).read()
+                if text == "":
+                    continue
+                assert text.startswith("INSERT INTO test_table (AAA, BBB) VALUES\n")
+                assert text.endswith(");\n")
+                result.extend(text.splitlines()[1:])
+            return sorted(e.strip().rstrip(",;") for e in result)
+
+        expected = sorted('({}, "{}")'.format(i, i) for i in range(20))
+
+        paths = kombu.process_partitioned(
+            converter, str(output_path), partitions=3, key="AAA", chunk_size=4
+        )
+        assert [
+            str(tmp_path / "output.{:04d}.sql".format(i)) for i in range(3)
+        ] == paths
+        assert expected == read_rows(paths)
+
+        paths = kombu.process_partitioned(
+            converter, str(output_path), max_bytes=50, chunk_size=4
+        )
+        assert 1 < len(paths)
+        assert expected == read_rows(paths)
+
+        with pytest.raises(Exception):
+            kombu.process_partitioned(
+                SqlLoadScriptConverter(converter),
+                str(output_path),
+                partitions=3,
+                key="AAA",
+            )
+
+    def test_process_many(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": [{"aaa": i, "bbb": str(i)} for i in range(10)]})
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"AAA": "aaa", "BBB": "bbb"}))
+
+        bulk = BulkSqlConverter()
+        bulk.set_table_name("test_table")
+        csv_converter = CsvConverter()
+        csv_converter.set_table_name("test_table")
+        csv_converter.set_csv_dialect("excel")
+        converters = [bulk, csv_converter]
+
+        kombu = PyKombu.load(str(src_path), str(replace_path), lazy=True)
+        expected = ["".join(kombu.process(e, chunk_size=3)) for e in converters]
+
+        calls = []
+        kombu._PyKombu__set_handlers({"BBB": lambda k, v, e: calls.append(v) or v})
+        paths = [str(tmp_path / "output.sql"), str(tmp_path / "output.csv")]
+        assert 10 == kombu.process_many(list(zip(converters, paths)), chunk_size=3)
+
+        assert 10 == len(calls)
+        assert expected == [open(e, newline="").read() for e in paths]
+
+    def test_process_delta(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"ID": "id", "NAME": "name"}))
+        index_path = tmp_path / "index.db"
+        converter = SqlConverter()
+        converter.set_table_name("test_table")
+
+        output_path = tmp_path / "output.sql"
+
+        def run(rows, converter=converter):
+            src_path.write_text(json.dumps({"table": rows}))
+            kombu = PyKombu.load(str(src_path), str(replace_path))
+            kombu.process_delta(converter, str(output_path), str(index_path), "ID", 2)
+            return output_path.read_text()
+
+        rows = [{"id": i, "name": "name{}".format(i)} for i in range(5)]
+        assert 5 == run(rows).count("INSERT INTO")
+        assert "" == run(rows)
+
+        rows[1]["name"] = "changed"
+        del rows[3]
+        rows.append({"id": 9, "name": "new"})
+        expected = (
+            'INSERT INTO test_table (ID, NAME) VALUES (9, "new");\n'
+            'UPDATE test_table SET NAME = "changed" WHERE ID = 1;\n'
+            "DELETE FROM test_table WHERE ID = 3;\n"
+        )
+        assert expected == run(rows)
+        assert "" == run(rows)
+
+        with pytest.raises(Exception):
+            run(rows, CsvConverter())
+
+        # the snapshot is kept when the output is not written
+        class FailingConverter(SqlConverter):
+            def convert_update(self, row, key):
+                raise Exception("failed")
+
+        rows[0]["name"] = "changed"
+        with pytest.raises(Exception):
+            run(rows, FailingConverter())
+        assert 'UPDATE test_table SET NAME = "changed" WHERE ID = 0;\n' == run(rows)
+
+        argv = ["source.json", "replace.json", "output.csv"]
+        argv.extend(["--delta-index", "index.db", "--delta-key", "ID"])
+        with pytest.raises(SystemExit):
+            parse_arguments(argv)
+
+    def test_parse_arguments_output_modes(self):
+        argv = ["source.json", "replace.json", "output.sql"]
+        assert 100 == parse_arguments(argv + ["--chunk-size", "100"]).chunk_size
+        args = parse_arguments(
+            argv + ["--chunk-size", "100", "--order-by", "AAA", "--memory-budget", "1M"]
+        )
+        assert 1024 * 1024 == args.memory_budget
+
+        for options in (
+            ["--chunk-size", "100", "--memory-budget", "1M"],
+            ["--resume", "--memory-budget", "1M"],
+            ["--partitions", "2", "--partition-key", "AAA", "--resume"],
+            ["--partition-size", "1M", "--load-script"],
+            [
+                "--delta-index",
+                "index.db",
+                "--delta-key",
+                "AAA",
+                "--partition-size",
+                "1M",
+            ],
+        ):
+            with pytest.raises(SystemExit):
+                parse_arguments(argv + options)
+
+        argv = ["source.json", "replace.json", "output.pkc"]
+        for options in (["--partition-size", "1M"], ["--resume"]):
+            with pytest.raises(SystemExit):
+                parse_arguments(argv + options)
+
+    def test_row_filter_and_projection(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps(
+                {
+                    "table": [
+                        {"id": i, "tenant": i % 3, "name": str(i), "unused": "x"}
+                        for i in range(10)
+                    ]
+                }
+            )
+        )
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"NAME": "name", "ID": "id"}))
+
+        for lazy in (False, True):
+            kombu = PyKombu.load(
+                str(src_path),
+                str(replace_path),
+                lazy=lazy,
+                row_filter={"tenant": 1, "id": {">": 1}},
+            )
+            converter = SqlConverter()
+            converter.set_table_name("test_table")
+
+            assert (
+                'INSERT INTO test_table (ID, NAME) VALUES (4, "4");\n'
+                'INSERT INTO test_table (ID, NAME) VALUES (7, "7");\n'
+            ) == "".join(kombu.process(converter, chunk_size=3))
+            assert [
+                {"id": 4, "tenant": 1, "name": "4"},
+                {"id": 7, "tenant": 1, "name": "7"},
+            ] == kombu.get_loaded_data()
+
+    def test_execute_handler_table_concurrently(self):
+        source = [{"aaa": i, "bbb": i * 10, "ccc": i} for i in range(20)]
+        running = {"now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def handle(k, v, e):
+            with lock:
+                running["now"] += 1
+                running["max"] = max(running["max"], running["now"])
+            time.sleep(0.01)
+            with lock:
+                running["now"] -= 1
+            return "{}{}_{}".format(k, v, e["ccc"])
+
+        async def handle_async(k, v, e):
+            await asyncio.sleep(0.01 * (e["ccc"] % 3))
+            return v + 1
+
+        expected = [
+            {"aaa": "aaa{}_{}".format(i, i), "bbb": i * 10 + 1, "ccc": i}
+            for i in range(20)
+        ]
+
+        stats = Stats()
+        actual = PyKombu._PyKombu__execute_handler_table(
+            source, {"aaa": handle, "bbb": lambda k, v, e: v + 1}, stats, 4
+        )
+        assert expected == actual
+        assert 1 < running["max"] <= 4
+        assert 20 == stats.get_handlers()["aaa"]["calls"]
+
+        actual = PyKombu._PyKombu__execute_handler_table(
+            source, {"aaa": handle, "bbb": handle_async}, None, 3
+        )
+        assert expected == actual
@@ -0,0 +1,55 @@
+import json
+
+from reader import CsvSourceReader, JsonSourceReader, RowFilter
+
+
+class TestJsonSourceReader:
+    def test_read_chunks(self, tmp_path):
+        rows = [
+            {"id": i, "name": "名前{}".format(i), "list": [i, "]"]} for i in range(10)
+        ]
+        src_path = tmp_path / "source.json"
+        src_path.write_text(
+            json.dumps({"table": rows}, ensure_ascii=False, indent=2), encoding="utf8"
+        )
+        reader = JsonSourceReader(str(src_path))
+
+        chunks = list(reader.read_chunks(4))
+        assert [4, 4, 2] == [len(e) for _, e in chunks]
+        assert rows == [r for _, e in chunks for r in e]
+
+        offset, _ = chunks[0]
+        assert rows[4:] == [r for _, e in reader.read_chunks(3, offset) for r in e]
+        assert rows == reader.read()
+
+    def test_read_chunks_empty(self, tmp_path):
+        src_path = tmp_path / "source.json"
+        src_path.write_text('{"table": [ ]}')
+
+        assert [] == list(JsonSourceReader(str(src_path)).read_chunks(4))
+
+
+class TestCsvSourceReader:
+    def test_read_chunks(self, tmp_path):
+        src_path = tmp_path / "source.csv"
+        src_path.write_text('\ufeffid,name\n1,"a,b"\n2,\n\n3,c\n', encoding="utf8")
+        reader = CsvSourceReader(str(src_path))
+        reader.set_columns(["name"])
+
+        chunks = list(reader.read_chunks(2))
+        assert [(2, [{"name": "a,b"}, {"name": ""}]), (4, [{"name": "c"}])] == chunks
+        assert [{"name": "c"}] == [r for _, e in reader.read_chunks(2, 2) for r in e]
+
+
+class TestRowFilter:
+    def test_call(self):
+        row_filter = RowFilter(
+            {"aaa": 1, "bbb": {">=": 2, "<": 5}, "ccc": {"in": ["x", "y"]}}
+        )
+
+        assert ["aaa", "bbb", "ccc"] == row_filter.get_columns()
+        assert row_filter({"aaa": 1, "bbb": 2, "ccc": "x"})
+        assert not row_filter({"aaa": 2, "bbb": 2, "ccc": "x"})
+        assert not row_filter({"aaa": 1, "bbb": 5, "ccc": "y"})
+        assert not row_filter({"aaa": 1, "bbb": None, "ccc": "y"})
+        assert not row_filter({"aaa": 1, "bbb": 3, "ccc": "z"})
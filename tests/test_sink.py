@@ -0,0 +1,63 @@
+import sqlite3
+from datetime import datetime, date
+
+from converter import BulkSqlConverter
+from sink import ConverterSink, SqliteSink
+
+
+class TestSqliteSink:
+    def test_write(self, tmp_path):
+        db_path = tmp_path / "test.db"
+        rows = [
+            {"aaa": i, "bbb": "foo{}".format(i), "ccc": None, "ddd": [i, "x"]}
+            for i in range(5)
+        ]
+        rows[0]["eee"] = datetime(2022, 1, 23, 12, 34, 56)
+
+        sink = SqliteSink(str(db_path))
+        sink.set_table_name("test_table")
+        sink.set_batch_size(2)
+        sink.write(rows[:3])
+        sink.write(rows[3:])
+        sink.close()
+
+        with sqlite3.connect(str(db_path)) as connection:
+            actual = connection.execute(
+                "SELECT aaa, bbb, ccc, ddd FROM test_table ORDER BY aaa"
+            ).fetchall()
+
+        expected = [
+            (i, "foo{}".format(i), None, '[{}, "x"]'.format(i)) for i in range(5)
+        ]
+        assert expected == actual
+
+    def test_to_parameter(self):
+        assert "2022-01-23 12:34:56" == SqliteSink.to_parameter(
+            datetime(2022, 1, 23, 12, 34, 56)
+        )
+        assert "2022-01-23" == SqliteSink.to_parameter(date(2022, 1, 23))
+        assert '{"a": null}' == SqliteSink.to_parameter({"a": None})
+
+
+class TestConverterSink:
+    def test_write(self, tmp_path):
+        output_path = tmp_path / "output.sql"
+        converter = BulkSqlConverter()
+        converter.set_table_name("test_table")
+        rows = [{"aaa": i} for i in range(3)]
+
+        sink = ConverterSink(converter, str(output_path))
+        sink.write(rows[:2])
+        sink.write(rows[2:])
+        sink.close()
+
+        assert 3 == sink.get_row_count()
+        assert (
+            "INSERT INTO test_table (aaa) VALUES\n    (0),\n    (1),\n    (2);\n"
+            == output_path.read_text()
+        )
+
+    def test_empty(self, tmp_path):
+        output_path = tmp_path / "output.sql"
+        ConverterSink(BulkSqlConverter(), str(output_path)).close()
+        assert "" == output_path.read_text()
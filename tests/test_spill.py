@@ -0,0 +1,81 @@
+import os
+import random
+
+import pytest
+
+from spill import SortBuffer, SpillBuffer
+
+
+class TestSpillBuffer:
+    def test_spill(self, tmp_path):
+        rows = [{"id": i, "name": "name{}".format(i)} for i in range(10)]
+        rows.append({"id": 10, "other": [1, 2]})
+
+        with SpillBuffer(256, str(tmp_path)) as buffer:
+            for i in range(0, len(rows), 3):
+                buffer.append(rows[i : i + 3])
+
+            assert 11 == buffer.get_row_count()
+            assert 0 < buffer.get_spilled_bytes()
+            assert 0 < buffer.get_peak_bytes()
+            assert 1 == len(os.listdir(tmp_path))
+
+            chunks = list(buffer.iter_chunks(4))
+            assert all(len(e) <= 4 for e in chunks)
+            assert rows == [r for e in chunks for r in e]
+
+        assert [] == os.listdir(tmp_path)
+
+    def test_no_budget(self, tmp_path):
+        rows = [{"id": i} for i in range(10)]
+        with SpillBuffer(None, str(tmp_path)) as buffer:
+            buffer.append(rows)
+            assert 0 == buffer.get_spilled_bytes()
+            assert rows == [r for e in buffer.iter_chunks(3) for r in e]
+        assert [] == os.listdir(tmp_path)
+
+
+class TestSortBuffer:
+    def test_external_merge_sort(self, tmp_path):
+        random.seed(0)
+        rows = [
+            {"id": random.randrange(50), "seq": i, "name": random.choice([None, "a"])}
+            for i in range(300)
+        ]
+
+        with SortBuffer(["name", "id"], 1024, str(tmp_path)) as buffer:
+            for i in range(0, len(rows), 7):
+                buffer.append(rows[i : i + 7])
+
+            assert 1 < buffer.get_run_count()
+            chunks = list(buffer.iter_chunks(32))
+            assert all(len(e) <= 32 for e in chunks)
+
+            expected = sorted(rows, key=lambda e: (e["name"] is not None, e["id"]))
+            assert expected == [r for e in chunks for r in e]
+
+        assert [] == os.listdir(tmp_path)
+
+    def test_missing_column(self):
+        with SortBuffer(["id"], None) as buffer:
+            try:
+                buffer.append([{"name": "a"}])
+                assert False
+            except Exception as e:
+                assert "id not in row" == str(e)
+
+        with SortBuffer(["id"], None) as buffer:
+            with pytest.raises(ValueError, match="id not in row"):
+                buffer.append([{"id": 0}, {"name": "a"}])
+
+    def test_mixed_types(self, tmp_path):
+        rows = [{"id": e} for e in ("b", 2, None, 1.5, "a", None, [1], 0)] * 10
+
+        with SortBuffer(["id"], 128, str(tmp_path)) as buffer:
+            for i in range(0, len(rows), 4):
+                buffer.append(rows[i : i + 4])
+
+            assert 1 < buffer.get_run_count()
+            expected = [None] * 20 + [0] * 10 + [1.5] * 10 + [2] * 10
+            expected += ["a"] * 10 + ["b"] * 10 + [[1]] * 10
+            assert expected == [r["id"] for e in buffer.iter_chunks(16) for r in e]
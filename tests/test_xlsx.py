@@ -0,0 +1,74 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from converter import SqlConverter
+from pykombu import FileTypeDetecter
+from pykombu2 import PyKombu, parse_arguments
+from reader import XlsxSourceReader
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+class TestXlsxSourceReader:
+    @staticmethod
+    def create_workbook(path):
+        workbook = openpyxl.Workbook()
+        first = workbook.active
+        first.title = "first"
+        first.append(["id", "name", None, "created"])
+        for i in range(5):
+            first.append([i, "name{}".format(i), "ignored", datetime(2022, 1, i + 1)])
+        first.append([None, None, None, None])
+        first.append([5, None])
+
+        second = workbook.create_sheet("second")
+        second.append(["code"])
+        second.append(["A"])
+        workbook.save(path)
+
+    def test_read_chunks(self, tmp_path):
+        path = tmp_path / "source.xlsx"
+        self.create_workbook(path)
+
+        reader = XlsxSourceReader(str(path))
+        chunks = list(reader.read_chunks(2))
+        rows = [r for _, e in chunks for r in e]
+        assert 6 == len(rows)
+        assert {"id": 0, "name": "name0", "created": datetime(2022, 1, 1)} == rows[0]
+        assert {"id": 5, "name": None, "created": None} == rows[-1]
+
+        offset, _ = chunks[0]
+        assert rows[2:] == [r for _, e in reader.read_chunks(2, offset) for r in e]
+
+        assert [{"code": "A"}] == XlsxSourceReader(str(path), "second").read()
+        assert [{"code": "A"}] == XlsxSourceReader(str(path), 1).read()
+        with pytest.raises(Exception):
+            XlsxSourceReader(str(path), 2).read()
+
+    def test_sheet_argument(self):
+        def parse_sheet(sheet):
+            argv = ["source.xlsx", "replace.json", "output.sql", "--sheet", sheet]
+            return parse_arguments(argv).sheet
+
+        assert 1 == parse_sheet("1")
+        assert "second" == parse_sheet("second")
+        assert "2nd" == parse_sheet("2nd")
+
+    def test_pykombu(self, tmp_path):
+        path = tmp_path / "source.xlsx"
+        self.create_workbook(path)
+        replace_path = tmp_path / "replace.json"
+        replace_path.write_text(json.dumps({"ID": "id", "NAME": "name"}))
+
+        assert FileTypeDetecter.FileType.Xlsx == FileTypeDetecter.detect(str(path))
+
+        converter = SqlConverter()
+        converter.set_table_name("test_table")
+        kombu = PyKombu.load(str(path), str(replace_path), lazy=True)
+        actual = "".join(kombu.process(converter, chunk_size=2))
+        assert actual.startswith(
+            'INSERT INTO test_table (ID, NAME) VALUES (0, "name0");\n'
+        )
+        assert actual.endswith("INSERT INTO test_table (ID, NAME) VALUES (5, null);\n")